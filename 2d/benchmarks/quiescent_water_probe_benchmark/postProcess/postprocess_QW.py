@@ -5,6 +5,9 @@ import collections as cll
 import csv
 import os
 import matplotlib.pyplot as plt
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../../..'))
+from tools.GaugeTools import readProbeFile
 
 #####################################################################################
 
@@ -15,30 +18,6 @@ file_pressurePoint = 'pressure_PointGauge.csv'
 file_pressureLine = 'pressure_LineGauge.csv'
 file_vof = 'vof_LineIntegralGauge.csv'
 
-def readProbeFile(filename):
-    with open (filename, 'rb') as csvfile:
-        data=np.loadtxt(csvfile, delimiter=",",skiprows=1)
-        time=data[:,0]
-        data = data[:,1:]
-        csvfile.seek(0)
-        header = csvfile.readline()
-        header = header.replace("time","")
-        header = header.replace("[","")
-        header = header.replace("]","")
-        header = header.replace(","," ")
-        header = header.split()
-        probeType = []
-        probex = []
-        probey = []
-        probez = []        
-        for ii in range(0,len(header),4):
-            probeType.append(header[ii])
-            probex.append(float(header[ii+1]))
-            probey.append(float(header[ii+2]))
-            probez.append(float(header[ii+3]))
-        probeCoord = zip(np.array(probex),np.array(probey),np.array(probez))
-        datalist = [probeType,probeCoord,time,data]
-        return datalist
 
 data_p_point = readProbeFile(file_pressurePoint)
 data_p_line = readProbeFile(file_pressureLine)
@@ -10,6 +10,9 @@ from proteus import (Domain, Context,
 from proteus.mprans import SpatialTools as st
 from proteus.Profiling import logEvent
 from proteus.mprans.SpatialTools import Tank2D
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../..'))
+from tools.SloshingTools import SloshingSolution
 
 # predefined options
 opts=Context.Options([
@@ -294,123 +297,16 @@ elif useRANS == 2:
 ##########################################
 #                Solution                #
 ##########################################
-# 3rd order solution
-
-def eta0(x, t):
-    eta_0 = np.sin(t)*np.cos(x)
-    return eta_0
-
-def phi0(x, y, t, h, w0):
-    phi_0 = w0/(np.sinh(h))*np.cos(t)*np.cos(x)*np.cosh(y+h)
-    return phi_0
-    
-def w0(h):
-    w_0 = np.sqrt(np.tanh(h))
-    return w_0
-    
-    
-def eta1(x, t, w0):
-    eta_1 = 1./8.*((w0**2-w0**(-2))+(w0**(-2)-3*w0**(-6))*np.cos(2.*t))*np.cos(2.*x)
-    return eta_1
-
-def phi1(x, y, t, h, w0):
-    beta0 = 0  # arbitrary
-    phi_1 = beta0+1./8.(w0-w0**(-3))*t-1./16.*(3*w0+w0**(-3))*np.sin(2*t)-3./(16.*np.cosh(2.*h))*(w0-w0**(-7))*np.sin(2*t)*np.cos(2*x)*np.cosh(2*(y+h))
-    return phi_1
-    
-w1 = 0.
-
-def eta2(x, t, w0):
-    b11 = 1./32.*(3.*w0**(-8)+6.*w0**(-4)-5.+2.*w0**4)
-    b13 = 3./128.*(9.*w0**(-8)+27.*w0**(-4)-15.+w0**4+2*w0**8)
-    b31 = 1./128.*(3.*w0**(-8)+18.*w0**(-4)-5.)
-    b33 = 3./128.*(-9.*w0**(-12)+3.*w0**(-8)-3.*w0**(-4)+1)
-    eta_2 = b11*np.sin(t)*np.cos(x)+b13*np.sin(t)*np.cos(3*x)+b31*np.sin(3*t)*np.cos(x)+b33*np.sin(3*t)*np.cos(3*x)
-    return eta_2
-
-def phi2(x, y, t, h, w0):
-    beta13 = 1./(128.*np.cosh(3.*h))*(1+3*w0**4)*(3*w0**(-9)-5.*w0**(-1)+2*w0**3)
-    beta31 = 1./(128.*np.cosh(h))*(9.*w0**(-9)+62.*w0**(-5)-31.*w0**(-1))
-    beta33 = 1./(128.*np.cosh(3.*h))*(1+3.*w0**4)*(-9.*w0**(-13)+22.*w0**(-9)-13.*w0**(-5))
-    beta2 = 0.  # arbitrary
-    phi_2 = beta2+beta13*np.cos(t)*np.cos(3*x)*np.cosh(3*(y+h))+beta31*np.cos(3*t)*np.cos(x)*np.cosh(y+h)+beta33*np.cos(3*t)*np.cos(3*x)*np.cosh(3*(y+h))
-    return phi_2
-        
-def eps_eta(x, t, h, eps):
-    w_0 = w0(h)
-    eta_0 = eta0(x, t)
-    eta_1 = eta1(x, t, w_0)
-    eta_2 = eta2(x, t, w_0)
-    epseta = eps*eta_0+eps**2*eta_1+0.5*eps**3*eta_2
-    return epseta
-
-def w2(w0):
-    w_2 = 1./32.*(9.*w0**(-7)-12.*w0**(-3)-3*w0-2*w0**5)
-    return w_2
-    
-def omega(h, eps):
-    w_0 = w0(h)
-    w_2 = w2(w_0)
-    w = w_0+0.5*eps**2*w_2
-    return w
-    
-
-def d_phi0_d_t(x, y, t, h, w0):
-    return -w0/np.sinh(h)*np.sin(t)*np.cos(x)*np.cosh(y+h)
-
-def d_phi0_d_x(x, y, t, h, w0):
-    return -w0/np.sinh(h)*np.cos(t)*np.sin(x)*np.cosh(y+h)
-
-def d_phi0_d_y(x, y, t, h, w0):
-    return w0/np.sinh(h)*np.cos(t)*np.cos(x)*np.sinh(y+h)
-
-def d_phi1_d_t(x, y, t, h, w0):
-    return 1./8.*(w0-w0**(-3))-2./16.*(3.*w0+w0**(-3))*np.cos(2*t)-2.*3./(16.*np.cosh(2.*h))*(w0-w0**(-7))*np.cos(2.*t)*np.cos(2.*x)*np.cosh(2.*(y+h))
-
-def d_phi1_d_x(x, y, t, h, w0):
-    return 2.*3./(16.*np.cosh(2.*h))*(w0-w0**(-7))*np.sin(2.*t)*np.sin(2.*x)*np.cosh(2.*(y+h))
-
-def d_phi1_d_y(x, y, t, h, w0):
-    return 2.*3./(16.*np.cosh(2.*h))*(w0-w0**(-7))*np.sin(2.*t)*np.cos(2.*x)*np.sinh(2.*(y+h))
-    
-def d_phi2_d_t(x, y, t, h, w0):
-    beta13 = 1./(128.*np.cosh(3.*h))*(1+3*w0**4)*(3*w0**(-9)-5.*w0**(-1)+2*w0**3)
-    beta31 = 1./(128.*np.cosh(h))*(9.*w0**(-9)+62.*w0**(-5)-31.*w0**(-1))
-    beta33 = 1./(128.*np.cosh(3.*h))*(1+3.*w0**4)*(-9.*w0**(-13)+22.*w0**(-9)-13.*w0**(-5))
-    return -beta13*np.sin(t)*np.cos(3.*x)*np.cosh(3.*(y+h))-3.*beta31*np.sin(3.*t)*np.cos(x)*np.cosh(y+h)-3.*beta33*np.sin(3.*t)*np.cos(3.*x)*np.cosh(3.*(y+h))
-
-def d_phi2_d_x(x, y, t, h, w0):
-    beta13 = 1./(128.*np.cosh(3.*h))*(1+3*w0**4)*(3*w0**(-9)-5.*w0**(-1)+2*w0**3)
-    beta31 = 1./(128.*np.cosh(h))*(9.*w0**(-9)+62.*w0**(-5)-31.*w0**(-1))
-    beta33 = 1./(128.*np.cosh(3.*h))*(1+3.*w0**4)*(-9.*w0**(-13)+22.*w0**(-9)-13.*w0**(-5))
-    return -3.*beta13*np.cos(t)*np.sin(3.*x)*np.cosh(3.*(y+h))-beta31*np.cos(3.*t)*np.sin(x)*np.cosh(y+h)-3.*beta33*np.cos(3.*t)*np.sin(3.*x)*np.cosh(3.*(y+h))
-
-def d_phi2_d_y(x, y, t, h, w0):
-    beta13 = 1./(128.*np.cosh(3.*h))*(1+3*w0**4)*(3*w0**(-9)-5.*w0**(-1)+2*w0**3)
-    beta31 = 1./(128.*np.cosh(h))*(9.*w0**(-9)+62.*w0**(-5)-31.*w0**(-1))
-    beta33 = 1./(128.*np.cosh(3.*h))*(1+3.*w0**4)*(-9.*w0**(-13)+22.*w0**(-9)-13.*w0**(-5))
-    return 3.*beta13*np.cos(t)*np.cos(3.*x)*np.sinh(3.*(y+h))+beta31*np.cos(3.*t)*np.cos(x)*np.sinh(y+h)+3.*beta33*np.cos(3.*t)*np.cos(3.*x)*np.sinh(3.*(y+h))   
-
-def pressure(x, y, t, h, eps, rho, g, k, p0):
-    x_ = x*k
-    y_ = y*k
-    h_ = h*k
-    w_ = omega(h_, eps)
-    t_ = (t+2*np.pi/(w_*np.sqrt(k*(-g[1])))*0.25)*(w_*np.sqrt(k*(-g[1])))
-    w_0 = w0(h_)
-    dt = eps*d_phi0_d_t(x_, y_, t_, h_, w_0)+eps**2*d_phi1_d_t(x_, y_, t_, h_, w_0)+0.5*eps**3*d_phi2_d_t(x_, y_, t_, h_, w_0)
-    dx = eps*d_phi0_d_x(x_, y_, t_, h_, w_0)+eps**2*d_phi1_d_x(x_, y_, t_, h_, w_0)+0.5*eps**3*d_phi2_d_x(x_, y_, t_, h_, w_0)
-    dy = eps*d_phi0_d_y(x_, y_, t_, h_, w_0)+eps**2*d_phi1_d_y(x_, y_, t_, h_, w_0)+0.5*eps**3*d_phi2_d_y(x_, y_, t_, h_, w_0)
-    p = (-y_-dt*w_-0.5*dx**2-0.5*dy**2)*rho*abs(g[1])/k+p0
-    return p
+# 3rd order solution, coefficients computed once and evaluated on arrays
+# (see tools/SloshingTools.py)
+
+solution = SloshingSolution(k, h, water_amplitude, g=g[1], rho=rho_0)
 
 def eta(x, t):
-    x_ = x*k
-    h_ = h*k
-    w_ = omega(h_, eps)
-    t_ = (t+2*np.pi/(w_*np.sqrt(k*(-g[1])))*0.25)*(w_*np.sqrt(k*(-g[1])))
-    eta = eps_eta(x_, t_, h_, eps)/k
-    return eta
+    return solution.eta(x, t)
+
+def pressure(x, y, t, p0=0.):
+    return solution.pressure(x, y, t, p0)
 
 def signedDistance(x, t):
     #d=abs(x[1] - water_depth  - water_amplitude * cos(x[0]))
@@ -23,9 +23,11 @@ st.assembleDomain(domain)
 """
 
 from math import cos, sin, sqrt, atan2, acos, asin
-from itertools import compress
-import csv
+from itertools import compress, product
+from copy import deepcopy
+import atexit
 import os
+import sys
 import numpy as np
 from proteus import AuxiliaryVariables, Archiver, Comm, Profiling
 from proteus.Profiling import logEvent as log
@@ -35,6 +37,9 @@ from proteus.SpatialTools import (Shape,
                                   Rectangle,
                                   CustomShape,
                                   BCContainer)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '../../..'))
+from tools.RecordTools import RecordWriter, cutRecord
 
 
 class ShapeRANS(Shape):
@@ -182,9 +187,15 @@ class ShapeRANS(Shape):
                         Fx=False, Fy=False, Fz=False, M=False, Mx=False,
                         My=False, Mz=False, inertia=False, vel=False,
                         vel_x=False, vel_y=False, vel_z=False, acc=False,
-                        acc_x=False, acc_y=False, acc_z=False, filename=None):
+                        acc_x=False, acc_y=False, acc_z=False, filename=None,
+                        binary=False, buffer_size=100):
         """
         values to be recorded in a csv file (for rigid bodies)
+
+        :param binary: record in a binary file (filename.bin, see
+                       tools.RecordTools.readRecord) instead of a csv file
+        :param buffer_size: number of time steps kept in memory before
+                            writing to the file
         """
         self.record_values = True
         if pos is True:
@@ -210,9 +221,12 @@ class ShapeRANS(Shape):
                              'acc_x', 'acc_y', 'acc_z']
         self.record_names = list(compress(self.record_names, self.record_bool))
         if filename is None:
-            self.record_filename = 'record_' + self.name + '.csv'
+            filename = 'record_' + self.name
+        if binary is True:
+            self.record_filename = filename + '.bin'
         else:
             self.record_filename = filename + '.csv'
+        self.record_buffer = buffer_size
 
     def setAbsorptionZones(self, flags, epsFact_solid, center, orientation,
                            dragAlpha=0.5/1.005e-6, dragBeta=0.,
@@ -961,13 +975,17 @@ class Tank2D(ShapeRANS):
 
 class RigidBody(AuxiliaryVariables.AV_base):
 
-    def __init__(self, shape, he=1., cfl_target=0.9, dt_init=0.001):
+    def __init__(self, shape, he=1., cfl_target=0.9, dt_init=0.001,
+                 substeps=20):
         self.Shape = shape
         # if isinstance(shape, (Rectangle, Cuboid)):
         #     shape._setInertiaTensor()
         self.dt_init = dt_init
         self.he = he
         self.cfl_target = 0.9
+        # fraction 1/substeps of the time step is integrated when the body
+        # goes from sliding to static friction
+        self.substeps = substeps
         self.last_position = np.array([0., 0., 0.])
         self.rotation_matrix = np.eye(3)
         self.h = np.array([0., 0., 0.])
@@ -977,13 +995,11 @@ class RigidBody(AuxiliaryVariables.AV_base):
         self.m_static = self.Shape.m_static
         self.m_dynamic = self.Shape.m_dynamic
         self.friction = self.Shape.friction
-        
+        self.record = None
+        self.restart_state = None  # set by setState() before the run starts
+
     def step(self, dt):
         nd = self.Shape.Domain.nd
-        # substeps for smoother motion between timesteps
-        ang_disp = 0
-        substeps = 20
-        dt_sub = dt/float(substeps)
         self.h[:] = np.zeros(3)
 
 ################################################################################################################################################################################################################################
@@ -1012,15 +1028,16 @@ class RigidBody(AuxiliaryVariables.AV_base):
             if abs(Fx)<abs(Ftan):
                 self.acceleration = np.zeros(3)
                 self.velocity = np.zeros(3)
-                self.h = np.zeros(3)              
+                self.h[:] = 0.
             else:
                 Fx = Fx+Ftan
                 self.acceleration[0] = Fx/mass
                 self.acceleration[1] = 0.0
                 self.acceleration[2] = 0.0 
-                for i in range(substeps):
-                    self.velocity += self.acceleration*dt_sub
-                    self.h += self.velocity*dt_sub
+                self.velocity, disp = constantAcceleration(
+                    self.velocity, self.acceleration, dt)
+                # in place: the moving mesh BCs hold a reference to self.h
+                self.h[:] = disp
             self.fromDynamic_toStatic = False        
             
         #---------------------------------------------------------------    
@@ -1034,19 +1051,18 @@ class RigidBody(AuxiliaryVariables.AV_base):
             self.acceleration[0] = Fx/mass
             self.acceleration[1] = 0.0
             self.acceleration[2] = 0.0 
-            for i in range(substeps):
-                self.velocity += self.acceleration*dt_sub
-                self.h += self.velocity*dt_sub
-                # When velocity changes sign, it means that 0-condition is passed
-                # Loop must start from static case again
-                vel_check = self.acceleration[0]*dt_sub
-                last_vel_check = self.last_acceleration[0]*dt_sub
-                self.fromDynamic_toStatic = False 
-                if (vel_check*last_vel_check) < 0.0:                                                      
-                    self.velocity += np.zeros(3)     
-                    self.h += np.zeros(3)
-                    self.fromDynamic_toStatic = True
-                    break                            
+            # When the acceleration changes sign, the 0-velocity condition
+            # is passed during the step: only the first substep is done and
+            # the loop must start from static case again
+            self.fromDynamic_toStatic = (
+                self.acceleration[0]*self.last_acceleration[0] < 0.0)
+            if self.fromDynamic_toStatic:
+                dt_move = dt/float(self.substeps)
+            else:
+                dt_move = dt
+            self.velocity, disp = constantAcceleration(
+                self.velocity, self.acceleration, dt_move)
+            self.h[:] = disp
              
              
 ################################################################################################################################################################################################################################
@@ -1078,9 +1094,9 @@ class RigidBody(AuxiliaryVariables.AV_base):
         # acceleration from force:
             self.acceleration = self.F/self.Shape.mass          
         # displacement
-            for i in range(substeps):
-                self.velocity += self.acceleration*dt_sub
-                self.h += self.velocity*dt_sub
+            self.velocity, disp = constantAcceleration(
+                self.velocity, self.acceleration, dt)
+            self.h[:] = disp
         # angular acceleration from moment
         if sum(self.M) != 0:
             self.inertia = self.Shape.getInertia(self.M, self.Shape.barycenter)
@@ -1091,9 +1107,7 @@ class RigidBody(AuxiliaryVariables.AV_base):
             self.inertia = None
             ang_acc = np.array([0., 0., 0.])   
         # rotation
-        for i in range(substeps):
-            self.angvel += ang_acc*dt_sub
-            ang_disp += self.angvel*dt_sub
+        self.angvel, ang_disp = constantAcceleration(self.angvel, ang_acc, dt)
 
 ################################################################################################################################################################################################################################
                    
@@ -1135,12 +1149,8 @@ class RigidBody(AuxiliaryVariables.AV_base):
                   rot_z, Fx, Fy, Fz, Mx, My, Mz, inertia,
                   vel_x, vel_y, vel_z, acc_x, acc_y, acc_z]
         values_towrite = list(compress(values, self.Shape.record_bool))
-        comm = Comm.get()
-        if comm.isMaster():
-            if self.Shape.record_values is True:
-                with open(self.record_file, 'a') as csvfile:
-                    writer = csv.writer(csvfile, delimiter=',')
-                    writer.writerow(values_towrite)
+        if self.record is not None:
+            self.record.write(values_towrite)
 
     def attachModel(self, model, ar):
         self.model = model
@@ -1186,14 +1196,66 @@ class RigidBody(AuxiliaryVariables.AV_base):
             self.Fg = self.Shape.mass*np.array([0., -9.81, 0.])
         if nd == 3:
             self.Fg = self.Shape.mass*np.array([0., 0., -9.81])
+        restart = self.restart_state is not None
+        if restart:
+            self._applyState(self.restart_state)
         comm = Comm.get()
         if comm.isMaster():
             if self.Shape.record_values is True:
                 self.record_file = os.path.join(Profiling.logDir,
                                                 self.Shape.record_filename)
-                with open(self.record_file, 'w') as csvfile:
-                    writer = csv.writer(csvfile, delimiter=',')
-                    writer.writerow(self.Shape.record_names)
+                if restart and self.Shape.record_names[0] == 'time':
+                    cutRecord(self.record_file, self.restart_state['t'])
+                self.record = RecordWriter(self.record_file,
+                                           self.Shape.record_names,
+                                           self.Shape.record_buffer,
+                                           append=restart)
+                atexit.register(self.record.close)
+
+    #: attributes saved in checkpoints (see tools/RestartTools.py)
+    state_attributes = ('position', 'last_position', 'velocity',
+                        'last_velocity', 'acceleration', 'last_acceleration',
+                        'rotation', 'last_rotation', 'rotation_matrix', 'F',
+                        'M', 'last_F', 'last_M', 'angvel', 'last_angvel', 'h',
+                        'ang', 'inertia', 'fromDynamic_toStatic',
+                        'last_fromDynamic_toStatic')
+
+    def getState(self):
+        """
+        State of the body at the last time step, for checkpoints (flushes the
+        record so that it holds all the rows before the checkpoint)
+        """
+        if self.record is not None:
+            self.record.flush()
+        state = dict((name, deepcopy(getattr(self, name, None)))
+                     for name in self.state_attributes)
+        state['t'] = self.model.stepController.t_model_last
+        state['shape'] = dict((name, deepcopy(getattr(self.Shape, name)))
+                              for name in ('barycenter', 'coords_system',
+                                           'vertices'))
+        return state
+
+    def setState(self, state):
+        """
+        Restores the state of a checkpoint when the run starts (in
+        calculate_init), the record being continued from that time
+        """
+        self.restart_state = state
+
+    def _applyState(self, state):
+        # arrays are copied in place: the moving mesh BCs hold references to
+        # last_position, h and rotation_matrix (see assembleDomain)
+        for name in self.state_attributes:
+            value = state[name]
+            current = getattr(self, name, None)
+            if (isinstance(current, np.ndarray) and
+                    np.shape(value) == current.shape):
+                current[:] = value
+            else:
+                setattr(self, name, deepcopy(value))
+        for name, value in state['shape'].items():
+            getattr(self.Shape, name)[:] = value
+        self.barycenter = self.Shape.barycenter
 
     def calculate(self):
         """
@@ -1270,7 +1332,55 @@ class RigidBody(AuxiliaryVariables.AV_base):
 
 
 
-def assembleDomain(domain):
+class VertexHash(object):
+    """
+    Spatial hash of vertices, used by assembleDomain to find in constant time
+    whether a vertex is already in the domain
+
+    Vertices are binned in cubic cells of size tol, so that a vertex closer
+    than tol to another is in the same or in a neighbouring cell. With tol=0,
+    vertices are hashed by their exact coordinates.
+
+    :param tol: merging distance (float)
+    """
+
+    def __init__(self, tol=0.):
+        self.tol = tol
+        self.cells = {}
+
+    def _cell(self, vertex):
+        return tuple(int(c) for c in np.floor(np.asarray(vertex)/self.tol))
+
+    def add(self, vertex, index):
+        """
+        Adds a vertex with its index in the domain
+        """
+        if self.tol > 0:
+            self.cells.setdefault(self._cell(vertex), []).append(
+                (index, np.asarray(vertex, dtype=float)))
+        else:
+            self.cells.setdefault(tuple(vertex), index)
+
+    def find(self, vertex):
+        """
+        Index of the first vertex added within tol of vertex, None if there
+        is none
+        """
+        if self.tol <= 0:
+            return self.cells.get(tuple(vertex))
+        vertex = np.asarray(vertex, dtype=float)
+        cell = self._cell(vertex)
+        found = None
+        for offset in product((-1, 0, 1), repeat=len(cell)):
+            key = tuple(c+o for c, o in zip(cell, offset))
+            for index, other in self.cells.get(key, ()):
+                if (np.linalg.norm(other-vertex) <= self.tol and
+                        (found is None or index < found)):
+                    found = index
+        return found
+
+
+def assembleDomain(domain, tol=0.):
     """
     This function sets up everything needed for the domain, meshing, and
     AuxiliaryVariables calculations (if any).
@@ -1278,6 +1388,9 @@ def assembleDomain(domain):
     to be attached to the domain.
 
     :param domain: domain to assemble
+    :param tol: distance below which a vertex of a shape is merged with a
+                vertex of a previous shape (float); 0 merges identical
+                vertices only
     """
     # reinitialize geometry of domain
     domain.vertices = []
@@ -1298,6 +1411,8 @@ def assembleDomain(domain):
     start_flag = 0
     start_vertex = 0
     zones_global = {}
+    vertex_hash = VertexHash(tol)
+    merged = 0
     for shape in domain.shape_list:
         # --------------------------- #
         # ----- DOMAIN GEOMETRY ----- #
@@ -1310,44 +1425,36 @@ def assembleDomain(domain):
         else:
             start_rflag = 0
         domain.bc += shape.BC_list
-        vertices = shape.vertices.copy()
-        verticesFlags = shape.vertexFlags.copy()
-        if shape.segments is not None:
-            segments = shape.segments.copy()
-        if shape.facets is not None:
-            facets = shape.facets.copy()
-        del_v = 0
-        print(shape.name)
-        print(shape.segments)
-        print(start_vertex)
-        for i_s, vertex in enumerate(shape.vertices):
-            if vertex.tolist() in domain.vertices:
-                vertices = np.delete(vertices, i_s-del_v, axis=0)
-                verticesFlags = np.delete(verticesFlags, i_s-del_v)
-                i_s -= del_v
-                del_v += 1
-                i_d = domain.vertices.index(vertex.tolist())
-                if shape.segments is not None:
-                    for i in np.nditer(segments, op_flags=['readwrite']):
-                        if i > i_s:
-                            i[...] -= 1
-                        elif i == i_s:
-                            i[...] = i_d-start_vertex
-                if shape.facets is not None:
-                    for i in np.nditer(facets, op_flags=['readwrite']):
-                        if i > i_s:
-                            i[...] -= 1
-                        elif i == i_s:
-                            i[...] = i_d-start_vertex
-        domain.vertices += vertices.tolist()
-        domain.vertexFlags += (verticesFlags+start_flag).tolist()
+        vertices = np.asarray(shape.vertices)
+        # global index of every vertex of the shape: vertices already in the
+        # domain (previous shapes) are merged with the first of them, the
+        # others are appended in order
+        remap = np.zeros(len(vertices), dtype=int)
+        keep = np.ones(len(vertices), dtype=bool)
+        for i_s, vertex in enumerate(vertices):
+            i_d = vertex_hash.find(vertex)
+            if i_d is not None:
+                remap[i_s] = i_d
+                keep[i_s] = False
+        nkeep = np.count_nonzero(keep)
+        remap[keep] = start_vertex+np.arange(nkeep)
+        for i_s, vertex in zip(remap[keep], vertices[keep]):
+            vertex_hash.add(vertex, i_s)
+        merged += len(vertices)-nkeep
+        log("assembleDomain: %s, %d vertices, %d merged with previous shapes"
+            % (shape.name, len(vertices), len(vertices)-nkeep))
+        domain.vertices += vertices[keep].tolist()
+        domain.vertexFlags += (np.asarray(shape.vertexFlags)[keep] +
+                               start_flag).tolist()
         barycenters = np.array([shape.barycenter for bco in shape.BC_list])
         domain.barycenters = np.append(domain.barycenters, barycenters, axis=0)
         if shape.segments is not None:
-            domain.segments += (segments+start_vertex).tolist()
+            domain.segments += remap[np.asarray(shape.segments,
+                                                dtype=int)].tolist()
             domain.segmentFlags += (shape.segmentFlags+start_flag).tolist()
         if shape.facets is not None:
-            domain.facets += (facets+start_vertex).tolist()
+            domain.facets += remap[np.asarray(shape.facets,
+                                              dtype=int)].tolist()
             domain.facetFlags += (shape.facetFlags+start_flag).tolist()
         if shape.regions is not None:
             domain.regions += (shape.regions).tolist()
@@ -1393,6 +1500,8 @@ def assembleDomain(domain):
                 # update dict with global key instead of local key
                 key = flag+start_rflag
                 zones_global[key] = zone
+    log("assembleDomain: %d vertices, %d merged"
+        % (len(domain.vertices), merged))
     # --------------------------- #
     # ----- MESH GENERATION ----- #
     # --------------------------- #
@@ -1408,5 +1517,17 @@ def assembleDomain(domain):
         (mesh.triangleOptions, domain.polyfile+".poly"))
 
 
+def constantAcceleration(velocity, acceleration, dt):
+    """
+    Exact motion over dt with a constant acceleration
+
+    :param velocity: velocity at the start of the step (array)
+    :param acceleration: acceleration during the step (array)
+    :param dt: duration of the step (float)
+    :return: velocity at the end of the step, displacement (arrays)
+    """
+    return velocity+acceleration*dt, velocity*dt+0.5*acceleration*dt**2
+
+
 def get_unit_vector(vector):
     return np.array(vector)/np.linalg.norm(vector)
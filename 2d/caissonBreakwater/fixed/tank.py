@@ -44,6 +44,9 @@ opts=Context.Options([
     ("useVF", 0.0, "For density and viscosity smoothing"),
     ('movingDomain', not True, "Moving domain and mesh option"),
     ('conservativeFlux', not True,'Fix post-processing velocity bug for porous interface'),
+    # checkpoints
+    ("checkpoint", False, "Save checkpoints of the caisson and gauges at every output time (see tools/RestartTools.py)"),
+    ("restart", False, "Restart from the last checkpoint, with the hot start of proteus (parun -H)"),
     ])
 
 
@@ -534,6 +537,27 @@ T = T
 nDTout= int(round(T/dt_fixed))
 runCFL = opts.cfl
 
+#----------------------------------------------------
+# Checkpoints
+#----------------------------------------------------
+if opts.checkpoint or opts.restart:
+    import os, sys
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../..'))
+    from proteus import Comm
+    from tools import RestartTools as rt
+    gauge_files = ['pressureProbes.csv', 'waveProbes.csv']
+    if opts.caisson:
+        gauge_files += ['overtoppingVelGauges.csv', 'overtoppingVofGauges.csv',
+                        'loadingGauges.csv']
+    checkpointer = rt.Checkpointer([dt_init]+[dt_init+i*dt_fixed for i in range(1,nDTout+1)],
+                                   gauges=gauge_files, comm=Comm.get())
+    for aux in domain.auxiliaryVariables:
+        if isinstance(aux, st.RigidBody):
+            checkpointer.register('caisson', aux)
+    if opts.restart:
+        checkpointer.restore()
+    domain.auxiliaryVariables.append(checkpointer)
+
 #----------------------------------------------------
 #  Discretization -- input options
 #----------------------------------------------------
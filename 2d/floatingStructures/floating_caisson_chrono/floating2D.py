@@ -5,6 +5,9 @@ from proteus.Profiling import logEvent
 from proteus.mbd import ChRigidBody as crb
 from math import *
 import numpy as np
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../..'))
+from tools import FentonTools as ft
 
 
 opts=Context.Options([
@@ -83,29 +86,20 @@ if opts.waves is True:
         BCoeffs = np.zeros(3)
         YCoeffs = np.zeros(3)
     if opts.wave_type == 'Fenton':
-        import Fenton
         if opts.w:
             period = 2*np.pi/opts.w
         else:
             period = 2*np.pi/np.sqrt(opts.eps*2*9.81/0.5)
-        comm = Comm.get()
-        if comm.isMaster():
-            Fenton.writeInput(height, depth, period)
-            Fenton.runFourier()
-        comm.barrier()
-        BCoeffs, YCoeffs = Fenton.getBYCoeffs()
+        # solved by ./Fourier on the master only the first time this wave is
+        # used, then read from the coefficient cache (see tools/FentonTools.py)
+        fenton = ft.fentonCoefficients(height, depth, period, comm=Comm.get())
+        BCoeffs, YCoeffs = fenton['B'], fenton['Y']
+        period = fenton['period']
+        wavelength = fenton['wavelength']
         logEvent("BCOEFFS: "+str(BCoeffs))
         logEvent("YCOEFFS: "+str(YCoeffs))
-        with open('Solution.res', 'r') as f:
-            for line in f:
-                if 'Wave period' in line:
-                    words = line.split()
-                    period = float(words[5])/np.sqrt(9.81/depth)
-                if 'Wave length' in line:
-                    words = line.split()
-                    wavelength = float(words[5])*depth
-                    logEvent("PERIOD: "+str(period))
-                    logEvent("WAVELENGTH: "+str(wavelength))
+        logEvent("PERIOD: "+str(period))
+        logEvent("WAVELENGTH: "+str(wavelength))
         #getFFT.copyFiles()
     wave = wt.MonochromaticWaves(period=period, waveHeight=height, mwl=mwl, depth=depth,
                                 g=np.array([0., -9.81, 0.]), waveDir=direction,
@@ -9,6 +9,9 @@ from proteus import (Domain, Context,
                      WaveTools as wt)
 from proteus.mprans import SpatialTools as st
 from proteus.Profiling import logEvent
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../..'))
+from tools import MeshCache as mc
 from proteus.ctransportCoefficients import smoothedHeaviside
 from proteus.ctransportCoefficients import smoothedHeaviside_integral
 
@@ -42,6 +45,7 @@ opts = Context.Options([
     ("dt_init", 0.001, "Initial time step in s"),
     # run details
     ("gen_mesh", True, "Generate new mesh"),
+    ("mesh_cache", False, "Reuse the mesh of a previous run with identical geometry and mesh options (see tools/MeshCache.py)"),
     ("useHex", False, "Use (hexahedral) structured mesh"),
     ("structured", False, "Use (triangular/tetrahedral) structured mesh"),
     ("nperiod", 10., "Number of time steps to save per period"),
@@ -255,6 +259,9 @@ if opts.column_gauge_output:
 
 domain.MeshOptions.he = he
 st.assembleDomain(domain)
+if opts.mesh_cache and opts.gen_mesh:
+    from proteus import Comm
+    mc.useMeshCache(domain, comm=Comm.get())
 
 # ----- STRONG DIRICHLET ----- #
 
@@ -6,6 +6,9 @@ from proteus.mprans import SpatialTools as st
 from proteus import WaveTools as wt
 import math
 import numpy as np
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../..'))
+from tools import MeshCache as mc
 
 opts=Context.Options([
     # predefined test cases
@@ -44,6 +47,7 @@ opts=Context.Options([
     ("refinement_grading", np.sqrt(1.1*4./np.sqrt(3.))/np.sqrt(1.*4./np.sqrt(3)), "Grading of refinement/coarsening (default: 10% volume)"),
     # numerical options
     ("gen_mesh", True, "True: generate new mesh every time. False: do not generate mesh if file exists"),
+    ("mesh_cache", False, "Reuse the mesh of a previous run with identical geometry and mesh options (see tools/MeshCache.py)"),
     ("use_gmsh", False, "True: use Gmsh. False: use Triangle/Tetgen"),
     ("movingDomain", False, "True/False"),
     ("T", 0.1, "Simulation time in s"),
@@ -189,6 +193,8 @@ from proteus import Comm
 comm = Comm.get()
 if domain.use_gmsh is True:
     mr.writeGeo(domain, 'mesh', append=False)
+if opts.mesh_cache and opts.gen_mesh:
+    mc.useMeshCache(domain, comm=comm)
 
 
 
@@ -6,6 +6,9 @@ import matplotlib.pyplot as plt
 import nonlinear_waves as nlw
 from proteus import WaveTools as wt
 from AnalysisTools import signalFilter,zeroCrossing,reflStat
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../..'))
+from tools.GaugeTools import readProbeFile
 
 #####################################################################################
 
@@ -14,30 +17,6 @@ folder = "output"
 os.chdir(folder)
 file_vof = 'column_gauges.csv'
 
-def readProbeFile(filename):
-    with open (filename, 'rb') as csvfile:
-        data=np.loadtxt(csvfile, delimiter=",",skiprows=1)
-        time=data[:,0]
-        data = data[:,1:]
-        csvfile.seek(0)
-        header = csvfile.readline()
-        header = header.replace("time","")
-        header = header.replace("[","")
-        header = header.replace("]","")
-        header = header.replace(","," ")
-        header = header.split()
-        probeType = []
-        probex = []
-        probey = []
-        probez = []        
-        for ii in range(0,len(header),4):
-            probeType.append(header[ii])
-            probex.append(float(header[ii+1]))
-            probey.append(float(header[ii+2]))
-            probez.append(float(header[ii+3]))
-        probeCoord = zip(np.array(probex),np.array(probey),np.array(probez))
-        datalist = [probeType,probeCoord,time,data]
-        return datalist
 
 data_vof = readProbeFile(file_vof)
 
@@ -114,15 +93,14 @@ minf = 1./bf/T
 maxf = bf / T
 dx_array = nlw.opts.gauge_dx
 Narray = int(round(L/6/dx_array))
-data = np.zeros((len(data1),3))
-zc = []
-for ii in range(0,3):
-    data1[:,i_mid+ii*Narray] = np.interp(time_int,time,dataW[3][:,i_mid+ii*Narray])
-    data[:,ii] = signalFilter(time,data1[:,i_mid+ii*Narray],minf, maxf, 1.1*maxf, 0.9*minf)
-    zc.append(zeroCrossing(time,data[:,ii]))
-H1 = zc[0][1]
+cols = [i_mid+ii*Narray for ii in range(0,3)]
+for ii in cols:
+    data1[:,ii] = np.interp(time_int,time,dataW[3][:,ii])
+data = signalFilter(time,data1[:,cols],minf, maxf, 1.1*maxf, 0.9*minf)
+zc = zeroCrossing(time,data)
+H1 = zc[1][0]
 H2 = zc[1][1]
-H3 = zc[2][1]
+H3 = zc[1][2]
 HH = reflStat(H1,H2,H3,Narray*dx_array,L)[0]
 RR = reflStat(H1,H2,H3,Narray*dx_array,L)[2]
 print "RR = ", RR
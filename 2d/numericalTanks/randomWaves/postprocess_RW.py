@@ -4,6 +4,11 @@ import os
 import matplotlib.pyplot as plt
 import random_waves as rw
 import numpy as np
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../..'))
+from tools.GaugeCache import readProbeFile
+from tools.WaveKinematics import spectralEta, stepSum
+from tools import SpectralTools as spt
 
 #####################################################################################
 
@@ -15,30 +20,6 @@ file_p = 'pressure_gaugeArray.csv'
 file_s='../series.txt'
 eta_v= np.loadtxt(file_s)
 
-def readProbeFile(filename):
-    with open (filename, 'rb') as csvfile:
-        data = np.loadtxt(csvfile, delimiter=",",skiprows=1)
-        time = data[:,0]
-        data = data[:,1:]
-        csvfile.seek(0)
-        header = csvfile.readline()
-        header = header.replace("time","")
-        header = header.replace("[","")
-        header = header.replace("]","")
-        header = header.replace(","," ")
-        header = header.split()
-        probeType = []
-        probex = []
-        probey = []
-        probez = []        
-        for ii in range(0,len(header),4):
-            probeType.append(header[ii])
-            probex.append(float(header[ii+1]))
-            probey.append(float(header[ii+2]))
-            probez.append(float(header[ii+3]))
-        probeCoord = zip(np.array(probex),np.array(probey),np.array(probez))
-        datalist = [probeType,probeCoord,time,data]
-        return datalist
 
 data_vof = readProbeFile(file_vof)
 data_p = readProbeFile(file_p)
@@ -64,8 +45,7 @@ bandFactor = rw.bandFactor
 spectName =  rw.spectName
 phi = rw.phi
 wave_ref = rw.wt.RandomWaves(Tp,Hs,mwl,depth,waveDir,g,N,bandFactor,spectName,spectral_params=None,phi=phi,fast=True)
-eta_bc = rw.tank.BC['x-'].vof_dirichlet.uOfXT
-zin = np.linspace(rw.he/2,rw.tank_dim[1]-rw.he/2,rw.tank_dim[1]/rw.he)
+zin = np.linspace(rw.he/2,rw.tank_dim[1]-rw.he/2,int(round(rw.tank_dim[1]/rw.he)))
 
 Tstart = rw.Tstart
 Tend = rw.Tend
@@ -73,19 +53,16 @@ x0 = rw.x0
 Lgen = np.array([0., 0., 0.])
 
 X = np.array([0., 0., 0.])
-eta_ref = []
-eta_bca = []
-
-for i in range(0,len(time)):
-    eta_ref.append(wave_ref.eta(X,time[i]))
-    aa = 0.
-    for ii in range(len(zin)):
-        xx = np.array([x0[0],zin[ii],x0[1]])
-        aa += rw.he*eta_bc(xx,time[i])
-    eta_bca.append(tank_dim[1]-waterLevel -aa)
+# all the output times at once from the spectral components of the waves
+eta_ref = spectralEta(X, time, wave_ref.ai, wave_ref.kDir, wave_ref.omega, wave_ref.phi)
 
-eta_ref = np.array(eta_ref)
-eta_bca = np.array(eta_bca)
+# vof of the inlet given by the bc module (vof_dirichlet of
+# setUnsteadyTwoPhaseVelocityInlet), integrated over the column of cells; the
+# vof is 0 in the water and 1 in the air, so it is only evaluated around the
+# free surface (see stepSum)
+eta_bc = rw.tank.BC['x-'].vof_dirichlet.uOfXT
+eta_bca = np.array([tank_dim[1]-waterLevel-rw.he*stepSum(lambda i: eta_bc(np.array([x0[0], zin[i], x0[1]]), t), len(zin))
+                    for t in time])
 
 #####################################################################################
 
@@ -108,18 +85,26 @@ plt.savefig('eta_RW.png')
 
 # Validation of the results
 
-S = 0.
-c = 0.
-for i in range(len(time)):
-    c += 1.
-    S += (eta_fast[i]-eta_ref[i])**2
-err = np.sqrt(S/c)
+err = np.sqrt(np.mean((eta_fast-eta_ref)**2))
 err = 100*err/(rw.opts.Hs)
 val = open('validation_eta_RW.txt', 'w')
 val.write('Surface elevation against time for the random waves'+'\n')
 val.write('Gauges taken between 0s and 30s'+'\n')
 val.write('Average error (%) between the theoretical function and the simulation:'+'\n')
 val.write(str(err))
+
+# Spectral validation in the band of the waves: Welch spectrum of the gauge
+# (resampled at the mean time step) against the JONSWAP target
+dt = (time[-1]-time[0])/(len(time)-1)
+time_u = np.arange(time[0], time[-1], dt)
+freq, psd = spt.welch(np.interp(time_u, time, eta_fast), dt, nperseg=int(16*Tp/dt))
+band = (1./(rw.bandFactor*Tp), rw.bandFactor/Tp)
+params = spt.spectralParameters(freq, psd, *band)
+target = spt.jonswap(freq, Tp, Hs)
+val.write('\n'+'Spectral parameters of the gauge (target Hs=%g, Tp=%g):' % (Hs, Tp)+'\n')
+val.write('Hm0=%g Tp=%g Tm01=%g' % (params['Hm0'], params['Tp'], params['Tm01'])+'\n')
+val.write('Relative L2 error between the spectrum and the JONSWAP target:'+'\n')
+val.write(str(spt.spectralError(freq, psd, target, *band)))
 val.close()
 
 
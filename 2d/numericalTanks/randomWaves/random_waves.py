@@ -9,6 +9,10 @@ from proteus import (Domain, Context,
                      WaveTools as wt)
 from proteus.mprans import SpatialTools as st
 from proteus.Profiling import logEvent
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../..'))
+from tools import MeshCache as mc
+from tools import RestartTools as rt
 from proteus.ctransportCoefficients import smoothedHeaviside
 from proteus.ctransportCoefficients import smoothedHeaviside_integral
 
@@ -42,9 +46,13 @@ opts = Context.Options([
     ("dt_init", 0.001, "Initial time step"),
     # run details
     ("gen_mesh", True, "Generate new mesh"),
+    ("mesh_cache", False, "Reuse the mesh of a previous run with identical geometry and mesh options (see tools/MeshCache.py)"),
     ("useHex", False, "Use (hexahedral) structured mesh"),
     ("structured", False, "Use (triangular/tetrahedral) structured mesh"),
     ("nperiod", 10., "Number of time steps to save per period"),
+    # checkpoints
+    ("checkpoint", False, "Save checkpoints of the gauges at every output time (see tools/RestartTools.py)"),
+    ("restart", False, "Restart from the last checkpoint, with the hot start of proteus (parun -H)"),
     ])
 
 # ----- CONTEXT ------ #
@@ -269,6 +277,21 @@ if opts.column_gauge_output:
 
 domain.MeshOptions.he = he
 st.assembleDomain(domain)
+if opts.mesh_cache and opts.gen_mesh:
+    from proteus import Comm
+    mc.useMeshCache(domain, comm=Comm.get())
+if opts.checkpoint or opts.restart:
+    from proteus import Comm
+    gauge_files = []
+    if opts.point_gauge_output:
+        gauge_files.append('pressure_gaugeArray.csv')
+    if opts.column_gauge_output:
+        gauge_files.append('column_gauges.csv')
+    checkpointer = rt.Checkpointer([dt_init]+[dt_init+i*dt_out for i in range(1, nDTout+1)],
+                                   gauges=gauge_files, comm=Comm.get())
+    if opts.restart:
+        checkpointer.restore()
+    domain.auxiliaryVariables['twp'].append(checkpointer)
 
 # ----- STRONG DIRICHLET ----- #
 
@@ -5,6 +5,9 @@ import matplotlib.pyplot as plt
 import random_waves as rw
 import numpy as np
 from AnalysisTools import signalFilter,zeroCrossing,reflStat
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../..'))
+from tools.GaugeCache import readProbeFile
 
 
 #####################################################################################
@@ -16,30 +19,6 @@ file_vof = 'column_gauges.csv'
 file_p = 'pressure_gaugeArray.csv'
 file_s='../series.txt'
 #eta_v= np.loadtxt(file_s)
-def readProbeFile(filename):
-    with open (filename, 'rb') as csvfile:
-        data = np.loadtxt(csvfile, delimiter=",",skiprows=1)
-        time = data[:,0]
-        data = data[:,1:]
-        csvfile.seek(0)
-        header = csvfile.readline()
-        header = header.replace("time","")
-        header = header.replace("[","")
-        header = header.replace("]","")
-        header = header.replace(","," ")
-        header = header.split()
-        probeType = []
-        probex = []
-        probey = []
-        probez = []        
-        for ii in range(0,len(header),4):
-            probeType.append(header[ii])
-            probex.append(float(header[ii+1]))
-            probey.append(float(header[ii+2]))
-            probez.append(float(header[ii+3]))
-        probeCoord = zip(np.array(probex),np.array(probey),np.array(probez))
-        datalist = [probeType,probeCoord,time,data]
-        return datalist
 
 data_vof = readProbeFile(file_vof)
 data_p = readProbeFile(file_p)
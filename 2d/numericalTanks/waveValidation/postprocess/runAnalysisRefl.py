@@ -1,6 +1,9 @@
-import AnalysisTools as AT
 import os
+import sys
 import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../../..'))
+from tools.GaugeCache import readProbeFile
+from tools import ReflectionTools as rt
 print "Reading generation probes"
 
 
@@ -13,7 +16,7 @@ depth = 1.
 L = 5.
 folder = "../output"
 os.chdir(folder)
-dataW = AT.readProbeFile("pressure_gaugeArray.csv")
+dataW = readProbeFile("pressure_gaugeArray.csv")
 
 print dataW[1]
 Z= -depth + dataW[1][0][1]
@@ -25,30 +28,20 @@ Tstart = Tend-Nwaves*T
 
 print Tstart,Tend,Z
 
-Ht = 0
-Hi = 0
 bf = 1.2
 
-zc =[]
-for dd in range(0,len(dataW[3][0,:])):
-    dat = AT.zeroCrossing(dataW[2],dataW[3][:,dd],Tstart, Tend,minfreq=1/(bf*T),maxfreq=(bf/T))
-    dat[1]=AT.pressureToHeight(dat[1],Z,depth,L,998.2,9.81)
-
-    zc.append(dat)
+time = dataW[2]
+window = (time >= Tstart) & (time <= Tend)
+x = np.array([coords[0] for coords in dataW[1]])
 
 dx_array = dataW[1][1][0]-dataW[1][0][0]          
 print dx_array
 Narray =int(round(L/6./dx_array))
-RR = []
-HH=[]
-for dd in range(0,len(dataW[3][0,:])-2*Narray):
-    dd1 = dd + Narray
-    dd2 = dd1 + Narray
-    H1 = zc[dd][1]
-    H2 = zc[dd1][1]
-    H3 = zc[dd2][1]
-    HH.append(AT.reflStat(H1,H2,H3,Narray*dx_array,L)[0])
-    RR.append(AT.reflStat(H1,H2,H3,Narray*dx_array,L)[2])
+windows = rt.slidingWindows(len(x), Narray)
+refl = rt.reflectionAnalysis(time[window], dataW[3][window], x, depth, windows,
+                             fmin=1/(bf*T), fmax=bf/T, z=Z, rho=998.2, g=9.81)
+HH = refl['Hi']
+RR = refl['Kr']
 
 print np.mean(HH[21:])
 print np.mean(RR[21:])
@@ -4,6 +4,9 @@ import os
 import matplotlib.pyplot as plt
 import submerged_breakwater as sbw
 from AnalysisTools import zeroCrossing
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../..'))
+from tools.GaugeTools import readProbeFile
 
 #####################################################################################
 
@@ -12,30 +15,6 @@ folder = "output"
 os.chdir(folder)
 file_vof = 'line_integral_gauges_1.csv'
 
-def readProbeFile(filename):
-    with open (filename, 'rb') as csvfile:
-        data=np.loadtxt(csvfile, delimiter=",",skiprows=1)
-        time=data[:,0]
-        data = data[:,1:]
-        csvfile.seek(0)
-        header = csvfile.readline()
-        header = header.replace("time","")
-        header = header.replace("[","")
-        header = header.replace("]","")
-        header = header.replace(","," ")
-        header = header.split()
-        probeType = []
-        probex = []
-        probey = []
-        probez = []        
-        for ii in range(0,len(header),4):
-            probeType.append(header[ii])
-            probex.append(float(header[ii+1]))
-            probey.append(float(header[ii+2]))
-            probez.append(float(header[ii+3]))
-        probeCoord = zip(np.array(probex),np.array(probey),np.array(probez))
-        datalist = [probeType,probeCoord,time,data]
-        return datalist
 
 data_vof = readProbeFile(file_vof)
 
@@ -76,9 +55,6 @@ plt.savefig('eta.png')
 #####################################################################################
 
 # Transmission coefficient
-zc = []
-for i in range(len(ETA)):
-    zc.append(zeroCrossing(time,ETA[i]))
-zc = np.array(zc)
+zc = np.array(zeroCrossing(time,np.transpose(ETA))).T
 K = np.mean(zc[2:][:,1])/sbw.opts.wave_height
 print 'Transmission coefficient'+'\t'+'='+'\t'+str(K)
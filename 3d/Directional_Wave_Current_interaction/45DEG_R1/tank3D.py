@@ -7,6 +7,9 @@ from proteus.ctransportCoefficients import smoothedHeaviside
 from proteus.ctransportCoefficients import smoothedHeaviside_integral
 from proteus import Gauges
 from proteus.Gauges import PointGauges,LineGauges,LineIntegralGauges
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../..'))
+from tools.WaveKinematics import FourierWave
 
 #wave generator
 windVelocity = (0.0,0.0,0.0)
@@ -408,27 +411,21 @@ h = inflowHeightMean # - transect[0][1] if lower left hand corner is not at z=0
 
 Y =  [0.01227860,     0.00006355]  #Surface elevation Fourier coefficients for non-dimensionalised solution, calculated from FFT
       
-def waveHeight(x,t):
-   waterDepth = inflowHeightMean 
-   for i in range(0,int(len(Y))):  
-       waterDepth += Y[i]*cos((i+1)*theta(x,t))/k
-   return waterDepth*ramp(t)
- 
 B = [0.01089188,     0.00014504,     0.00000206,     0.00000003]  #Velocities Fourier coefficients for non-dimensionalised solution, calculated from FFT
 
+# harmonics and cosh((i+1)*k*h) computed once, all harmonics evaluated at once
+wave = FourierWave(k, omega, h, Y, B, g=g[2],
+                   meanVelocity=wavelength/period-meanFrameVelocity,
+                   phase=math.pi/2.0)
+
+def waveHeight(x,t):
+   return wave.eta(x,t)*ramp(t)
+
 def waveVelocity_u(x,t):
-   wu = wavelength/period-meanFrameVelocity
-   for i in range(0,int(len(B))): 
-     wu += sqrt(abs(g[2])/k)*(i+1)*B[i]*cosh((i+1)*k*(z(x)+h))/cosh((i+1)*k*h)*cos((i+1)*theta(x,t))
-    
-   return wu*ramp(t)
+   return wave.kinematics(x,t)[1]*ramp(t)
 
 def waveVelocity_v(x,t):
-   wv=0
-   for i in range(0,int(len(B))): 
-     wv += sqrt(abs(g[2])/k)*(i+1)*B[i]*sinh((i+1)*k*(z(x)+h))/cosh((i+1)*k*h)*sin((i+1)*theta(x,t)) 
-
-   return wv*ramp(t)
+   return wave.kinematics(x,t)[2]*ramp(t)
    
 
 #solution variables
@@ -440,15 +437,15 @@ def waveVF(x,t):
     return smoothedHeaviside(epsFact_consrv_heaviside*he,wavePhi(x,t))
 
 def twpflowVelocity_u(x,t):
-    waterspeed = waveVelocity_u(x,t)
-    H = smoothedHeaviside(epsFact_consrv_heaviside*he,wavePhi(x,t)-epsFact_consrv_heaviside*he)
-    u = H*windVelocity[0] + (1.0-H)*waterspeed
+    eta, waterspeed, wv = wave.kinematics(x,t)
+    H = smoothedHeaviside(epsFact_consrv_heaviside*he,x[2]-eta*ramp(t)-epsFact_consrv_heaviside*he)
+    u = H*windVelocity[0] + (1.0-H)*waterspeed*ramp(t)
     return u
 
 def twpflowVelocity_v(x,t):
-    waterspeed = waveVelocity_v(x,t)
-    H = smoothedHeaviside(epsFact_consrv_heaviside*he,wavePhi(x,t)-epsFact_consrv_heaviside*he)
-    return H*windVelocity[1]+(1.0-H)*waterspeed
+    eta, wu, waterspeed = wave.kinematics(x,t)
+    H = smoothedHeaviside(epsFact_consrv_heaviside*he,x[2]-eta*ramp(t)-epsFact_consrv_heaviside*he)
+    return H*windVelocity[1]+(1.0-H)*waterspeed*ramp(t)
 
 def twpflowVelocity_w(x,t):
     return 0.0
@@ -11,6 +11,10 @@ from proteus import Context
 from proteus.WaveTools import TimeSeries
 from proteus.Domain import InterpolatedBathymetryDomain, PiecewiseLinearComplexDomain
 from proteus.MeshTools import InterpolatedBathymetryMesh
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from tools import BathymetryTools as bt
+from tools import RestartTools as rt
 
 comm = Comm.init()
 opts=Context.Options([
@@ -21,7 +25,10 @@ opts=Context.Options([
     ("peak_period2", 6.0, "Second peak period (only used in double-peaked case)[s]"),
     ("peak_wavelength",10.0,"Peak wavelength in [m]"),
     ("parallel", True, "Run in parallel"),
-    ("gauges", False, "Enable gauges")])
+    ("gauges", False, "Enable gauges"),
+    # checkpoints
+    ("checkpoint", False, "Save checkpoints at every output time (see tools/RestartTools.py)"),
+    ("restart", False, "Restart from the last checkpoint, with the hot start of proteus (parun -H)")])
 
 # Wave generator
 windVelocity = [0., 0., 0.]
@@ -34,6 +41,9 @@ amplitude = waveheight/2.0
 wavelength = opts.peak_wavelength
 k = -2.0*math.pi/wavelength
 
+# FRF survey of the bathymetry
+bathyFile = "FRF_FRF_20150915_1116_NAVD88_LARC_GPS_UTC.csv"
+
 
 # Discretization -- input options
 genMesh = True #False
@@ -112,13 +122,15 @@ if genMesh:
         hex=True
         domain = Domain.RectangularDomain(L)
     else:
-        bathy=np.genfromtxt("FRF_FRF_20150915_1116_NAVD88_LARC_GPS_UTC.csv", delimiter=",",skiprows=1)
-        xmax=bathy[:,7].max()
-        xmin=bathy[:,7].min()
-        ymax=bathy[:,8].max()
-        ymin=bathy[:,8].min()
-        zmax=bathy[:,9].max()
-        zmin=bathy[:,9].min()
+        # survey points (x, y, z), parsed once by the master into a binary
+        # store (.csv.npy) that every process memory-maps
+        bathy = bt.loadBathymetry(bathyFile, comm=comm)
+        xmax=bathy[:,0].max()
+        xmin=bathy[:,0].min()
+        ymax=bathy[:,1].max()
+        ymin=bathy[:,1].min()
+        zmax=bathy[:,2].max()
+        zmin=bathy[:,2].min()
         
         #reset to domain of interest
         xmin = 60.0 #425.0
@@ -131,7 +143,7 @@ if genMesh:
         #
         #process 2D domain
         #
-        bathy_points = np.vstack((bathy[:,7],bathy[:,8],bathy[:,9])).transpose()
+        bathy_points = np.array(bathy)
         domain2D = InterpolatedBathymetryDomain(vertices=[[xmin,ymin],[xmin,ymax],[xmax,ymax],[xmax,ymin]],
                                               vertexFlags=[boundaryTags['left'],boundaryTags['left'],boundaryTags['right'],boundaryTags['right']],
                                               segments=[[0,1],[1,2],[2,3],[3,0]],
@@ -157,62 +169,12 @@ if genMesh:
         # Done processing 2D
         #
         fineMesh = mesh2D.meshList[-1]
-        newNodes = {}
-        verticalEdges = {}
-        nN_start = fineMesh.nodeArray.shape[0]
-        nN = nN_start
         zTop = max(fineMesh.nodeArray[:,2].max(),fineMesh.nodeArray[:,2].min()+depth+2*waveheight)
-        for nN_bottom, n,f in zip(range(nN_start), fineMesh.nodeArray, fineMesh.nodeMaterialTypes):
-            if f > 0:
-                newNodes[nN] = (n[0],n[1],zTop)
-                verticalEdges[nN_bottom] = nN
-                nN += 1
-        newFacets = []
-        newFacetFlags = []
-        for t in fineMesh.elementNodesArray:
-            newFacets.append([[t[0],t[1],t[2]]])
-            newFacetFlags.append(6)
-        topConnectivity = {}
-        for edge, edgeF in zip(fineMesh.elementBoundaryNodesArray, fineMesh.elementBoundaryMaterialTypes):
-            if edgeF > 0:
-                n00 = edge[0]
-                n10 = edge[1]
-                n11 = verticalEdges[edge[1]]
-                n01 = verticalEdges[edge[0]]
-                newFacets.append([[n00,
-                                  n10,
-                                  n11,
-                                  n01]])
-                newFacetFlags.append(edgeF)
-                if topConnectivity.has_key(n11):
-                    topConnectivity[n11].append(n01)
-                else:
-                    topConnectivity[n11] = [n01]
-                if topConnectivity.has_key(n01):
-                    topConnectivity[n01].append(n11)
-                else:
-                    topConnectivity[n01] = [n11]
-        topFacet = [topConnectivity[nN_start][0],nN_start,topConnectivity[nN_start][1]]
-
-        while len(topFacet) < len(newNodes):
-            nN = topFacet[-1]
-            if topFacet[-2] == topConnectivity[nN][0]:
-                topFacet.append(topConnectivity[nN][1])
-            else:
-                topFacet.append(topConnectivity[nN][0])
-        newFacets.append([topFacet])
-        newFacetFlags.append(5)
-        newVertices = []
-        newVertexFlags = []
-        for n,nF in zip(fineMesh.nodeArray, fineMesh.nodeMaterialTypes):
-            newVertices.append([n[0],n[1],n[2]])
-            if nF > 0:
-                newVertexFlags.append(nF)
-            else:
-                newVertexFlags.append(6)
-        for nN in range(len(newNodes.keys())):
-            newVertices.append(newNodes[nN+nN_start])
-            newVertexFlags.append(5)
+        # extrude the 2D mesh to zTop: bottom facets (flag 6), vertical
+        # facets of the boundary edges and top facet (flag 5)
+        newVertices, newVertexFlags, newFacets, newFacetFlags = bt.extrudeMesh(fineMesh, zTop, bottomFlag=6, topFlag=5)
+        newVertices = newVertices.tolist()
+        newVertexFlags = newVertexFlags.tolist()
         xmin_new = fineMesh.nodeArray[:,0].min()
         xmax_new = fineMesh.nodeArray[:,0].max()
         ymin_new = fineMesh.nodeArray[:,1].min()
@@ -259,6 +221,15 @@ dt_init = 0.001
 runCFL=0.33
 nDTout = int(round(T/dt_fixed))
 
+# checkpoints at the output times of tank3D_so.tnList; the case writes no
+# gauge files and has no bodies, the fields are restarted by parun -H
+checkpointer = None
+if opts.checkpoint or opts.restart:
+    checkpointer = rt.Checkpointer([dt_init]+[i*dt_fixed for i in range(1, nDTout+1)],
+                                   comm=comm)
+    if opts.restart:
+        checkpointer.restore()
+
 
 # Numerical parameters
 ns_forceStrongDirichlet = False#True
@@ -374,6 +345,13 @@ domain_vertices = numpy.array(domain.vertices)
 h = inflowHeightMean - domain_vertices[:,2].min()# - transect[0][1] if lower left hand corner is not at z=0
 sigma = omega - k*inflowVelocityMean[0]
 
+# water depth at the wave generator (middle of the right boundary, offshore),
+# interpolated from the survey points, for the kinematics of the inflow
+bathymetry = bt.BathymetryIndex(bt.loadBathymetry(bathyFile, comm=comm))
+inflowDepth = inflowHeightMean - float(bathymetry.z(domain_vertices[:,0].max(),
+                                                   0.5*(domain_vertices[:,1].min()+domain_vertices[:,1].max())))
+logEvent("Water depth at the wave generator: %g m" % (inflowDepth,))
+
 
 timeSeriesFile = "Duck_series.txt"
 skiprows = 0
@@ -387,7 +365,7 @@ timeSeriesPosition = [0., 0., 0.]
 tseries = TimeSeries(timeSeriesFile,
                      skiprows,
                      timeSeriesPosition,
-                     depth,     #Need to set the depth
+                     inflowDepth, #depth at the wave generator
                      N,         #Dummy
                      mwl,       #mean water level
                      waveDir,
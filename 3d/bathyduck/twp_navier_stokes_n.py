@@ -65,5 +65,5 @@ maxNonlinearIts = 50
 maxLineSearches = 0
 conservativeFlux = {0:'pwl-bdm-opt'}
 
-
-
+if checkpointer is not None:
+    auxiliaryVariables = [checkpointer]
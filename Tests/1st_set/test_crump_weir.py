@@ -1,150 +1,18 @@
 #!/usr/bin/env python
 import os
-#os.chdir('/home/travis/build/erdc/proteus/air-water-vv/2d/hydraulicStructures/crump_weir')
-import pytest
-from proteus.iproteus import *
-from proteus import Comm
-comm = Comm.get()
-#import crump_weir_so
-#import crump_weir as cw
-import numpy as np
-import collections as cll
-import csv
-from proteus.test_utils import TestTools
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from Tests import harness
 
-from proteus.defaults import (load_physics as load_p,
-                              load_numerics as load_n,
-                              load_system as load_so)
+#: case run by the caseRunner fixture (see Tests/harness.py)
+case = 'crump_weir'
 
-modulepath = os.path.join(os.path.dirname(os.path.abspath(__file__)),'../../2d/hydraulicStructures/crump_weir')
-petsc_options = os.path.join(os.path.dirname(os.path.abspath(__file__)),"../../inputTemplates/petsc.options.asm")
 
-class NumericResults:
+class TestCrumpWeirTetgen(object):
 
-    @staticmethod
-    def _read_log(file_name):
-        log_file = open(file_name,'r')
-        return log_file
+    def test_run(self, caseRunner):
+        harness.checkRun(caseRunner.wait(case))
 
-    @classmethod
-    def create_log(cls,file_name):
-        crump_log = cls._read_log(file_name)
-        return crump_log
-
-
-class TestCrumpWeirTetgen(TestTools.AirWaterVVTest):
-
-    @classmethod
-    def setup_class(cls):
-        pass
-
-    @classmethod
-    def teardown_class(cls):
-        pass
-
-    def setup_method(self,method):
-        #pass
-        Profiling.openLog("proteus.log",10)
-        Profiling.logAllProcesses = True
-
-
-
-    def teardown_method(self,method):
-        Profiling.closeLog()
-
-        """ Tear down function """
-        FileList = ['crump_weir.xmf',
-                    'crump_weir.h5']
-        for file in FileList:
-            if os.path.isfile(file):
-                os.remove(file)
-            else:
-                pass
-            
-    def test_run(self):
-        from petsc4py import PETSc
-        pList = []
-        nList = []
-        so = load_so('crump_weir_so',modulepath)
-        for (p,n) in so.pnList:
-            pList.append(load_p(p,modulepath))
-            nList.append(load_n(n,modulepath))
-            if pList[-1].name == None:
-                pList[-1].name = p
-        #so = crump_weir_so
-        so.name = "crump_weir"
-        if so.sList == []:
-            for i in range(len(so.pnList)):
-                s = default_s
-                so.sList.append(s)
-        Profiling.logLevel=7
-        Profiling.verbose=True
-        # PETSc solver configuration
-        OptDB = PETSc.Options()
-        with open(petsc_options) as f:
-            all = f.read().split()
-            i=0
-            while i < len(all):
-                if i < len(all)-1:
-                    if all[i+1][0]!='-':
-                        print "setting ", all[i].strip(), all[i+1]
-                        OptDB.setValue(all[i].strip('-'),all[i+1])
-                        i=i+2
-                    else:
-                        print "setting ", all[i].strip(), "True"
-                        OptDB.setValue(all[i].strip('-'),True)
-                        i=i+1
-                else:
-                    print "setting ", all[i].strip(), "True"
-                    OptDB.setValue(all[i].strip('-'),True)
-                    i=i+1
-        so.tnList=[0.0,0.001,0.011]            
-        #so.tnList=[0.0,0.001]+[0.001 + i*0.01 for i in range(1, int(round(0.03/0.01))+1)]            
-        ns = NumericalSolution.NS_base(so,pList,nList,so.sList,opts)
-        ns.calculateSolution('crump_weir')
-
-        crump_log = NumericResults.create_log('proteus.log')
-
-        text = crump_log.read()
-        
-        #if text.find('CFL') != -1:
-        if text.find('Step Failed,') != -1:
-   
-            a = "No convergence"
-        else:
-            a = "good"
-        
-
-        if a  == "No convergence":
-            print ("Convergence issue")
-            assert False
-        else:
-            assert True
-
-        
-
-        #def failed(filename,word):
-        #    file = open(filename,"r")
-        #    text = file.read()
-        #
-        #    if text.find(word) != -1:
-        #        a = "No convergence"
-        #    else:
-        #        a = "good"
-        #    file.close()
-        #    return a
-        #    
-        #b = failed(os.path.join(Profiling.logDir,'proteus.log'),'Step Failed,')
-
-        #if b == "No convergence":
-        #    print ("Convergence issue")
-        #    assert False
-        #else:
-        #    assert True
-
-        #assert(True)
-
-        
 #    def test_validate(self):
 #       # Reading probes into the file
 #        file_vof='column_gauge.csv'
@@ -230,6 +98,7 @@ class TestCrumpWeirTetgen(TestTools.AirWaterVVTest):
 #        Q_pr = np.mean(T_20_to_30) #Discharge between 20 s and 30 s obtained with PROTEUS
 #        err = 100*abs(Q_th-Q_pr)/Q_th
 #        assert(err<2.0)
-        
+
+
 if __name__ == '__main__':
     pass
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+Performance benchmarks of representative cases over a fixed short horizon.
+
+Every case runs in its own process, in benchmark_output/<case>, with the
+PETSc options of the smoke tests (see Tests/harness.py). The cases run one
+after the other, so that they do not compete for the cpus. The wall-clock
+times of the setup (case modules, domain assembly, meshing and NS_base) and
+of the time stepping, the iterations read from proteus.log and the peak
+memory are compared with the baselines of baselines.json (see
+tools/BenchmarkTools.py), and the run fails if any measure regressed.
+
+Usage
+-----
+python runBenchmarks.py                          # all the cases
+python runBenchmarks.py linearWaves wavesloshing # some cases
+python runBenchmarks.py --update                 # store new baselines
+
+Baselines depend on the machine: update them on the machine that runs the
+benchmarks, after checking that a slowdown is expected.
+"""
+from __future__ import print_function
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, '../..'))
+from Tests import harness
+from tools import BenchmarkTools as bmt
+from tools import LogTools
+
+#: benchmarked cases (see Tests/harness.py)
+BENCHMARKS = ['linearWaves', 'dambreak_Colagrossi', 'floating2D_BD',
+              'sliding_CB', 'wavesloshing', 'quiescent_water']
+
+#: output times of the benchmark runs
+HORIZON = [0.0, 0.001, 0.051]
+
+baselineFile = os.path.join(here, 'baselines.json')
+
+
+def runCase(case, tnList=HORIZON):
+    """
+    Runs a case in the current directory and returns its measures
+    """
+    run = harness.runCase(case, tnList)
+    metrics = LogTools.readMetrics('proteus.log.json')
+    result = bmt.benchmarkResult(metrics, run['setup'], run['solve'])
+    result['failures'] = float(metrics['failures'])
+    return result
+
+
+def launch(case, output):
+    """
+    Runs a case in a new process in output/<case> and returns its measures
+    """
+    directory = os.path.join(output, case)
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    subprocess.check_call([sys.executable, os.path.abspath(__file__),
+                           '--run', case], cwd=directory)
+    with open(os.path.join(directory, 'benchmark.json')) as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('cases', nargs='*', help='cases (all if none)')
+    parser.add_argument('--update', action='store_true',
+                        help='store the results as the baselines')
+    parser.add_argument('--output', default='benchmark_output',
+                        help='directory of the runs')
+    parser.add_argument('--run', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.run:
+        result = runCase(args.run)
+        with open('benchmark.json', 'w') as f:
+            json.dump(result, f)
+        return 0
+    cases = args.cases or BENCHMARKS
+    baselines = bmt.readBaselines(baselineFile)
+    failed = []
+    for case in cases:
+        result = launch(case, os.path.abspath(args.output))
+        print('%s: setup %.1f s, %d steps, %.3f s/step, %d Newton, %d '
+              'linear, %.0f MB' % (case, result['setup'], result['steps'],
+                                   result['stepWall'], result['newton'],
+                                   result['linear'], result['rss']))
+        if result['failures'] > 0:
+            print('  %d step failures' % result['failures'])
+            failed.append(case)
+        if args.update:
+            baselines[case] = result
+            continue
+        if case not in baselines:
+            print('  no baseline')
+        regressions = bmt.compare(result, baselines.get(case))
+        for measure, (value, baseline, limit) in sorted(regressions.items()):
+            print('  %s regressed: %g (baseline %g, limit %g)' %
+                  (measure, value, baseline, limit))
+        if regressions:
+            failed.append(case)
+    if args.update:
+        bmt.writeBaselines(baselines, baselineFile)
+    if failed:
+        print('failed: %s' % ', '.join(sorted(set(failed))))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
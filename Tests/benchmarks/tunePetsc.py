@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+Selection of the fastest PETSc options of inputTemplates/ for a case.
+
+The case runs a short horizon with every template and with the variants of
+tools/PetscOptions.py (restart, overlap and preconditioners of the rans2p_,
+rdls_ and mcorr_ solvers), one trial after the other, on nprocs ranks. The
+options of the trial with the shortest time stepping are written to the
+output file, with a report of the time and iterations of every trial. The
+result is cached per case, context options (mesh size) and number of
+ranks: later calls only copy the cached options.
+
+Usage
+-----
+python tunePetsc.py linearWaves --nprocs 4 -C "he=0.01" -o petsc.options.tuned
+parun linear_waves_so.py -C "he=0.01" -O petsc.options.tuned ...
+"""
+from __future__ import print_function
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, '../..'))
+from Tests import harness
+from tools import PetscOptions as po
+
+#: output times of the trials
+HORIZON = [0.0, 0.001, 0.021]
+
+
+def tune(case, nprocs=1, context=None, tnList=HORIZON, timeout=1800.,
+         force=False, directory=None):
+    """
+    Runs the trials of a case (unless they are cached)
+
+    :return: name of the cached options file of the winner (None if no
+             trial passed), report (string)
+    """
+    trials = po.trialOptions()
+    key = po.tuningKey(case, nprocs, context or '', trials)
+    if not force:
+        filename, report = po.cachedTuning(key, directory)
+        if filename is not None:
+            return filename, report
+    work = tempfile.mkdtemp(prefix='tune_%s_' % case)
+    results = {}
+    for name, options in trials.items():
+        optionsFile = os.path.join(work, 'petsc.options.'+name)
+        po.writeOptions(options, optionsFile)
+        runner = harness.CaseRunner([case], workers=1, nprocs=nprocs,
+                                    timeout=timeout, output=work,
+                                    tnList=tnList, petscOptions=optionsFile,
+                                    contextOptions=context)
+        results[name] = runner.wait(case)
+        print('%s: %s' % (name, 'ok' if po.trialPassed(results[name])
+                          else 'failed'))
+    winner = po.selectTrial(results)
+    elements = [r['elements'] for r in results.values() if r['elements']]
+    title = '%s, %d ranks, context "%s", %s elements, horizon %s' % (
+        case, nprocs, context or '', elements[0] if elements else '?',
+        tnList)
+    report = po.tuningReport(results, winner, title)
+    if winner is None:
+        return None, report
+    shutil.rmtree(work, ignore_errors=True)
+    return po.storeTuning(key, trials[winner], report, directory), report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('case', choices=sorted(harness.CASES))
+    parser.add_argument('--nprocs', type=int, default=1,
+                        help='number of MPI processes')
+    parser.add_argument('-C', '--context', default=None,
+                        help='context options of the case, as with parun')
+    parser.add_argument('--tnList', type=float, nargs='+', default=HORIZON,
+                        help='output times of the trials')
+    parser.add_argument('--timeout', type=float, default=1800.,
+                        help='wall-clock time allowed per trial (s)')
+    parser.add_argument('--force', action='store_true',
+                        help='run the trials even if they are cached')
+    parser.add_argument('-o', '--output', default='petsc.options.tuned',
+                        help='options file written')
+    args = parser.parse_args(argv)
+    filename, report = tune(args.case, args.nprocs, args.context,
+                            args.tnList, args.timeout, args.force)
+    print(report, end='')
+    if filename is None:
+        return 1
+    shutil.copy(filename, args.output)
+    with open(args.output+'.report', 'w') as f:
+        f.write(report)
+    print('options written to %s' % args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
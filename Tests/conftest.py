@@ -0,0 +1,43 @@
+import os
+import sys
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from Tests import harness
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('air-water-vv', 'air-water-vv case runs')
+    group.addoption('--workers', type=int, default=None,
+                    help='number of cases run at once (default: number of '
+                    'cpus/nprocs)')
+    group.addoption('--nprocs', type=int, default=1,
+                    help='run every case with mpiexec -n NPROCS')
+    group.addoption('--case-timeout', type=float, default=3600.,
+                    help='wall-clock time allowed per case, in seconds')
+    group.addoption('--keep-output', action='store_true',
+                    help='keep the output directories of the cases that '
+                    'passed')
+    group.addoption('--case-output', default=None,
+                    help='directory of the case output directories')
+
+
+@pytest.fixture(scope='session')
+def caseRunner(request):
+    """
+    CaseRunner of the cases of the selected test modules (module attribute
+    'case'), started at the first test that needs a case
+    """
+    cases = []
+    for item in request.session.items:
+        case = getattr(getattr(item, 'module', None), 'case', None)
+        if case is not None and case not in cases:
+            cases.append(case)
+    config = request.config
+    runner = harness.CaseRunner(cases,
+                                workers=config.getoption('workers'),
+                                nprocs=config.getoption('nprocs'),
+                                timeout=config.getoption('case_timeout'),
+                                output=config.getoption('case_output'),
+                                keep=config.getoption('keep_output'))
+    yield runner
+    runner.close()
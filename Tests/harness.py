@@ -0,0 +1,357 @@
+#!/usr/bin/env python
+"""
+Shared harness of the case tests: loading and running a case, and running
+cases in isolated worker processes in parallel.
+
+A case (see CASES) is run by a worker process, optionally under
+'mpiexec -n <nprocs>', in its own temporary output directory, with the
+PETSc options of inputTemplates/ applied by a single parser. The worker
+writes the proteus.log metrics (see tools/LogTools.py) and result.json
+in the directory. CaseRunner launches the workers of several cases at once
+(at most 'workers' at a time), enforces a timeout per case and returns the
+result of a case when its worker is done, so that a test suite takes about
+the time of its slowest case.
+
+Example
+-------
+from Tests import harness
+
+runner = harness.CaseRunner(['linearWaves', 'wavesloshing'], nprocs=2)
+result = runner.wait('linearWaves')
+harness.checkRun(result)
+
+or, for a single case in the current directory and process:
+python Tests/harness.py --run linearWaves
+
+Under pytest, the fixture caseRunner of Tests/conftest.py runs the cases of
+all the selected test modules (module attribute 'case'); see
+'pytest --help' for the --workers, --nprocs, --case-timeout and
+--keep-output options.
+"""
+from __future__ import print_function
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))
+root = os.path.join(here, '..')
+sys.path.insert(0, root)
+from tools import LogTools
+from tools.PetscOptions import readOptions as readPetscOptions
+
+
+def _case(directory, system, name, inputs=()):
+    return {'directory': directory, 'system': system, 'name': name,
+            'inputs': list(inputs)}
+
+
+#: case: directory, system module, name of the run and input files read
+#: from the working directory
+CASES = {'crump_weir': _case('2d/hydraulicStructures/crump_weir',
+                             'crump_weir_so', 'crump_weir'),
+         'dambreak_Colagrossi': _case('2d/benchmarks/dambreak_Colagrossi',
+                                      'dambreak_Colagrossi_so',
+                                      'dambreak_Colagrossi'),
+         'dambreak_Ubbink': _case('2d/benchmarks/dambreak_Ubbink',
+                                  'dambreak_Ubbink_so', 'dambreak_Ubbink'),
+         'floating2D_BD': _case('2d/floatingStructures/'
+                                'floating_caisson_BodyDynamics',
+                                'floating2D_BD_so', 'floating2D_BD'),
+         'linearWaves': _case('2d/numericalTanks/linearWaves',
+                              'linear_waves_so', 'linear_waves'),
+         'nonlinearWaves': _case('2d/numericalTanks/nonlinearWaves',
+                                 'nonlinear_waves_so', 'nonlinear_waves'),
+         'oscillating_cylinder': _case('2d/oscillating_cylinder', 'tank_so',
+                                       'tank'),
+         'quiescent_water': _case('2d/benchmarks/'
+                                  'quiescent_water_probe_benchmark',
+                                  'quiescent_water_test_gauges_so',
+                                  'quiescent_water_test_gauges'),
+         'randomWaves': _case('2d/numericalTanks/randomWaves',
+                              'random_waves_so', 'random_waves',
+                              inputs=['phases.txt']),
+         'sliding_CB': _case('2d/caissonBreakwater/sliding', 'tank_so',
+                             'tank'),
+         'sluice_gate': _case('2d/hydraulicStructures/sluice_gate',
+                              'sluice_gate_so', 'sluice_gate'),
+         'standingWaves': _case('2d/numericalTanks/standingWaves',
+                                'standing_waves_so', 'standing_waves'),
+         'wavesloshing': _case('2d/benchmarks/wavesloshing',
+                               'wavesloshing_so', 'wavesloshing')}
+
+#: output times of the test runs
+TNLIST = [0.0, 0.001, 0.011]
+
+PETSCOPTIONS = os.path.join(root, 'inputTemplates', 'petsc.options.asm')
+
+
+def setPetscOptions(filename=PETSCOPTIONS):
+    from petsc4py import PETSc
+    OptDB = PETSc.Options()
+    for name, value in readPetscOptions(filename):
+        OptDB.setValue(name, value)
+
+
+def caseDirectory(case):
+    return os.path.normpath(os.path.join(root, CASES[case]['directory']))
+
+
+def linkInputs(case, directory='.'):
+    """
+    Links the input files of a case in a directory
+    """
+    for name in CASES[case]['inputs']:
+        target = os.path.join(directory, name)
+        if not os.path.exists(target):
+            os.symlink(os.path.join(caseDirectory(case), name), target)
+
+
+def setupCase(case, tnList=TNLIST, petscOptions=PETSCOPTIONS,
+              contextOptions=None):
+    """
+    Loads the modules of a case (once per process) and builds its solution
+    in the current directory, logging to proteus.log
+
+    :param case: name of the case (string)
+    :param tnList: output times (list)
+    :param petscOptions: PETSc options file (string)
+    :param contextOptions: context options of the case, as with parun -C
+                           (string)
+    :return: NumericalSolution.NS_base
+    """
+    from proteus import Context
+    from proteus.iproteus import (NumericalSolution, Profiling, default_s,
+                                  opts)
+    from proteus.defaults import (load_physics as load_p,
+                                  load_numerics as load_n,
+                                  load_system as load_so)
+    spec = CASES[case]
+    modulepath = caseDirectory(case)
+    linkInputs(case)
+    Profiling.openLog('proteus.log', 7)
+    Profiling.logAllProcesses = True
+    Profiling.logLevel = 7
+    Profiling.verbose = True
+    if contextOptions:
+        opts.contextOptions = contextOptions
+        Context.contextOptionsString = contextOptions
+    so = load_so(spec['system'], modulepath)
+    pList = []
+    nList = []
+    for (p, n) in so.pnList:
+        pList.append(load_p(p, modulepath))
+        nList.append(load_n(n, modulepath))
+        if pList[-1].name is None:
+            pList[-1].name = p
+    so.name = spec['name']
+    if so.sList == []:
+        so.sList = [default_s for pn in so.pnList]
+    setPetscOptions(petscOptions)
+    so.tnList = list(tnList)
+    return NumericalSolution.NS_base(so, pList, nList, so.sList, opts)
+
+
+def runCase(case, tnList=TNLIST, petscOptions=PETSCOPTIONS,
+            contextOptions=None):
+    """
+    Runs a case in the current directory and process (see setupCase)
+
+    :return: dict with the wall-clock times of the setup and of the time
+             stepping, the number of elements of the mesh and the summary of
+             proteus.log (see LogTools.summary, None on the processes other
+             than the master)
+    """
+    from proteus import Comm, Profiling
+    start = time.time()
+    ns = setupCase(case, tnList, petscOptions, contextOptions)
+    setup = time.time()-start
+    elements = ns.modelList[0].levelModelList[-1].mesh.nElements_global
+    start = time.time()
+    ns.calculateSolution(CASES[case]['name'])
+    solve = time.time()-start
+    Profiling.closeLog()
+    # the log of the master is complete once every process closed its log
+    comm = Comm.get()
+    comm.barrier()
+    summary = None
+    if comm.isMaster():
+        metrics = LogTools.parseLog('proteus.log')
+        LogTools.writeMetrics(metrics, 'proteus.log.json')
+        summary = LogTools.summary(metrics)
+    return {'case': case, 'setup': setup, 'solve': solve,
+            'elements': elements, 'summary': summary}
+
+
+def checkRun(result, failures=True):
+    """
+    Asserts that a case run by CaseRunner finished (without step failures
+    if failures)
+    """
+    assert not result['timedOut'], '%s timed out after %.0f s, see %s' % (
+        result['case'], result['duration'], result['directory'])
+    assert result['returncode'] == 0, '%s exited with %d, see %s' % (
+        result['case'], result['returncode'], result['directory'])
+    assert result['summary'] is not None, 'no result for %s, see %s' % (
+        result['case'], result['directory'])
+    if failures:
+        assert result['summary']['failures'] == 0, (
+            '%s: %d step failures, see %s' % (
+                result['case'], result['summary']['failures'],
+                os.path.join(result['directory'], 'proteus.log')))
+
+
+class CaseRunner(object):
+    """
+    Runs cases in worker processes, at most workers at a time, each in a
+    temporary directory
+
+    :param cases: names of the cases, in the order of launch (list)
+    :param workers: number of cases run at once, number of cpus/nprocs if
+                    None (int)
+    :param nprocs: number of MPI processes per case, without mpiexec if 1
+                   (int)
+    :param timeout: wall-clock time allowed per case, in seconds (float)
+    :param output: directory of the temporary directories, the system one
+                   if None (string)
+    :param keep: keep the directories of the cases that passed (bool)
+    :param tnList: output times (list)
+    :param petscOptions: PETSc options file (string)
+    :param contextOptions: context options of the cases (string)
+    :param mpiexec: MPI launcher (string)
+    """
+
+    def __init__(self, cases, workers=None, nprocs=1, timeout=3600.,
+                 output=None, keep=False, tnList=TNLIST,
+                 petscOptions=PETSCOPTIONS, contextOptions=None,
+                 mpiexec='mpiexec'):
+        for case in cases:
+            if case not in CASES:
+                raise ValueError('unknown case: %s' % case)
+        self.queue = list(cases)
+        self.nprocs = int(nprocs)
+        self.workers = int(workers or max(1, multiprocessing.cpu_count() //
+                                          self.nprocs))
+        self.timeout = float(timeout)
+        self.output = output
+        self.keep = keep
+        self.tnList = list(tnList)
+        self.petscOptions = os.path.abspath(petscOptions)
+        self.contextOptions = contextOptions
+        self.mpiexec = mpiexec
+        self.running = {}
+        self.results = {}
+
+    def command(self, case):
+        command = [sys.executable, os.path.abspath(__file__), '--run', case,
+                   '--petsc-options', self.petscOptions, '--tnList'] + \
+            [repr(t) for t in self.tnList]
+        if self.contextOptions:
+            command += ['--context', self.contextOptions]
+        if self.nprocs > 1:
+            command = [self.mpiexec, '-n', str(self.nprocs)]+command
+        return command
+
+    def launch(self):
+        """
+        Launches queued cases while fewer than workers are running
+        """
+        while self.queue and len(self.running) < self.workers:
+            case = self.queue.pop(0)
+            if self.output and not os.path.exists(self.output):
+                os.makedirs(self.output)
+            directory = tempfile.mkdtemp(prefix=case+'_', dir=self.output)
+            out = open(os.path.join(directory, 'worker.out'), 'w')
+            # own process group, so that mpiexec and its ranks can be
+            # killed together
+            process = subprocess.Popen(self.command(case), cwd=directory,
+                                       stdout=out, stderr=subprocess.STDOUT,
+                                       preexec_fn=os.setsid)
+            self.running[case] = (process, directory, out, time.time())
+
+    def poll(self):
+        """
+        Collects the finished and timed out cases, and launches queued ones
+        """
+        for case, (process, directory, out, start) in \
+                list(self.running.items()):
+            duration = time.time()-start
+            timedOut = process.poll() is None and duration > self.timeout
+            if timedOut:
+                os.killpg(process.pid, signal.SIGKILL)
+                process.wait()
+            if process.poll() is None:
+                continue
+            out.close()
+            del self.running[case]
+            self.results[case] = self.collect(case, directory,
+                                              process.returncode, duration,
+                                              timedOut)
+        self.launch()
+
+    def collect(self, case, directory, returncode, duration, timedOut):
+        result = {'case': case, 'directory': directory,
+                  'returncode': returncode, 'duration': duration,
+                  'timedOut': timedOut, 'setup': None, 'solve': None,
+                  'elements': None, 'summary': None}
+        filename = os.path.join(directory, 'result.json')
+        if os.path.exists(filename):
+            with open(filename) as f:
+                result.update(json.load(f))
+        passed = (returncode == 0 and not timedOut and
+                  result['summary'] is not None and
+                  result['summary']['failures'] == 0)
+        if passed and not self.keep:
+            shutil.rmtree(directory, ignore_errors=True)
+        return result
+
+    def wait(self, case):
+        """
+        Result of a case, once its worker is done (see runCase and
+        checkRun); the case is run if it was not queued
+        """
+        if case not in self.results and case not in self.running and \
+                case not in self.queue:
+            self.queue.append(case)
+        self.launch()
+        while case not in self.results:
+            time.sleep(0.5)
+            self.poll()
+        return self.results[case]
+
+    def close(self):
+        """
+        Kills the running workers and drops the queued cases
+        """
+        self.queue = []
+        for case, (process, directory, out, start) in self.running.items():
+            if process.poll() is None:
+                os.killpg(process.pid, signal.SIGKILL)
+                process.wait()
+            out.close()
+        self.running = {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--run', required=True, help='case to run')
+    parser.add_argument('--petsc-options', default=PETSCOPTIONS)
+    parser.add_argument('--tnList', type=float, nargs='+', default=TNLIST)
+    parser.add_argument('--context', help='context options, as with parun -C')
+    args = parser.parse_args(argv)
+    result = runCase(args.run, args.tnList, args.petsc_options, args.context)
+    from proteus import Comm
+    if Comm.get().isMaster():
+        with open('result.json', 'w') as f:
+            json.dump(result, f)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
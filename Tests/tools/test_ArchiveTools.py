@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+import os
+import sys
+import numpy as np
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+tables = pytest.importorskip('tables')
+mtri = pytest.importorskip('matplotlib.tri')
+from tools.ArchiveTools import FieldArchive
+
+
+def writeArchive(filename, nsteps=3):
+    rs = np.random.RandomState(0)
+    points = np.vstack((rs.rand(200, 2)*[2., 1.],
+                        [[0., 0.], [2., 0.], [0., 1.], [2., 1.]]))
+    triang = mtri.Triangulation(points[:, 0], points[:, 1])
+    h5 = tables.open_file(filename, 'w')
+    h5.create_array('/', 'nodesSpatial_Domain0',
+                    np.column_stack((points, np.zeros(len(points)))))
+    h5.create_array('/', 'elementsSpatial_Domain0',
+                    triang.triangles.astype(np.int32))
+    for it in range(nsteps):
+        h5.create_array('/', 'u_t%d' % it,
+                        np.sin(points[:, 0]+it)*points[:, 1])
+    h5.close()
+
+
+class TestArchiveTools:
+
+    def test_frames(self, tmpdir):
+        filename = str(tmpdir.join('case.h5'))
+        writeArchive(filename)
+        with FieldArchive(filename) as archive:
+            assert archive.nSteps('u') == 3
+            xi, yi = np.meshgrid(np.linspace(-0.1, 2., 20),
+                                 np.linspace(0., 1., 20))
+            interp = archive.gridInterpolator(xi, yi)
+            steps = []
+            for it, fields in archive.frames(['u']):
+                steps.append(it)
+                ref = mtri.LinearTriInterpolator(archive.triangulation,
+                                                 fields['u'])(xi, yi)
+                u = interp(fields['u'])
+                assert np.all(u.mask == ref.mask)
+                assert np.allclose(u.compressed(), ref.compressed())
+            assert steps == [0, 1, 2]
+            assert np.allclose(archive.field('u', 1, slice(0, 3)),
+                               archive.field('u', 1)[:3])
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+import os
+import sys
+import numpy as np
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from tools import BathymetryTools as bt
+
+
+def gridMesh(nx, ny, seed=0):
+    # triangulated rectangle with shuffled edges, boundary flags 1 to 4
+    x, y = np.meshgrid(np.arange(nx, dtype=float), np.arange(ny, dtype=float))
+    z = -0.1*x+0.01*np.random.RandomState(seed).rand(ny, nx)
+    nodes = np.column_stack((x.ravel(), y.ravel(), z.ravel()))
+    idx = np.arange(nx*ny).reshape(ny, nx)
+    a, b = idx[:-1, :-1].ravel(), idx[:-1, 1:].ravel()
+    c, d = idx[1:, 1:].ravel(), idx[1:, :-1].ravel()
+    triangles = np.concatenate((np.column_stack((a, b, c)),
+                                np.column_stack((a, c, d))))
+    edges = np.concatenate((triangles[:, [0, 1]], triangles[:, [1, 2]],
+                            triangles[:, [2, 0]]))
+    edges = np.unique(np.sort(edges, axis=1), axis=0)
+    edges = edges[np.random.RandomState(seed).permutation(len(edges))]
+    xe, ye = nodes[edges, 0], nodes[edges, 1]
+    edgeFlags = np.zeros(len(edges), dtype=int)
+    edgeFlags[(ye == 0).all(axis=1)] = 1
+    edgeFlags[(xe == nx-1).all(axis=1)] = 2
+    edgeFlags[(ye == ny-1).all(axis=1)] = 3
+    edgeFlags[(xe == 0).all(axis=1)] = 4
+    nodeFlags = np.zeros(len(nodes), dtype=int)
+    nodeFlags[edges[edgeFlags > 0].ravel()] = 1
+    return nodes, nodeFlags, triangles, edges, edgeFlags
+
+
+def loopExtrusion(nodes, nodeFlags, triangles, edges, edgeFlags, zTop):
+    # node by node version formerly in 3d/bathyduck/tank3D.py
+    newNodes = {}
+    verticalEdges = {}
+    nN_start = nN = len(nodes)
+    for nN_bottom, n, f in zip(range(nN_start), nodes, nodeFlags):
+        if f > 0:
+            newNodes[nN] = (n[0], n[1], zTop)
+            verticalEdges[nN_bottom] = nN
+            nN += 1
+    newFacets = [[[t[0], t[1], t[2]]] for t in triangles]
+    newFacetFlags = [6]*len(triangles)
+    topConnectivity = {}
+    for edge, edgeF in zip(edges, edgeFlags):
+        if edgeF > 0:
+            n11 = verticalEdges[edge[1]]
+            n01 = verticalEdges[edge[0]]
+            newFacets.append([[edge[0], edge[1], n11, n01]])
+            newFacetFlags.append(edgeF)
+            topConnectivity.setdefault(n11, []).append(n01)
+            topConnectivity.setdefault(n01, []).append(n11)
+    topFacet = [topConnectivity[nN_start][0], nN_start,
+                topConnectivity[nN_start][1]]
+    while len(topFacet) < len(newNodes):
+        nN = topFacet[-1]
+        if topFacet[-2] == topConnectivity[nN][0]:
+            topFacet.append(topConnectivity[nN][1])
+        else:
+            topFacet.append(topConnectivity[nN][0])
+    newFacets.append([topFacet])
+    newFacetFlags.append(5)
+    newVertices = [list(n) for n in nodes]
+    newVertexFlags = [nF if nF > 0 else 6 for nF in nodeFlags]
+    for nN in range(len(newNodes)):
+        newVertices.append(list(newNodes[nN+nN_start]))
+        newVertexFlags.append(5)
+    return newVertices, newVertexFlags, newFacets, newFacetFlags
+
+
+def test_extrudeBathymetry():
+    mesh = gridMesh(12, 7)
+    vertices, vertexFlags, facets, facetFlags = bt.extrudeBathymetry(
+        *(mesh+(2.,)))
+    expected = loopExtrusion(*(mesh+(2.,)))
+    assert np.allclose(vertices, expected[0])
+    assert vertexFlags.tolist() == expected[1]
+    assert [np.array(f).tolist() for f in facets] == \
+        [np.array(f).tolist() for f in expected[2]]
+    assert facetFlags == [int(f) for f in expected[3]]
+    # the top facet goes once around the 2*(12+7)-4 boundary nodes
+    assert len(facets[-1][0]) == 34
+    assert len(set(facets[-1][0])) == 34
+
+
+def test_index_nearest_matches_brute_force():
+    rs = np.random.RandomState(1)
+    points = np.column_stack((rs.rand(500)*100., rs.rand(500)*20.,
+                              rs.rand(500)))
+    index = bt.BathymetryIndex(points)
+    x = rs.rand(200)*140.-20.
+    y = rs.rand(200)*60.-20.
+    dist, idx = index.nearest(x, y, k=3)
+    d = np.hypot(points[:, 0]-x[:, None], points[:, 1]-y[:, None])
+    expected = np.sort(d, axis=1)[:, :3]
+    assert np.allclose(dist, expected)
+    assert np.allclose(d[np.arange(200)[:, None], idx], expected)
+
+
+def test_index_z_interpolates_points():
+    x, y = np.meshgrid(np.arange(10.), np.arange(5.))
+    points = np.column_stack((x.ravel(), y.ravel(), -0.1*x.ravel()))
+    index = bt.BathymetryIndex(points)
+    assert np.allclose(index.z(x, y), -0.1*x)
+    assert np.isclose(index.z(2.5, 2.5), -0.25)
+    assert index.z(np.zeros((2, 3)), 1.).shape == (2, 3)
+
+
+def test_load_bathymetry_store(tmp_path):
+    csv = tmp_path/'survey.csv'
+    rows = ['FRF,1,1,0,0,0,0,%g,%g,%g,20150915,0,0' % (i, 2.*i, -i)
+            for i in range(5)]
+    csv.write_text('header\n'+'\n'.join(rows)+'\n')
+    points = bt.loadBathymetry(str(csv))
+    assert os.path.exists(bt.storeFile(str(csv)))
+    assert np.allclose(points, [[i, 2.*i, -i] for i in range(5)])
+    csv.write_text('header\n')  # the store is used while it is newer
+    os.utime(str(csv), (0, 0))
+    assert np.allclose(bt.loadBathymetry(str(csv)), points)
+
+
+class Comm(object):
+    # proteus Comm of one process, bcast returns what the master sent
+    def __init__(self, master, sent=None):
+        self.comm = self
+        self.master = master
+        self.sent = sent
+
+    def isMaster(self):
+        return self.master
+
+    def tompi4py(self):
+        return self
+
+    def bcast(self, value, root=0):
+        if self.master:
+            self.sent = value
+        return self.sent
+
+
+def test_load_bathymetry_error_is_broadcast(tmp_path):
+    # the conversion fails on the master: every process raises its error
+    # instead of waiting for a store that is never written
+    csv = str(tmp_path/'missing.csv')
+    master = Comm(True)
+    with pytest.raises(OSError):
+        bt.loadBathymetry(csv, comm=master)
+    assert isinstance(master.sent, OSError)
+    with pytest.raises(OSError):
+        bt.loadBathymetry(csv, comm=Comm(False, master.sent))
+    csv = tmp_path/'survey.csv'
+    csv.write_text('header\nFRF,1,1,0,0,0,0,1,2,-3,20150915,0,0\n')
+    master = Comm(True)
+    bt.loadBathymetry(str(csv), comm=master)
+    assert master.sent is None
+    points = bt.loadBathymetry(str(csv), comm=Comm(False, master.sent))
+    assert np.allclose(points, [[1., 2., -3.]])
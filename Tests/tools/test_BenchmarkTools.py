@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from tools import BenchmarkTools as bmt
+
+
+def _metrics(newton):
+    n = len(newton)
+    columns = {'solves': np.ones(n, dtype=int), 'newton': np.array(newton),
+               'linear': 3*np.array(newton), 'time': np.ones(n),
+               'failures': np.zeros(n, dtype=int)}
+    return {'steps': {'t': 1e-3*np.arange(1, n+1), 'dt': np.full(n, 1e-3),
+                      'cfl': np.full(n, 0.1), 'wall': np.arange(n)+5.,
+                      'taken': np.ones(n, dtype=bool),
+                      'failures': np.zeros(n, dtype=int)},
+            'models': {'RANS2P': columns}, 'failures': 0, 'messages': [],
+            'setup': 5., 'wall': 5.+n, 'finished': True}
+
+
+def test_result_and_compare(tmp_path):
+    baseline = bmt.benchmarkResult(_metrics([2, 3, 3, 2]), 10., 8., rss=400.)
+    assert baseline['steps'] == 4 and baseline['stepWall'] == 2.
+    assert baseline['newton'] == baseline['newton/RANS2P'] == 10
+    assert baseline['linear/RANS2P'] == 30
+    assert bmt.peakRSS() > 0
+    # within the tolerances
+    result = bmt.benchmarkResult(_metrics([3, 3, 3, 2]), 11., 9., rss=420.)
+    assert bmt.compare(result, baseline) == {}
+    assert bmt.compare(result, None) == {}
+    # slower steps, more iterations and memory
+    result = bmt.benchmarkResult(_metrics([5, 5, 5, 5]), 10., 12., rss=600.)
+    regressions = bmt.compare(result, baseline)
+    assert sorted(regressions) == ['linear', 'linear/RANS2P', 'newton',
+                                   'newton/RANS2P', 'rss', 'solve',
+                                   'stepWall']
+    assert regressions['solve'] == (12., 8., 8.*1.25+1.)
+    assert 'solve' not in bmt.compare(result, baseline, {'solve': (1., 0.)})
+    name = str(tmp_path/'baselines.json')
+    assert bmt.readBaselines(name) == {}
+    bmt.writeBaselines({'case': baseline}, name)
+    assert bmt.readBaselines(name) == {'case': baseline}
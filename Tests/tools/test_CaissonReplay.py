@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from tools import CaissonReplay as cr
+from tools.RecordTools import readRecord
+
+
+def record(Fx, Fy=-1000., Mz=0., nt=101, dt=0.01):
+    time = np.arange(nt)*dt
+    return {'time': time, 'Fx': np.full(nt, Fx)+0.*time,
+            'Fy': np.full(nt, Fy)+0.*time, 'Mz': np.full(nt, Mz)+0.*time}
+
+
+def test_sliding_threshold_and_exact_motion():
+    mass = 100.
+    m = np.array([0.6, 0.4])  # static threshold above/below Fx/|Fy| = 0.5
+    motion = cr.replay(record(500.), mass, m_static=m, m_dynamic=0.3,
+                       overturning=False)
+    assert np.all(motion['pos_x'][:, 0] == 0.)
+    # sliding from t = 0: static friction for the first step, then dynamic
+    a0 = (500.-0.4*1000.)/mass
+    a1 = (500.-0.3*1000.)/mass
+    t = motion['time']
+    x = np.where(t > 0, 0.5*a0*0.01**2+a0*0.01*(t-0.01)+0.5*a1*(t-0.01)**2,
+                 0.)
+    assert np.allclose(motion['pos_x'][:, 1], x)
+
+
+def test_sweep_matches_single_runs():
+    rs = np.random.RandomState(0)
+    rec = record(0.)
+    rec['Fx'] = 600.*np.sin(2*np.pi*rec['time'])+50.*rs.rand(101)
+    rec['Fy'] = -1000.+100.*np.cos(2*np.pi*rec['time'])
+    rec['Mz'] = 20.*np.sin(2*np.pi*rec['time'])
+    params = dict(m_static=np.linspace(0.2, 0.6, 5), m_dynamic=0.3,
+                  Kx=np.linspace(0., 1e4, 5), Ky=5e5, Krot=1e4, Cx=10.,
+                  Cy=1e3, Crot=50.)
+    sweep = cr.replay(rec, 100., inertia=2., **params)
+    for i in range(5):
+        single = cr.replay(rec, 100., inertia=2.,
+                           **dict((k, np.atleast_1d(v)[i % np.size(v)])
+                                  for k, v in params.items()))
+        for name in ('pos_x', 'pos_y', 'rot_z', 'vel_x'):
+            assert np.allclose(sweep[name][:, i], single[name][:, 0])
+
+
+def test_write_records(tmp_path):
+    motion = cr.replay(record(500.), 100., m_static=[0.6, 0.4],
+                       overturning=False)
+    names = cr.writeRecords(motion, str(tmp_path/'replay'), sets=[1])
+    columns, values = readRecord(names[0])
+    assert columns == cr.RECORDNAMES
+    assert np.allclose(values[:, columns.index('pos_x')],
+                       motion['pos_x'][:, 1])
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from tools import FentonTools as ft
+
+SOLUTION = '''# Fake output of the Fourier program
+# Wave length        L/d      =  5.0
+# Wave period  T(g/d)^1/2     =  4.0
+0 0.0 0.3
+1 0.12 0.1
+2 0.02 0.03
+'''
+
+
+def test_solution_is_cached(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    fourier = tmp_path/'Fourier'
+    fourier.write_text('#!/bin/sh\necho run >> calls\ncat > Solution.res <<EOF\n'
+                       + SOLUTION + 'EOF\n')
+    fourier.chmod(0o755)
+    cache = str(tmp_path/'cache')
+    for i in range(2):
+        sol = ft.fentonCoefficients(0.1, 1., 2., directory=cache)
+    assert open('calls').read().count('run') == 1
+    assert np.allclose(sol['B'], [0., 0.12, 0.02])
+    assert np.allclose(sol['Y'], [0.3, 0.1, 0.03])
+    assert np.isclose(sol['wavelength'], 5.)
+    assert np.isclose(sol['period'], 4./np.sqrt(9.81))
+    lines = open('Data.dat').read().split()
+    assert np.isclose(float(lines[1]), 0.1)
+    assert np.isclose(float(lines[3]), 2.*np.sqrt(9.81))
+    # another wave is solved again
+    ft.fentonCoefficients(0.1, 1., 5., mode='Wavelength', directory=cache)
+    assert open('calls').read().count('run') == 2
+    assert np.isclose(float(open('Data.dat').read().split()[3]), 5.)
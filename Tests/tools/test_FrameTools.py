@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+import os
+import sys
+import numpy as np
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+pytest.importorskip('tables')
+pytest.importorskip('matplotlib')
+from tools import FrameTools as ft
+from test_ArchiveTools import writeArchive
+
+
+def setup(archive):
+    xi, yi = np.meshgrid(np.linspace(0., 2., 10), np.linspace(0., 1., 10))
+    return archive.gridInterpolator(xi, yi)
+
+
+def draw(archive, interp, it, fields):
+    from matplotlib import pyplot as plt
+    plt.clf()
+    plt.tricontourf(archive.x, archive.y, archive.elements, fields['u'])
+    plt.title('mean u = %g' % interp(fields['u']).mean())
+
+
+def drawFailing(archive, interp, it, fields):
+    if it == 2:
+        raise ValueError('frame %d' % it)
+    draw(archive, interp, it, fields)
+
+
+class TestFrameTools:
+
+    @pytest.mark.parametrize('nprocs', [1, 2])
+    def test_render(self, tmpdir, nprocs):
+        filename = str(tmpdir.join('case.h5'))
+        writeArchive(filename, nsteps=4)
+        pattern = str(tmpdir.join('phi%4.4d.png'))
+        timings = ft.renderFrames(filename, setup, draw, ['u'], nprocs=nprocs,
+                                  pattern=pattern, verbose=False)
+        assert sorted(timings) == [0, 1, 2, 3]
+        for it in range(4):
+            assert os.path.exists(pattern % (it,))
+
+    @pytest.mark.parametrize('nprocs', [1, 2])
+    def test_render_error(self, tmpdir, nprocs):
+        # the error of a frame is raised, and the workers are stopped
+        filename = str(tmpdir.join('case.h5'))
+        writeArchive(filename, nsteps=4)
+        pattern = str(tmpdir.join('phi%4.4d.png'))
+        with pytest.raises(ValueError, match='frame 2'):
+            ft.renderFrames(filename, setup, drawFailing, ['u'],
+                            nprocs=nprocs, pattern=pattern, verbose=False)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from tools import GaugeCache as gc
+from test_GaugeTools import writeGaugeFile
+
+
+class TestGaugeCache:
+
+    def test_open(self, tmpdir):
+        filename = str(tmpdir.join('column_gauges.csv'))
+        time, data = writeGaugeFile(filename)
+        probes, t, d = gc.openProbes(filename)
+        assert len(probes) == 4
+        assert np.allclose(t, time)
+        assert np.allclose(d, data)
+        assert all(os.path.exists(f) for f in gc.cacheFiles(filename))
+
+    def test_open_without_refresh(self, tmpdir):
+        filename = str(tmpdir.join('column_gauges.csv'))
+        time, data = writeGaugeFile(filename)
+        # no cache yet: it is built even without refresh
+        probes, t, d = gc.openProbes(filename, cache=False)
+        assert np.allclose(d, data)
+        with open(filename, 'a') as f:
+            f.write('5.0,0.1,0.2,0.3,0.4\n')
+        probes, t, d = gc.openProbes(filename, cache=False)
+        assert len(t) == len(time)
+
+    def test_append(self, tmpdir):
+        filename = str(tmpdir.join('column_gauges.csv'))
+        time, data = writeGaugeFile(filename)
+        gc.openProbes(filename)
+        with open(filename, 'a') as f:
+            f.write('5.0,1,2,3,4\n5.01,1,2')
+        probes, t, d = gc.openProbes(filename)
+        assert len(t) == len(time)+1
+        assert np.allclose(d[-1], [1, 2, 3, 4])
+        with open(filename, 'a') as f:
+            f.write(',3,4\n')
+        probes, t, d = gc.openProbes(filename)
+        assert len(t) == len(time)+2
+        assert np.allclose(d[:len(time)], data)
+
+    def test_rewrite(self, tmpdir):
+        filename = str(tmpdir.join('column_gauges.csv'))
+        writeGaugeFile(filename)
+        gc.openProbes(filename)
+        time, data = writeGaugeFile(filename, nt=700, nprobes=3)
+        probes, t, d = gc.openProbes(filename)
+        assert len(probes) == 3
+        assert np.allclose(d, data)
+
+    def test_append_in_place(self, tmpdir):
+        filename = str(tmpdir.join('column_gauges.csv'))
+        time, data = writeGaugeFile(filename)
+        npyname = gc.cacheFiles(filename)[0]
+        gc.openProbes(filename)
+        inode = os.stat(npyname).st_ino
+        with open(filename, 'a') as f:
+            f.write('5.0,1,2,3,4\n')
+        probes, t, d = gc.openProbes(filename)
+        # rows appended to the same file, stored time-major
+        assert os.stat(npyname).st_ino == inode
+        assert np.load(npyname).shape == (len(time)+1, 5)
+        assert np.allclose(d[:len(time)], data)
+        assert np.allclose(d[-1], [1, 2, 3, 4])
+
+    def test_former_layout(self, tmpdir):
+        filename = str(tmpdir.join('column_gauges.csv'))
+        time, data = writeGaugeFile(filename)
+        gc.openProbes(filename)
+        # probe-major cache of former versions, without layout in its meta
+        npyname, metaname = gc.cacheFiles(filename)
+        np.save(npyname, np.column_stack((time, data)).T)
+        meta = gc._readMeta(filename)
+        del meta['layout']
+        gc._writeMeta(filename, meta)
+        probes, t, d = gc.openProbes(filename, cache=False)
+        assert np.allclose(t, time)
+        assert np.allclose(d, data)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from tools import GaugeMonitor as gm
+
+
+class TestGaugeMonitor:
+
+    def test_tail_zero_crossing(self, tmpdir):
+        filename = str(tmpdir.join('column_gauges.csv'))
+        time = np.arange(0., 30., 0.01)
+        data = np.column_stack((0.1*np.sin(2*np.pi*time/1.5),
+                                0.2*np.cos(2*np.pi*time/2.)))
+        tail = gm.GaugeTail(filename)
+        waves = gm.ZeroCrossingMonitor(level=0.)
+        assert len(tail.poll()[0]) == 0
+        with open(filename, 'w') as f:
+            f.write('time,p [1 0 0],p [2 0 0]\n')
+        for start in range(0, len(time), 250):
+            with open(filename, 'a') as f:
+                for i in range(start, min(start+250, len(time))):
+                    f.write('%.12g,%.12g,%.12g\n' % (time[i], data[i, 0],
+                                                     data[i, 1]))
+            waves.update(*tail.poll())
+        assert tail.nrows == len(time)
+        for j in range(2):
+            eta = data[:, j]
+            up = np.where((eta[:-1] < 0) & (eta[1:] > 0))[0]
+            assert len(waves.heights[j]) == len(up)-1
+        assert np.allclose(waves.Hmean, [0.2, 0.4], rtol=1e-3)
+        assert np.allclose(waves.Tmean, [1.5, 2.], rtol=1e-2)
+
+    def test_running_mean(self):
+        data = np.random.RandomState(0).rand(1000, 3)
+        stats = gm.RunningMean()
+        stats.update(None, data[:123])
+        stats.update(None, data[123:])
+        assert np.allclose(stats.mean, np.mean(data, axis=0))
+        assert np.allclose(stats.std, np.std(data, axis=0, ddof=1))
+
+    def test_zero_crossing_warmup(self):
+        time = np.arange(0., 40., 0.01)
+        data = (1.+0.1*np.sin(2*np.pi*time/1.5))[:, None]
+        waves = gm.ZeroCrossingMonitor(warmup=15.)
+        for start in range(0, len(time), 250):
+            waves.update(time[start:start+250], data[start:start+250])
+            if time[min(start+249, len(time)-1)] < 15.:
+                assert waves.reference is None
+        # the level is the mean of the polls up to 15 s (17.49 s here),
+        # frozen afterwards
+        assert np.allclose(waves.reference, np.mean(data[:1750]))
+        assert np.allclose(waves.Hmean, 0.2, rtol=1e-3)
+        assert np.allclose(waves.Tmean, 1.5, rtol=1e-2)
+
+    def test_zero_crossing_carry(self):
+        waves = gm.ZeroCrossingMonitor(level=0., maxCarry=100)
+        for start in range(10):
+            time = np.arange(start*50, (start+1)*50)*0.1
+            waves.update(time, np.ones((50, 1)))
+        # no crossing: only the last sample is carried over
+        assert len(waves._carry[0][0]) == 1
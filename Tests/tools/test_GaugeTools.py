@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+import os
+import sys
+import numpy as np
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from tools import GaugeTools as gt
+
+
+def writeGaugeFile(filename, nt=500, nprobes=4):
+    time = np.arange(nt)*0.01
+    data = np.sin(time[:, None]+np.arange(nprobes))
+    with open(filename, 'w') as f:
+        f.write('time,'+','.join('vof [%9.5g %9.5g %9.5g]' % (0.5*i, 1., 0.)
+                                 for i in range(nprobes))+'\n')
+        for t, row in zip(time, data):
+            f.write('%.17g,' % t+','.join('%.17g' % v for v in row)+'\n')
+    return time, data
+
+
+class TestGaugeTools:
+
+    def test_header(self, tmpdir):
+        filename = str(tmpdir.join('column_gauges.csv'))
+        writeGaugeFile(filename)
+        probes = gt.readHeader(filename)
+        assert len(probes) == 4
+        assert probes.type[0] == 'vof'
+        assert np.allclose(probes.x, [0., 0.5, 1., 1.5])
+        assert list(gt.findProbes(probes, x=1.)) == [2]
+        assert gt.nearestProbe(probes, [1.2, 1., 0.]) == 2
+
+    def test_read(self, tmpdir):
+        filename = str(tmpdir.join('column_gauges.csv'))
+        time, data = writeGaugeFile(filename)
+        t, d = gt.readProbes(filename, chunksize=37)
+        assert np.allclose(t, time)
+        assert np.allclose(d, data)
+        t, d = gt.readProbes(filename, [1, 3], tmin=1., tmax=2., chunksize=37)
+        window = (time >= 1.) & (time <= 2.)
+        assert np.allclose(t, time[window])
+        assert np.allclose(d, data[window][:, [1, 3]])
+        datalist = gt.readProbeFile(filename)
+        assert datalist[0] == ['vof']*4
+        assert np.allclose(datalist[3], data)
+
+    def test_partial_row(self, tmpdir):
+        filename = str(tmpdir.join('column_gauges.csv'))
+        time, data = writeGaugeFile(filename)
+        with open(filename, 'a') as f:
+            f.write('5.0,0.1,0.2')
+        t, d = gt.readProbes(filename)
+        assert np.allclose(d, data)
+
+    def test_line_integral_header(self, tmpdir):
+        filename = str(tmpdir.join('column_gauges.csv'))
+        with open(filename, 'w') as f:
+            f.write('time,'+','.join('vof [%9.5g %9.5g %9.5g] - [%9.5g %9.5g '
+                                     '%9.5g]' % (x, 0., 0., x, 1.5, 0.)
+                                     for x in (0., 0.25, 0.5))+'\n')
+            f.write('0,0.5,0.6,0.7\n0.1,0.51,0.61,0.71\n')
+        probes, coords, time, data = gt.readProbeFile(filename)
+        assert probes == ['vof']*3
+        assert np.allclose([c[0] for c in coords], [0., 0.25, 0.5])
+        assert np.allclose(time, [0., 0.1])
+        assert np.allclose(data[1], [0.51, 0.61, 0.71])
+
+    def test_wrong_width(self, tmpdir):
+        filename = str(tmpdir.join('column_gauges.csv'))
+        writeGaugeFile(filename, nt=10)
+        with open(filename, 'a') as f:
+            f.write('5.0,0.1,0.2\n5.1,0.1,0.2,0.3,0.4\n')
+        with pytest.raises(ValueError):
+            gt.readProbes(filename)
+
+    def test_compensating_widths(self):
+        # a short and a long row with the total count of complete rows
+        with pytest.raises(ValueError):
+            gt.parseRows(['0.0,1,2,3\n', '0.1,1,2\n', '0.2,1,2,3,4\n'], 4)
+        rows = gt.parseRows(['0.0,1,2,3\n', '0.1,1,2,3\n', '0.2,1'], 4)
+        assert np.allclose(rows, [[0., 1., 2., 3.], [0.1, 1., 2., 3.]])
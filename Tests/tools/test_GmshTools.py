@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from tools.GmshTools import writeGeo
+
+
+class MeshOptions(object):
+    he = 0.1
+    LcMax = None
+
+    def __init__(self, constraints):
+        self.constraints = constraints
+
+
+class Domain(object):
+    boundaryTags = None
+    holes_ind = []
+
+    def __init__(self, nd, constraints):
+        self.nd = nd
+        self.MeshOptions = MeshOptions(constraints)
+
+
+def cube(constraints):
+    # unit cube, facets given by vertices only (no segments)
+    domain = Domain(3, constraints)
+    domain.vertices = [[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+                       [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]]
+    domain.vertexFlags = [1]*8
+    domain.segments = []
+    domain.segmentFlags = []
+    domain.facets = [[[0, 1, 2, 3]], [[4, 5, 6, 7]], [[0, 1, 5, 4]],
+                     [[1, 2, 6, 5]], [[2, 3, 7, 6]], [[3, 0, 4, 7]]]
+    domain.facetFlags = [1, 2, 3, 3, 3, 3]
+    domain.volumes = [[[0, 1, 2, 3, 4, 5]]]
+    domain.regionFlags = [1]
+    return domain
+
+
+def test_writeGeo(tmpdir):
+    prefix = str(tmpdir.join('mesh'))
+    region = {'entity': 'region', 'type': 'fixed', 'index': [0],
+              'variables': {'Lc': 0.05}}
+    box = {'entity': 'global', 'type': 'box', 'index': None,
+           'variables': {'VIn': 0.01, 'VOut': 0.1, 'XMin': 0., 'XMax': 1.,
+                         'YMin': 0., 'YMax': 1., 'ZMin': 0.4, 'ZMax': 0.6,
+                         'restrict': None}}
+    domain = cube([region, box, dict(box)])
+    writeGeo(domain, prefix)
+    assert domain.geofile == prefix
+    with open(prefix+'.geo') as f:
+        geo = f.read().splitlines()
+    # the 12 edges of the cube are written once and shared by the facets
+    assert len([l for l in geo if l.startswith('Line(')]) == 12
+    assert 'Line Loop(2) = {6, 7, 8, 9};' in geo
+    assert 'Line Loop(3) = {11, 2, 12, -7};' in geo
+    assert 'Surface Loop(7) = {1, 2, 3, 4, 5, 6};' in geo
+    assert 'Physical Surface(3) = {3, 4, 5, 6};' in geo
+    # region restriction: faces and edges of the volume, written once
+    assert geo.count('Field[2].RegionsList = {1};') == 1
+    assert 'Field[2].FacesList = {1, 2, 3, 4, 5, 6};' in geo
+    assert ('Field[2].EdgesList = {1, 2, 3, 4, 6, 7, 8, 9, 11, 12, 14, 16};'
+            in geo)
+    # the duplicated box is skipped
+    assert len([l for l in geo if l.endswith('= Box;')]) == 1
+    assert 'Field[4].FieldsList = {2, 3};' in geo
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from tools import LogTools as lt
+
+LOG = """[       0] Starting time stepping
+[       1] Maximum CFL = 0.0
+[       2] System time step t= 1.00000e-03, dt= 1.00000e-03
+[       2] Split operator iteration 0
+[       2] Model: twp_navier_stokes_p
+[       3] Maximum CFL = 0.25
+[       3]    Newton it 0 norm(r) =  6.5e-02  \t\t norm(r)/(rtol*norm(r0)+atol) = 26253.4 test=r
+[       4] after ksp.rtol= 1e-05 ksp.atol= 2.5e-09 ksp.converged= True ksp.its= 7 ksp.norm= 0.0 reason = 4
+[       5]    Newton it 1 norm(r) =  1.4e-03  \t\t norm(r)/(rtol*norm(r0)+atol) = 572.9 test=r
+[       6] after ksp.rtol= 1e-05 ksp.atol= 2.5e-09 ksp.converged= True ksp.its= 5 ksp.norm= 0.0 reason = 4
+[       6] Maximum CFL = 0.5
+[       7]    Newton it 2 norm(r) =  3.0e-09  \t\t norm(r)/(rtol*norm(r0)+atol) = 1e-3
+[       8] Step Taken, t_stepSequence= 0.001 Model step t= 1.00000e-03, dt= 1.00000e-03 for model twp_navier_stokes_p
+[       8] Model: vof_p
+[       9]    Newton it 0 norm(r) =  3.3e-03  \t\t norm(r)/(rtol*norm(r0)+atol) = 1327.37 test=r
+[      10] Step Failed, Model step t= 1.00000e-03, dt= 1.00000e-03 for model vof_p
+[      10] System time step t= 5.00000e-04, dt= 5.00000e-04
+[      10] Model: twp_navier_stokes_p
+[      12]    Newton it 0 norm(r) =  6.5e-02  \t\t norm(r)/(rtol*norm(r0)+atol) = 1.0
+[      13] Step Taken, t_stepSequence= 0.0005 Model step t= 5.00000e-04, dt= 5.00000e-04 for model twp_navier_stokes_p
+[      13] Model: vof_p
+[      14]    Newton it 0 norm(r) =  3.3e-03  \t\t norm(r)/(rtol*norm(r0)+atol) = 1327.37 test=r
+[      15] after ksp.rtol= 0.001 ksp.atol= 2.5e-09 ksp.converged= True ksp.its= 2 ksp.norm= 0.0 reason = 4
+[      15]    Newton it 1 norm(r) =  3.3e-08  \t\t norm(r)/(rtol*norm(r0)+atol) = 1e-3
+[      16] Step Taken, t_stepSequence= 0.0005 Model step t= 5.00000e-04, dt= 5.00000e-04 for model vof_p
+[      16] Step Taken, System time step t= 5.00000e-04, dt= 5.00000e-04
+[      20] Finished calculating solution
+"""
+
+
+def test_parse_log(tmp_path):
+    name = str(tmp_path/'proteus.log')
+    with open(name, 'w') as f:
+        f.write(LOG)
+    metrics = lt.parseLog(name)
+    steps = metrics['steps']
+    assert np.allclose(steps['t'], [1e-3, 5e-4])
+    assert np.allclose(steps['cfl'], [0.5, 0.])
+    assert np.allclose(steps['wall'], [2., 10.])
+    assert steps['taken'].tolist() == [False, True]
+    assert steps['failures'].tolist() == [1, 0]
+    assert metrics['failures'] == 1 and metrics['finished']
+    assert 'vof_p' in metrics['messages'][0]
+    rans, vof = metrics['models']['RANS2P'], metrics['models']['VOF']
+    assert rans['newton'].tolist() == [2, 0]
+    assert rans['linear'].tolist() == [12, 0]
+    assert np.allclose(rans['time'], [6., 3.])
+    assert vof['solves'].tolist() == [1, 1]
+    assert vof['failures'].tolist() == [1, 0]
+    assert np.allclose(vof['time'], [2., 3.])
+    rollup = lt.summary(metrics)
+    assert rollup['steps'] == 1 and rollup['attempts'] == 2
+    assert rollup['t'] == 5e-4 and rollup['setup'] == 2.
+    assert rollup['models']['RANS2P']['time'] == 9.
+    assert rollup['models']['RANS2P']['newtonPerStep'] == 1.
+    assert rollup['models']['VOF']['linearPerNewton'] == 2.
+    lt.writeMetrics(metrics, name+'.json')
+    back = lt.readMetrics(name+'.json')
+    assert back['steps']['taken'].tolist() == [False, True]
+    assert np.allclose(back['models']['RANS2P']['linear'], [12, 0])
+    assert back['summary']['models']['VOF']['time'] == 5.
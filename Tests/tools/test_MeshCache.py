@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from tools import MeshCache as mc
+
+
+class MeshOptions(object):
+    he = 0.1
+    triangleOptions = 'VApq30Dena0.005'
+    genMesh = True
+
+
+class PlanarStraightLineGraphDomain(object):
+    # attributes of an assembled proteus domain used by the cache
+    nd = 2
+
+    def __init__(self, length, polyfile):
+        self.vertices = [[0., 0.], [length, 0.], [length, 1.], [0., 1.]]
+        self.vertexFlags = [1, 1, 2, 2]
+        self.segments = [[0, 1], [1, 2], [2, 3], [3, 0]]
+        self.segmentFlags = [1, 2, 3, 4]
+        self.regions = [[0.5, 0.5]]
+        self.regionFlags = [1]
+        self.holes = []
+        self.polyfile = polyfile
+        self.MeshOptions = MeshOptions()
+        self.auxiliaryVariables = {'twp': []}
+
+
+def mesher(prefix, text):
+    for ext in ('.node', '.ele', '.edge'):
+        with open(prefix+ext, 'w') as f:
+            f.write(text)
+
+
+def test_meshCache(tmpdir):
+    cache = str(tmpdir.join('cache'))
+    prefix = str(tmpdir.join('mesh'))
+    # first launch: miss, the mesher runs
+    domain = PlanarStraightLineGraphDomain(2., prefix)
+    assert not mc.useMeshCache(domain, cache)
+    assert domain.MeshOptions.genMesh
+    mesher(prefix, 'mesh 2')
+    # same domain: the generated mesh is stored and reused
+    domain = PlanarStraightLineGraphDomain(2., prefix)
+    assert mc.useMeshCache(domain, cache)
+    assert not domain.MeshOptions.genMesh
+    assert os.path.exists(os.path.join(cache, mc.meshKey(domain), 'mesh.ele'))
+    # other tank length: the key changes, new mesh
+    domain = PlanarStraightLineGraphDomain(3., prefix)
+    assert not mc.useMeshCache(domain, cache)
+    assert domain.MeshOptions.genMesh
+    mesher(prefix, 'mesh 3')
+    # back to the first length: restored from the cache
+    domain = PlanarStraightLineGraphDomain(2., prefix)
+    assert mc.useMeshCache(domain, cache)
+    with open(prefix+'.ele') as f:
+        assert f.read() == 'mesh 2'
+    # the second mesh was stored too
+    key3 = mc.meshKey(PlanarStraightLineGraphDomain(3., prefix))
+    with open(os.path.join(cache, key3, 'mesh.node')) as f:
+        assert f.read() == 'mesh 3'
+    # mesh options are part of the key
+    domain = PlanarStraightLineGraphDomain(2., prefix)
+    domain.MeshOptions.he = 0.05
+    assert not mc.useMeshCache(domain, cache)
+
+
+def test_meshCacheSweep(tmpdir):
+    # members of a sweep run in their own directories with the same mesh
+    cache = str(tmpdir.join('cache'))
+    first = str(tmpdir.mkdir('T1.0').join('mesh'))
+    domain = PlanarStraightLineGraphDomain(2., first)
+    assert not mc.useMeshCache(domain, cache)
+    mesher(first, 'mesh T1.0')
+    # the run stores its mesh when the time stepping starts
+    store, = domain.auxiliaryVariables['twp']
+    store.attachModel(None, None).calculate_init()
+    second = str(tmpdir.mkdir('T1.5').join('mesh'))
+    domain = PlanarStraightLineGraphDomain(2., second)
+    assert mc.useMeshCache(domain, cache)
+    assert not domain.MeshOptions.genMesh
+    assert domain.auxiliaryVariables['twp'] == []
+    with open(second+'.ele') as f:
+        assert f.read() == 'mesh T1.0'
+
+
+class Comm(object):
+    # proteus Comm of a process other than the master, the master having
+    # found the mesh in the cache
+    def __init__(self):
+        self.comm = self
+        self.barriers = 0
+
+    def isMaster(self):
+        return False
+
+    def barrier(self):
+        self.barriers += 1
+
+    def tompi4py(self):
+        return self
+
+    def bcast(self, value, root=0):
+        assert value is None and root == 0
+        return True
+
+
+def test_meshCacheDecidedByMaster(tmpdir):
+    prefix = str(tmpdir.join('mesh'))
+    domain = PlanarStraightLineGraphDomain(2., prefix)
+    comm = Comm()
+    assert mc.useMeshCache(domain, str(tmpdir.join('cache')), comm=comm)
+    assert not domain.MeshOptions.genMesh and comm.barriers == 1
+    # the other processes leave the files to the master
+    assert not os.path.exists(prefix+'.meshkey')
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from tools import PetscOptions as po
+
+
+def test_read_write_and_variants(tmp_path):
+    options = po.readOptions(po.templateFile('asm'))
+    assert options[0] == ('rans2p_ksp_type', 'gmres')
+    assert ('rans2p_ksp_knoll', True) in options
+    name = str(tmp_path/'petsc.options')
+    po.writeOptions(options, name)
+    assert po.readOptions(name) == options
+    changed = dict(po.applyVariant(options, {'rans2p_ksp_type': 'fgmres',
+                                             'rans2p_ksp_knoll': None,
+                                             'rans2p_pc_asm_overlap': '2'}))
+    assert changed['rans2p_ksp_type'] == 'fgmres'
+    assert 'rans2p_ksp_knoll' not in changed
+    assert changed['rans2p_pc_asm_overlap'] == '2'
+    trials = po.trialOptions()
+    assert list(trials)[:4] == list(po.TEMPLATES)
+    assert len(trials) == len(po.TEMPLATES)+len(po.VARIANTS)
+    assert po.tuningKey('linearWaves', 1, trials=trials) != \
+        po.tuningKey('linearWaves', 4, trials=trials)
+
+
+def _result(solve, linear, returncode=0, failures=0):
+    return {'returncode': returncode, 'timedOut': False, 'setup': 1.,
+            'solve': solve, 'directory': '/tmp/trial',
+            'summary': {'failures': failures,
+                        'models': {'RANS2P': {'newton': 3,
+                                              'linear': linear}}}}
+
+
+def test_selection_and_cache(tmp_path):
+    results = {'asm': _result(10., 30), 'mumps': _result(8., 3),
+               'asm_fgmres': _result(8., 20),
+               'superlu_dist': _result(1., 3, returncode=1),
+               'asm_overlap2': _result(2., 3, failures=1)}
+    assert po.selectTrial(results) == 'mumps'
+    assert po.selectTrial({'asm': _result(1., 3, returncode=1)}) is None
+    report = po.tuningReport(results, 'mumps', 'linearWaves')
+    assert 'winner' in report and 'RANS2P=3' in report
+    assert 'failed' in report
+    directory = str(tmp_path)
+    assert po.cachedTuning('key', directory) == (None, None)
+    options = po.readOptions(po.templateFile('mumps'))
+    filename = po.storeTuning('key', options, report, directory)
+    assert po.cachedTuning('key', directory) == (filename, report)
+    assert po.readOptions(filename) == options
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from tools.RecordTools import RecordWriter, readRecord, cutRecord
+
+
+def test_csv_and_binary_records(tmp_path):
+    rows = [[0.1*i, float(i), None if i == 2 else 2.*i] for i in range(7)]
+    for ext in ('.csv', '.bin'):
+        name = str(tmp_path/('record'+ext))
+        writer = RecordWriter(name, ['time', 'pos_x', 'inertia'],
+                              bufferSize=3)
+        for row in rows[:4]:
+            writer.write(row)
+        # the first 3 rows are on disk, the 4th is buffered
+        assert len(readRecord(name)[1]) == 3
+        writer.close()
+        writer = RecordWriter(name, ['time', 'pos_x', 'inertia'],
+                              append=True)
+        for row in rows[4:]:
+            writer.write(row)
+        writer.flush()
+        names, values = readRecord(name)
+        assert names == ['time', 'pos_x', 'inertia']
+        assert values.shape == (7, 3)
+        assert np.allclose(values[:, 1], np.arange(7))
+        assert np.isnan(values[2, 2]) and values[3, 2] == 6.
+
+
+def test_cut_record(tmp_path):
+    for ext in ('.csv', '.bin'):
+        name = str(tmp_path/('record'+ext))
+        writer = RecordWriter(name, ['time', 'pos_x'])
+        for i in range(5):
+            writer.write([0.1*i, float(i)])
+        writer.close()
+        cutRecord(name, 0.3)
+        assert np.allclose(readRecord(name)[1][:, 1], [0., 1., 2.])
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from tools import ReflectionTools as rt
+
+
+class TestReflectionTools:
+
+    def test_dispersion(self):
+        freq = np.array([0.2, 0.5, 1., 2.])
+        k = rt.dispersion(freq, 1.)
+        assert np.allclose((2*np.pi*freq)**2, 9.81*k*np.tanh(k))
+
+    def test_separation(self):
+        depth = 1.
+        period = 1.94
+        freq = 1./period
+        k = rt.dispersion(freq, depth)
+        x = np.arange(120)*0.1
+        time = np.arange(0., 30*period, period/50.)
+        phase = 2*np.pi*freq*time[:, None]
+        eta = (0.025*np.cos(phase-k*x[None, :]) +
+               0.005*np.cos(phase+k*x[None, :]+0.7))
+        windows = rt.slidingWindows(len(x), 5)
+        assert windows.shape == (110, 3)
+        refl = rt.reflectionAnalysis(time, eta, x, depth, windows,
+                                     fmin=0.8*freq, fmax=1.2*freq)
+        assert np.allclose(refl['Hi'], 0.05)
+        assert np.allclose(refl['Hr'], 0.01)
+        assert np.allclose(refl['Kr'], 0.2)
+        z = -0.5
+        pressure = 998.2*9.81*np.cosh(k*(depth+z))/np.cosh(k*depth)*eta
+        refl = rt.reflectionAnalysis(time, pressure, x, depth, fmin=0.8*freq,
+                                     fmax=1.2*freq, z=z)
+        assert np.allclose(refl['Kr'], 0.2)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from tools import RestartTools as rt
+
+
+class Body(object):
+    def __init__(self):
+        self.position = np.zeros(3)
+
+    def getState(self):
+        return {'position': self.position.copy()}
+
+    def setState(self, state):
+        self.position[:] = state['position']
+
+
+class Model(object):
+    class stepController(object):
+        t_model_last = 0.
+
+
+def writeGauge(name, times):
+    with open(name, 'w') as f:
+        f.write('time,p\n')
+        for t in times:
+            f.write('%g,%g\n' % (t, 10.*t))
+
+
+def test_checkpoint_and_restore(tmp_path):
+    directory = str(tmp_path/'checkpoints')
+    gauge = str(tmp_path/'gauges.csv')
+    body = Body()
+    checkpointer = rt.Checkpointer([0.1, 0.2, 0.3], directory,
+                                   gauges=[gauge], keep=2)
+    checkpointer.register('body', body)
+    model = Model()
+    checkpointer.attachModel(model, None)
+    for i in range(1, 8):
+        model.stepController.t_model_last = 0.05*i
+        body.position[0] = 0.05*i
+        checkpointer.calculate()
+    # checkpoints at 0.1, 0.2, 0.3, the first one removed
+    assert [t for t, name in rt.listCheckpoints(directory)] == [0.2, 0.3]
+    writeGauge(gauge, [0.1, 0.2, 0.3, 0.35])
+    body.position[0] = 0.
+    restart = rt.Checkpointer([0.1, 0.2, 0.3, 0.4], directory,
+                              gauges=[gauge])
+    restart.register('body', body)
+    assert restart.restore(time=0.25) == 0.2
+    assert body.position[0] == 0.2 and restart.next == 2
+    assert restart.restore() == 0.3 and restart.next == 3
+    assert rt.segmentFiles(gauge) == [gauge+'.part0']
+    # the gauge rows after 0.2 were cut, the restarted run starts at 0.3
+    writeGauge(gauge, [0.3, 0.4])
+    rt.stitchSegments(gauge)
+    header, values = rt.readSeries(gauge)
+    assert header == 'time,p' and rt.segmentFiles(gauge) == []
+    assert np.allclose(values[:, 0], [0.1, 0.2, 0.3, 0.4])
+
+
+def test_stitch_relative(tmp_path):
+    names = [str(tmp_path/'run1.csv'), str(tmp_path/'run2.csv')]
+    writeGauge(names[0], [0., 1., 2.])
+    writeGauge(names[1], [0.5, 1.])
+    header, values = rt.stitchSeries(names, relative=True)
+    assert np.allclose(values[:, 0], [0., 1., 2., 2.5, 3.])
+    assert np.allclose(values[:, 1], [0., 10., 20., 5., 10.])
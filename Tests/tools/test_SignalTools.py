@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from tools import SignalTools as sgt
+
+
+def loopFilter(time, data, minfreq, maxfreq, cutoffMax, cutoffMin):
+    # frequency by frequency version of signalFilter for a single series
+    dt = (time[-1]-time[0])/(len(time)-1)
+    freq = np.fft.fftfreq(len(time), dt)
+    fft_x = np.fft.fft(data)
+    tailMax = cutoffMax-maxfreq
+    tailMin = minfreq-cutoffMin
+    for ii, ff in enumerate(freq):
+        fd = abs(ff)
+        if fd > maxfreq:
+            if fd-maxfreq < tailMax:
+                fft_x[ii] *= sgt.costapValue(fd-maxfreq, tailMax)
+            else:
+                fft_x[ii] = 0.
+        if fd < minfreq and ff != 0.:
+            if minfreq-fd < tailMin:
+                fft_x[ii] *= sgt.costapValue(minfreq-fd, tailMin)
+            else:
+                fft_x[ii] = 0.
+    return np.real(np.fft.ifft(fft_x))
+
+
+def loopZeroCrossing(time, data):
+    # wave by wave up-crossing heights and periods of a single series
+    data = data-np.mean(data)
+    zc = np.where(data[1:]*data[:-1] < 0)[0]
+    zc = zc[::2] if data[0] < 0 else zc[1::2]
+    height = [max(data[i1:i2])-min(data[i1:i2]) for i1, i2 in zip(zc[:-1],
+                                                                  zc[1:])]
+    return np.array(height), np.diff(time[zc])
+
+
+class TestSignalTools:
+
+    def test_filter(self):
+        period = 1.5
+        minf = 1./1.2/period
+        maxf = 1.2/period
+        for nt in (1000, 1001):
+            time = np.linspace(0., 50., nt)
+            data = np.random.RandomState(1).randn(nt, 5)
+            filt = sgt.signalFilter(time, data, minf, maxf, 1.1*maxf,
+                                    0.9*minf)
+            assert filt.shape == data.shape
+            for j in range(5):
+                ref = loopFilter(time, data[:, j], minf, maxf, 1.1*maxf,
+                                 0.9*minf)
+                assert np.allclose(filt[:, j], ref)
+                assert np.allclose(sgt.signalFilter(time, data[:, j], minf,
+                                                    maxf, 1.1*maxf, 0.9*minf),
+                                   ref)
+
+    def test_mask_cache(self):
+        mask = sgt.bandPassMask(1000, 0.01, 0.5, 1., 1.1, 0.4)
+        assert sgt.bandPassMask(1000, 0.01, 0.5, 1., 1.1, 0.4) is mask
+        freq = np.fft.rfftfreq(1000, 0.01)
+        assert np.all(mask[(freq >= 0.5) & (freq <= 1.)] == 1.)
+        assert np.all(mask[(freq > 1.1) | ((freq < 0.4) & (freq > 0))] == 0.)
+
+    def test_wave_statistics(self):
+        time = np.linspace(0., 60., 6001)
+        rs = np.random.RandomState(3)
+        data = np.column_stack([0.1*np.sin(2*np.pi*time/1.5+rs.rand()) +
+                                0.03*rs.randn(len(time)) for j in range(6)] +
+                               [np.zeros(len(time))])
+        stats = sgt.waveStatistics(time, data)
+        for j in range(6):
+            height, period = loopZeroCrossing(time, data[:, j])
+            assert stats['N'][j] == len(height)
+            assert np.allclose(stats['heights'][j], height)
+            assert np.allclose(stats['periods'][j], period)
+            assert np.isclose(stats['Hmean'][j], np.mean(height))
+            assert np.isclose(stats['Hrms'][j], np.sqrt(np.mean(height**2)))
+            highest = np.sort(height)[::-1][:len(height)//3]
+            assert np.isclose(stats['H13'][j], np.mean(highest))
+            assert np.isclose(stats['Tz'][j], np.mean(period))
+        assert stats['N'][6] == 0 and np.isnan(stats['Hmean'][6])
+        period, height = sgt.zeroCrossing(time, data[:, 0])
+        assert np.isclose(height, stats['Hmean'][0])
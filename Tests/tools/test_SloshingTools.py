@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from tools.SloshingTools import SloshingSolution
+
+k = np.pi/0.1
+h = 0.05
+amplitude = 0.005
+g = 9.81
+rho = 998.2
+
+
+def scalarSolution(x, y, t):
+    # term by term version of the former wavesloshing.py functions
+    eps = k*amplitude
+    x_, y_, h_ = x*k, y*k, h*k
+    w0 = np.sqrt(np.tanh(h_))
+    w2 = 1./32.*(9.*w0**(-7)-12.*w0**(-3)-3*w0-2*w0**5)
+    w_ = w0+0.5*eps**2*w2
+    t_ = (t+2*np.pi/(w_*np.sqrt(k*g))*0.25)*(w_*np.sqrt(k*g))
+    b11 = 1./32.*(3.*w0**(-8)+6.*w0**(-4)-5.+2.*w0**4)
+    b13 = 3./128.*(9.*w0**(-8)+27.*w0**(-4)-15.+w0**4+2*w0**8)
+    b31 = 1./128.*(3.*w0**(-8)+18.*w0**(-4)-5.)
+    b33 = 3./128.*(-9.*w0**(-12)+3.*w0**(-8)-3.*w0**(-4)+1)
+    eta0 = np.sin(t_)*np.cos(x_)
+    eta1 = 1./8.*((w0**2-w0**(-2))+(w0**(-2)-3*w0**(-6))*np.cos(2.*t_))*np.cos(2.*x_)
+    eta2 = (b11*np.sin(t_)*np.cos(x_)+b13*np.sin(t_)*np.cos(3*x_) +
+            b31*np.sin(3*t_)*np.cos(x_)+b33*np.sin(3*t_)*np.cos(3*x_))
+    eta = (eps*eta0+eps**2*eta1+0.5*eps**3*eta2)/k
+    Y = y_+h_
+    c1 = 3./(16.*np.cosh(2.*h_))*(w0-w0**(-7))
+    beta13 = 1./(128.*np.cosh(3.*h_))*(1+3*w0**4)*(3*w0**(-9)-5.*w0**(-1)+2*w0**3)
+    beta31 = 1./(128.*np.cosh(h_))*(9.*w0**(-9)+62.*w0**(-5)-31.*w0**(-1))
+    beta33 = 1./(128.*np.cosh(3.*h_))*(1+3.*w0**4)*(-9.*w0**(-13)+22.*w0**(-9)-13.*w0**(-5))
+    dt = (eps*(-w0/np.sinh(h_)*np.sin(t_)*np.cos(x_)*np.cosh(Y)) +
+          eps**2*(1./8.*(w0-w0**(-3))-2./16.*(3.*w0+w0**(-3))*np.cos(2*t_) -
+                  2.*c1*np.cos(2.*t_)*np.cos(2.*x_)*np.cosh(2.*Y)) +
+          0.5*eps**3*(-beta13*np.sin(t_)*np.cos(3.*x_)*np.cosh(3.*Y) -
+                      3.*beta31*np.sin(3.*t_)*np.cos(x_)*np.cosh(Y) -
+                      3.*beta33*np.sin(3.*t_)*np.cos(3.*x_)*np.cosh(3.*Y)))
+    dx = (eps*(-w0/np.sinh(h_)*np.cos(t_)*np.sin(x_)*np.cosh(Y)) +
+          eps**2*2.*c1*np.sin(2.*t_)*np.sin(2.*x_)*np.cosh(2.*Y) +
+          0.5*eps**3*(-3.*beta13*np.cos(t_)*np.sin(3.*x_)*np.cosh(3.*Y) -
+                      beta31*np.cos(3.*t_)*np.sin(x_)*np.cosh(Y) -
+                      3.*beta33*np.cos(3.*t_)*np.sin(3.*x_)*np.cosh(3.*Y)))
+    dy = (eps*(w0/np.sinh(h_)*np.cos(t_)*np.cos(x_)*np.sinh(Y)) +
+          eps**2*2.*c1*np.sin(2.*t_)*np.cos(2.*x_)*np.sinh(2.*Y) +
+          0.5*eps**3*(3.*beta13*np.cos(t_)*np.cos(3.*x_)*np.sinh(3.*Y) +
+                      beta31*np.cos(3.*t_)*np.cos(x_)*np.sinh(Y) +
+                      3.*beta33*np.cos(3.*t_)*np.cos(3.*x_)*np.sinh(3.*Y)))
+    p = (-y_-dt*w_-0.5*dx**2-0.5*dy**2)*rho*g/k
+    return eta, p, dx*np.sqrt(g/k), dy*np.sqrt(g/k)
+
+
+def test_sloshingSolution():
+    sol = SloshingSolution(k, h, amplitude, g=-g, rho=rho)
+    x = np.linspace(0., 0.1, 11)
+    time = np.linspace(0., 1., 21)
+    y = -0.025
+    eta = sol.eta(x[None, :], time[:, None])
+    p = sol.pressure(x[None, :], y, time[:, None])
+    u, v = sol.velocity(x[None, :], y, time[:, None])
+    assert eta.shape == (21, 11)
+    for i, t in enumerate(time):
+        for j, xj in enumerate(x):
+            ref = scalarSolution(xj, y, t)
+            assert np.isclose(eta[i, j], ref[0], rtol=0., atol=1e-12)
+            assert np.isclose(p[i, j], ref[1], rtol=0., atol=1e-9)
+            assert np.isclose(u[i, j], ref[2], rtol=0., atol=1e-12)
+            assert np.isclose(v[i, j], ref[3], rtol=0., atol=1e-12)
+    # the surface starts at its maximum at the left wall
+    assert np.isclose(sol.eta(0., 0.), np.max(sol.eta(x, 0.)))
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+import os
+import sys
+import numpy as np
+import pytest
+pytest.importorskip('proteus')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '../../2d/caissonBreakwater/fixed'))
+from proteus import Domain
+import SpatialTools as st
+
+
+class Model(object):
+    class stepController(object):
+        t_model_last = 0.5
+
+
+def caissonDomain():
+    domain = Domain.PlanarStraightLineGraphDomain()
+    tank = st.Tank2D(domain, dim=(4., 2.))
+    caisson = st.Rectangle(domain, dim=(0.5, 0.4), coords=(2., 0.2))
+    caisson.setMass(50.)
+    caisson.setConstraints(free_x=(1, 0, 0), free_r=(0, 0, 0))
+    caisson.setRigidBody()
+    st.assembleDomain(domain)
+    body = [aux for aux in domain.auxiliaryVariables
+            if isinstance(aux, st.RigidBody)][0]
+    return domain, caisson, body
+
+
+def test_restart_keeps_moving_mesh_arrays(tmpdir, monkeypatch):
+    monkeypatch.chdir(tmpdir)  # assembleDomain writes the .poly file
+    domain, caisson, body = caissonDomain()
+    # arrays referenced by the moving mesh BCs (setMoveMesh)
+    shared = (body.last_position, body.h, body.rotation_matrix)
+    body.model = Model()
+    body.calculate_init()
+    body.position[:] = body.last_position+(0.1, 0., 0.)
+    body.last_position[:] = body.position
+    body.h[:] = (0.01, 0., 0.)
+    body.velocity[:] = (0.2, 0., 0.)
+    state = body.getState()
+    body.h[:] = 0.
+    body.setState(state)
+    body.calculate_init()
+    assert body.last_position is shared[0]
+    assert body.h is shared[1]
+    assert body.rotation_matrix is shared[2]
+    assert np.allclose(body.h, (0.01, 0., 0.))
+    assert np.allclose(body.last_position, state['last_position'])
+    assert np.allclose(body.velocity, (0.2, 0., 0.))
+
+
+def square(domain, x0, y0, size=1.):
+    # square with its own boundary tags, regions and flags
+    vertices = [[x0, y0], [x0+size, y0], [x0+size, y0+size], [x0, y0+size]]
+    return st.CustomShape(domain, vertices=vertices, vertexFlags=[1, 1, 2, 2],
+                          segments=[[0, 1], [1, 2], [2, 3], [3, 0]],
+                          segmentFlags=[1, 2, 2, 2],
+                          regions=[[x0+0.5*size, y0+0.5*size]],
+                          regionFlags=[1],
+                          boundaryTags={'bottom': 1, 'wall': 2})
+
+
+def baselineGeometry(shapes):
+    # former quadratic merging loop of assembleDomain (before VertexHash)
+    vertices, vertexFlags = [], []
+    segments, segmentFlags, facets, facetFlags = [], [], [], []
+    nbc = 1
+    for shape in shapes:
+        start_flag = nbc-1
+        start_vertex = len(vertices)
+        nbc += len(shape.BC_list)
+        shape_vertices = shape.vertices.copy()
+        verticesFlags = shape.vertexFlags.copy()
+        if shape.segments is not None:
+            shape_segments = shape.segments.copy()
+        if shape.facets is not None:
+            shape_facets = shape.facets.copy()
+        del_v = 0
+        for i_s, vertex in enumerate(shape.vertices):
+            if vertex.tolist() in vertices:
+                shape_vertices = np.delete(shape_vertices, i_s-del_v, axis=0)
+                verticesFlags = np.delete(verticesFlags, i_s-del_v)
+                i_s -= del_v
+                del_v += 1
+                i_d = vertices.index(vertex.tolist())
+                if shape.segments is not None:
+                    for i in np.nditer(shape_segments,
+                                       op_flags=['readwrite']):
+                        if i > i_s:
+                            i[...] -= 1
+                        elif i == i_s:
+                            i[...] = i_d-start_vertex
+                if shape.facets is not None:
+                    for i in np.nditer(shape_facets, op_flags=['readwrite']):
+                        if i > i_s:
+                            i[...] -= 1
+                        elif i == i_s:
+                            i[...] = i_d-start_vertex
+        vertices += shape_vertices.tolist()
+        vertexFlags += (verticesFlags+start_flag).tolist()
+        if shape.segments is not None:
+            segments += (shape_segments+start_vertex).tolist()
+            segmentFlags += (shape.segmentFlags+start_flag).tolist()
+        if shape.facets is not None:
+            facets += (shape_facets+start_vertex).tolist()
+            facetFlags += (shape.facetFlags+start_flag).tolist()
+    return vertices, vertexFlags, segments, segmentFlags, facets, facetFlags
+
+
+def test_assemble_domain_order(tmpdir, monkeypatch):
+    monkeypatch.chdir(tmpdir)
+    domain = Domain.PlanarStraightLineGraphDomain()
+    # squares sharing edges and corners with the previous ones
+    for x0, y0 in ((0., 0.), (1., 0.), (0., 1.), (1., 1.), (3., 0.),
+                   (2., 0.)):
+        square(domain, x0, y0)
+    st.assembleDomain(domain)
+    expected = baselineGeometry(domain.shape_list)
+    assert len(domain.vertices) == 13
+    for name, values in zip(('vertices', 'vertexFlags', 'segments',
+                             'segmentFlags', 'facets', 'facetFlags'),
+                            expected):
+        assert np.array_equal(np.asarray(getattr(domain, name, [])),
+                              np.asarray(values)), name
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from tools import SpectralTools as spt
+
+
+def randomSeries(freq, S, time, seed):
+    # random phase series of a one-sided spectrum
+    df = freq[1]-freq[0]
+    a = np.sqrt(2.*S*df)
+    phase = np.random.RandomState(seed).rand(len(freq))*2*np.pi
+    return np.dot(np.cos(2*np.pi*np.outer(time, freq)+phase), a)
+
+
+def test_welch_matches_scipy():
+    from scipy import signal
+    rs = np.random.RandomState(0)
+    data = rs.randn(5000, 3)
+    f, psd = spt.welch(data, 0.05, nperseg=256, batch=7)
+    fs, ps = signal.welch(data, fs=20., nperseg=256, axis=0)
+    assert np.allclose(f, fs)
+    assert np.allclose(psd, ps)
+    f1, psd1 = spt.welch(data[:, 1], 0.05, nperseg=256)
+    assert np.allclose(psd1, ps[:, 1])
+
+
+def test_parameters_and_fit_of_jonswap_series():
+    Tp, Hs = 2., 0.1
+    freq = np.linspace(0.01, 2., 400)
+    time = np.arange(0., 2000., 0.1)
+    target = spt.jonswap(freq, Tp, Hs, gamma=3.3)
+    eta = np.column_stack([randomSeries(freq, target, time, seed)
+                           for seed in range(2)])
+    f, psd = spt.welch(eta, 0.1, nperseg=2048)
+    params = spt.spectralParameters(f, psd, fmin=0.2, fmax=1.5)
+    assert np.allclose(params['Hm0'], Hs, rtol=0.05)
+    assert np.allclose(params['Tp'], Tp, rtol=0.1)
+    assert np.all(params['Tm01'] < params['Tp'])
+    fit = spt.fitJonswap(f, psd, fmin=0.2, fmax=1.5)
+    assert np.all(abs(fit['gamma']-3.3) < 1.)
+    error = spt.spectralError(f, psd, spt.jonswap(f, Tp, Hs), 0.2, 1.5)
+    assert error.shape == (2,) and np.all(error < 0.3)
+    # Goda's form is normalised to Hs within a few percent
+    assert np.isclose(spt.spectralMoment(freq, target, 0)*16., Hs**2,
+                      rtol=0.1)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+import os
+import sys
+import math
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '../..'))
+from tools.WaveKinematics import FourierWave
+
+k = 2.0*math.pi/5.912
+omega = 2.0*math.pi/1.94
+h = 1.0
+Y = [0.01227860, 0.00006355]
+B = [0.01089188, 0.00014504, 0.00000206, 0.00000003]
+uMean = 5.912/1.94-2.694
+
+
+def loopKinematics(x, t):
+    # harmonic by harmonic version, as in the 45DEG_R1 case
+    theta = k*x[0]-omega*t+math.pi/2.0
+    eta = h
+    for i in range(len(Y)):
+        eta += Y[i]*math.cos((i+1)*theta)/k
+    u = uMean
+    v = 0.
+    for i in range(len(B)):
+        c = math.sqrt(9.8/k)*(i+1)*B[i]/math.cosh((i+1)*k*h)
+        u += c*math.cosh((i+1)*k*x[2])*math.cos((i+1)*theta)
+        v += c*math.sinh((i+1)*k*x[2])*math.sin((i+1)*theta)
+    return eta, u, v
+
+
+def test_fourierWave():
+    wave = FourierWave(k, omega, h, Y, B, g=-9.8, meanVelocity=uMean,
+                       phase=math.pi/2.0)
+    points = np.random.RandomState(0).uniform(0., 1.5, (50, 3))
+    t = 3.7
+    expected = np.array([loopKinematics(x, t) for x in points])
+    eta, u, v = wave.kinematics(points, t)
+    assert np.allclose(eta, expected[:, 0])
+    assert np.allclose(u, expected[:, 1])
+    assert np.allclose(v, expected[:, 2])
+    assert np.allclose(wave.eta(points, t), expected[:, 0])
+    # single points, twice to go through the kept result
+    for x, ref in zip(points[:3], expected[:3]):
+        assert np.allclose(wave.kinematics(x, t), ref)
+        assert np.allclose(wave.kinematics(x, t), ref)
+        assert np.allclose(wave.velocity(x, t), ref[1:])
+        assert np.ndim(wave.eta(x, t)) == 0
+
+
+def test_spectral_eta_matches_component_sum():
+    from tools.WaveKinematics import spectralEta, smoothedHeaviside
+    rs = np.random.RandomState(3)
+    N = 50
+    a = rs.rand(N)*0.01
+    omega = np.linspace(1., 6., N)
+    kDir = np.column_stack((omega**2/9.81, np.zeros(N), 0.1*rs.rand(N)))
+    phase = rs.rand(N)*2*np.pi
+    x = np.array([1.5, 0., 0.3])
+    t = np.linspace(0., 30., 2500)
+    eta = spectralEta(x, t, a, kDir, omega, phase, chunk=700)
+    expected = [np.sum(a*np.cos(np.dot(kDir, x)-omega*ti+phase)) for ti in t]
+    assert np.allclose(eta, expected)
+    assert np.isclose(spectralEta(x, t[7], a, kDir, omega, phase),
+                      expected[7])
+    H = smoothedHeaviside(0.1, np.array([-1., -0.05, 0., 0.05, 1.]))
+    assert np.allclose(H[[0, 2, 4]], [0., 0.5, 1.])
+    assert np.isclose(H[1]+H[3], 1.)
+
+
+def test_step_sum():
+    from tools.WaveKinematics import stepSum, smoothedHeaviside
+    z = np.linspace(0.005, 1.495, 150)
+    calls = []
+
+    def vof(i):
+        calls.append(i)
+        return float(smoothedHeaviside(0.03, z[i]-0.7321))
+    total = stepSum(vof, len(z))
+    assert np.isclose(total, np.sum(smoothedHeaviside(0.03, z-0.7321)))
+    assert len(set(calls)) < 30
+    assert stepSum(lambda i: 0., 10) == 0. and stepSum(lambda i: 1., 10) == 10.
@@ -0,0 +1,165 @@
+"""
+Lazy reader of the HDF5 field archives written by proteus (<case>.h5).
+
+The mesh (nodes, elements, triangulation) is read once, and the interpolation
+from the mesh to a set of points is precomputed once (containing triangle and
+barycentric weights of every point). Fields are only read for the time steps
+that are requested, one frame at a time, so that iterating over all the
+frames of a long run uses constant memory.
+
+Example
+-------
+from tools.ArchiveTools import FieldArchive
+
+archive = FieldArchive('linear_waves.h5')
+interp = archive.gridInterpolator(xi, yi)
+for it, fields in archive.frames(['phi', 'u', 'v']):
+    u_grid = interp(fields['u'])
+"""
+
+import numpy as np
+import tables
+
+
+class FieldArchive(object):
+    """
+    Read-only access to the mesh and fields of a proteus HDF5 archive
+
+    :param filename: name of the archive (string)
+    :param domain: name of the spatial domain in the archive (string)
+    """
+
+    def __init__(self, filename, domain='Domain0'):
+        self.filename = filename
+        self.domain = domain
+        openFile = getattr(tables, 'open_file', None) or tables.openFile
+        self.h5 = openFile(filename, 'r')
+        self._nodes = None
+        self._elements = None
+        self._triangulation = None
+
+    def close(self):
+        self.h5.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _getNode(self, path):
+        getNode = getattr(self.h5, 'get_node', None) or self.h5.getNode
+        return getNode(path)
+
+    @property
+    def nodes(self):
+        """
+        Coordinates of the mesh nodes (array of shape (nnodes, 3))
+        """
+        if self._nodes is None:
+            self._nodes = self._getNode('/nodesSpatial_'+self.domain).read()
+        return self._nodes
+
+    @property
+    def x(self):
+        return self.nodes[:, 0]
+
+    @property
+    def y(self):
+        return self.nodes[:, 1]
+
+    @property
+    def elements(self):
+        """
+        Connectivity of the mesh elements (array of shape (nelements, nd+1))
+        """
+        if self._elements is None:
+            self._elements = self._getNode(
+                '/elementsSpatial_'+self.domain).read()
+        return self._elements
+
+    @property
+    def triangulation(self):
+        """
+        matplotlib Triangulation of a 2D mesh, built once
+        """
+        if self._triangulation is None:
+            import matplotlib.tri as mtri
+            self._triangulation = mtri.Triangulation(self.x, self.y,
+                                                     self.elements)
+        return self._triangulation
+
+    def hasField(self, name, it):
+        return '/%s_t%d' % (name, it) in self.h5
+
+    def nSteps(self, name='phi'):
+        """
+        Number of time steps archived for a field
+        """
+        it = 0
+        while self.hasField(name, it):
+            it += 1
+        return it
+
+    def field(self, name, it, rows=None):
+        """
+        Reads one field at one time step
+
+        :param name: name of the field, e.g. 'phi', 'vof', 'u' (string)
+        :param it: index of the time step (int)
+        :param rows: only read these nodes (slice or increasing indices),
+                     whole field if None
+        :return: values of the field (array)
+        """
+        node = self._getNode('/%s_t%d' % (name, it))
+        if rows is None:
+            return node.read()
+        return node[rows]
+
+    def frames(self, names, steps=None):
+        """
+        Iterates over time steps, reading only the requested fields
+
+        :param names: names of the fields to read (list of strings)
+        :param steps: indices of the time steps, all archived steps if None
+                      (iterable of int)
+        :return: generator of (it, {name: values})
+        """
+        if steps is None:
+            steps = range(self.nSteps(names[0]))
+        for it in steps:
+            yield it, dict((name, self.field(name, it)) for name in names)
+
+    def gridInterpolator(self, xi, yi):
+        """
+        Precomputes the linear interpolation of nodal fields at given points
+
+        :param xi: x coordinates of the points (array)
+        :param yi: y coordinates of the points (array, same shape as xi)
+        :return: function mapping nodal values to a masked array of the shape
+                 of xi (masked outside the mesh)
+        """
+        xi = np.asarray(xi, dtype=float)
+        yi = np.asarray(yi, dtype=float)
+        tri = self.triangulation.get_trifinder()(xi.ravel(), yi.ravel())
+        outside = tri < 0
+        corners = self.elements[np.where(outside, 0, tri)]
+        x = self.x[corners]
+        y = self.y[corners]
+        px = xi.ravel()
+        py = yi.ravel()
+        det = ((y[:, 1]-y[:, 2])*(x[:, 0]-x[:, 2]) +
+               (x[:, 2]-x[:, 1])*(y[:, 0]-y[:, 2]))
+        w0 = ((y[:, 1]-y[:, 2])*(px-x[:, 2]) +
+              (x[:, 2]-x[:, 1])*(py-y[:, 2]))/det
+        w1 = ((y[:, 2]-y[:, 0])*(px-x[:, 2]) +
+              (x[:, 0]-x[:, 2])*(py-y[:, 2]))/det
+        weights = np.column_stack((w0, w1, 1.-w0-w1))
+        shape = xi.shape
+        mask = outside.reshape(shape)
+
+        def interpolate(values):
+            values = np.asarray(values)
+            result = np.sum(weights*values[corners], axis=1).reshape(shape)
+            return np.ma.masked_array(result, mask)
+        return interpolate
@@ -0,0 +1,302 @@
+"""
+Bathymetry data and construction of 3D tanks from 2D bathymetry meshes.
+
+Survey (FRF csv) and LIDAR (.mat, HDF5) files are converted once to a binary
+store of points (x, y, z) next to them (survey.csv -> survey.csv.npy). The
+conversion is done by the master process; the other processes wait for it
+and memory-map the store, and no process parses the file again on later
+launches. BathymetryIndex builds a KD-tree of the points and answers bulk
+z(x, y) queries (inverse distance weighting of the nearest points), e.g. for
+initial and boundary conditions.
+
+A triangular mesh of the bathymetry (e.g. the finest level of a proteus
+InterpolatedBathymetryMesh) is extruded to a flat top: the triangles become
+the bottom facets, every boundary edge becomes a vertical quadrilateral, and
+the copies of the boundary nodes at the top form the top facet. Boundary
+nodes and edges are selected and renumbered with array operations, and the
+top facet is ordered by walking the boundary ring once.
+
+Example
+-------
+from tools import BathymetryTools as bt
+
+points = bt.loadBathymetry('FRF_survey.csv', comm=comm)
+bathymetry = bt.BathymetryIndex(points)
+zBottom = bathymetry.z(x[:, 0], x[:, 1])
+
+fineMesh = mesh2D.meshList[-1]
+vertices, vertexFlags, facets, facetFlags = bt.extrudeMesh(fineMesh, zTop)
+domain = PiecewiseLinearComplexDomain(vertices=vertices, facets=facets, ...)
+"""
+
+import os
+import numpy as np
+from scipy.spatial import cKDTree
+
+#: columns of the FRF x, y coordinates and elevation in the survey csv files
+SURVEYCOLUMNS = (7, 8, 9)
+
+
+def _orderRing(first, second, start):
+    # walk the ring of top nodes given the two neighbours of every node,
+    # starting with (first[start], start, second[start])
+    first = first.tolist()
+    second = second.tolist()
+    ring = [first[start], start, second[start]]
+    n = len(first)
+    while len(ring) < n:
+        node = ring[-1]
+        if ring[-2] == first[node]:
+            ring.append(second[node])
+        else:
+            ring.append(first[node])
+        if ring[-1] == ring[0]:
+            raise ValueError('the boundary of the bathymetry mesh is not a '
+                             'single closed curve')
+    return ring
+
+
+def extrudeBathymetry(nodes, nodeFlags, triangles, edges, edgeFlags, zTop,
+                      bottomFlag=6, topFlag=5):
+    """
+    Extrudes a triangulated bathymetry to a 3D piecewise linear complex
+
+    :param nodes: coordinates of the bathymetry nodes (array (nnodes, 3))
+    :param nodeFlags: flag of every node, > 0 on the boundary (array)
+    :param triangles: nodes of every triangle (array (ntriangles, 3))
+    :param edges: nodes of every edge (array (nedges, 2))
+    :param edgeFlags: flag of every edge, > 0 on the boundary (array); used
+                      as the flag of the vertical facet of the edge
+    :param zTop: elevation of the top of the tank (float)
+    :param bottomFlag: flag of the bottom facets and of the interior nodes
+                       (int)
+    :param topFlag: flag of the top facet and of the top nodes (int)
+    :return: vertices (array (nnodes+nboundary, 3)), vertexFlags (array),
+             facets (list of lists of vertex loops), facetFlags (list)
+    """
+    nodes = np.asarray(nodes, dtype=float)
+    nodeFlags = np.asarray(nodeFlags)
+    triangles = np.asarray(triangles, dtype=int)
+    edges = np.asarray(edges, dtype=int)
+    edgeFlags = np.asarray(edgeFlags)
+    nN = len(nodes)
+    # top copy of every boundary node, numbered after the bottom nodes
+    boundary = np.where(nodeFlags > 0)[0]
+    nTop = len(boundary)
+    top = np.full(nN, -1, dtype=int)
+    top[boundary] = nN+np.arange(nTop)
+    vertices = np.concatenate((nodes[:, :3],
+                               np.column_stack((nodes[boundary, :2],
+                                                np.full(nTop, zTop)))))
+    vertexFlags = np.concatenate((np.where(nodeFlags > 0, nodeFlags,
+                                           bottomFlag),
+                                  np.full(nTop, topFlag)))
+    # vertical facets of the boundary edges
+    side = edgeFlags > 0
+    n00 = edges[side, 0]
+    n10 = edges[side, 1]
+    n11 = top[n10]
+    n01 = top[n00]
+    if np.any(n11 < 0) or np.any(n01 < 0):
+        raise ValueError('boundary edge with a node that is not flagged as '
+                         'a boundary node')
+    quads = np.column_stack((n00, n10, n11, n01))
+    # neighbours of every top node along the boundary, in the order of the
+    # edges (for every edge, n01 is a neighbour of n11 and conversely)
+    node = np.column_stack((n11, n01)).ravel()-nN
+    other = np.column_stack((n01, n11)).ravel()
+    order = np.argsort(node, kind='stable')
+    count = np.bincount(node, minlength=nTop)
+    if np.any(count != 2):
+        raise ValueError('the boundary of the bathymetry mesh is not a '
+                         'single closed curve')
+    neighbours = other[order].reshape(nTop, 2)-nN
+    if nTop:
+        ring = [nN+i for i in _orderRing(neighbours[:, 0], neighbours[:, 1],
+                                         0)]
+    else:
+        ring = []
+    facets = (triangles[:, None, :3].tolist()+quads[:, None, :].tolist() +
+              [[ring]])
+    facetFlags = ([bottomFlag]*len(triangles)+edgeFlags[side].tolist() +
+                  [topFlag])
+    return vertices, vertexFlags, facets, facetFlags
+
+
+def extrudeMesh(mesh, zTop, bottomFlag=6, topFlag=5):
+    """
+    Extrudes a proteus triangular mesh of the bathymetry (see
+    extrudeBathymetry)
+
+    :param mesh: mesh with nodeArray, nodeMaterialTypes, elementNodesArray,
+                 elementBoundaryNodesArray and elementBoundaryMaterialTypes
+    :param zTop: elevation of the top of the tank (float)
+    """
+    return extrudeBathymetry(mesh.nodeArray, mesh.nodeMaterialTypes,
+                             mesh.elementNodesArray,
+                             mesh.elementBoundaryNodesArray,
+                             mesh.elementBoundaryMaterialTypes, zTop,
+                             bottomFlag, topFlag)
+
+
+def readSurvey(filename, columns=SURVEYCOLUMNS):
+    """
+    Reads the points of a survey csv file (one header line)
+
+    :param filename: name of the csv file (string)
+    :param columns: columns of x, y and z (tuple)
+    :return: points (array (npoints, 3))
+    """
+    points = np.loadtxt(filename, delimiter=',', skiprows=1, usecols=columns,
+                        ndmin=2)
+    return points[np.isfinite(points).all(axis=1)]
+
+
+def readLidar(filename, y=0., column=None,
+              xNode='/lineCoredat/downLineX',
+              zNode='/lineGriddedFilteredData/waterGridFiltered'):
+    """
+    Reads the elevations along the line of a LIDAR .mat file (matlab v7.3,
+    i.e. HDF5). The gridded elevations have one row per x and one column per
+    time; unreliable values are nan and are dropped.
+
+    :param filename: name of the .mat file (string)
+    :param y: coordinate of the line (float)
+    :param column: time index to read, mean over time if None (int)
+    :param xNode: HDF5 node of the x coordinates (string)
+    :param zNode: HDF5 node of the gridded elevations (string)
+    :return: points (array (npoints, 3))
+    """
+    import tables
+    openFile = getattr(tables, 'open_file', None) or tables.openFile
+    with openFile(filename, 'r') as h5:
+        getNode = getattr(h5, 'get_node', None) or h5.getNode
+        x = np.asarray(getNode(xNode).read(), dtype=float).ravel()
+        grid = getNode(zNode)
+        if column is None:
+            z = np.nanmean(grid.read(), axis=1)
+        else:
+            z = np.asarray(grid[:, column], dtype=float)
+    points = np.column_stack((x, np.full(len(x), float(y)), z))
+    return points[np.isfinite(points).all(axis=1)]
+
+
+def storeFile(filename):
+    """
+    Name of the binary store of a bathymetry file
+    """
+    return filename+'.npy'
+
+
+def convertBathymetry(filename, store=None, **kwargs):
+    """
+    Converts a survey (.csv) or LIDAR (.mat) file to a binary store of points
+
+    :param filename: name of the bathymetry file (string)
+    :param store: name of the store, storeFile(filename) if None (string)
+    :param kwargs: options of readSurvey or readLidar
+    :return: name of the store (string)
+    """
+    store = store or storeFile(filename)
+    if os.path.splitext(filename)[1].lower() == '.mat':
+        points = readLidar(filename, **kwargs)
+    else:
+        points = readSurvey(filename, **kwargs)
+    with open(store+'.tmp', 'wb') as f:
+        np.save(f, np.ascontiguousarray(points, dtype=np.float64))
+    os.rename(store+'.tmp', store)
+    return store
+
+
+def loadBathymetry(filename, comm=None, **kwargs):
+    """
+    Points of a bathymetry file, memory-mapped from its binary store. The
+    store is built (by the master process if comm is given) when it is
+    missing or older than the file.
+
+    :param filename: name of the bathymetry file, or of a store (string)
+    :param comm: proteus Comm, the other processes wait for the master and
+                 raise its error if the conversion failed
+    :param kwargs: options of readSurvey or readLidar
+    :return: points (read-only array (npoints, 3))
+    """
+    if filename.endswith('.npy'):
+        store = filename
+    else:
+        store = storeFile(filename)
+        error = None
+        if comm is None or comm.isMaster():
+            try:
+                if (not os.path.exists(store) or
+                        os.path.getmtime(store) < os.path.getmtime(filename)):
+                    convertBathymetry(filename, store, **kwargs)
+            except Exception as exception:
+                error = exception
+        if comm is not None:
+            error = comm.comm.tompi4py().bcast(error, root=0)
+        if error is not None:
+            raise error
+    return np.load(store, mmap_mode='r')
+
+
+class BathymetryIndex(object):
+    """
+    KD-tree of the horizontal coordinates of the points of a bathymetry, for
+    nearest point queries and interpolation of the elevation
+
+    :param points: x, y, z of the points (array (npoints, 3))
+    :param leafsize: number of points in the leaves of the tree (int)
+    """
+
+    def __init__(self, points, leafsize=16):
+        points = np.asarray(points, dtype=float)
+        finite = np.isfinite(points[:, :3]).all(axis=1)
+        if not finite.any():
+            raise ValueError('no bathymetry points')
+        #: original index of the points of the tree
+        self.index = np.where(finite)[0]
+        self.zPoints = points[finite, 2]
+        self.tree = cKDTree(points[finite, :2], leafsize=leafsize)
+
+    def _query(self, x, y, k):
+        x, y = np.broadcast_arrays(np.asarray(x, dtype=float),
+                                   np.asarray(y, dtype=float))
+        k = min(int(k), len(self.zPoints))
+        dist, point = self.tree.query(np.column_stack((x.ravel(), y.ravel())),
+                                      k)
+        return x.shape, dist.reshape(-1, k), point.reshape(-1, k)
+
+    def nearest(self, x, y, k=1):
+        """
+        Nearest points of the queries (x, y)
+
+        :param x: x coordinates of the queries (float/array)
+        :param y: y coordinates of the queries (float/array, broadcastable
+                  with x)
+        :param k: number of points per query (int)
+        :return: distances and indices in points, sorted by distance
+                 (arrays of shape x.shape+(k,))
+        """
+        shape, dist, point = self._query(x, y, k)
+        k = dist.shape[1]
+        return dist.reshape(shape+(k,)), self.index[point].reshape(shape+(k,))
+
+    def z(self, x, y, k=4, power=2.):
+        """
+        Elevation at (x, y), inverse distance weighting of the k nearest
+        points (the elevation of the point if a query falls on one)
+
+        :param x: x coordinates (float/array)
+        :param y: y coordinates (float/array, broadcastable with x)
+        :param k: number of points used (int)
+        :param power: power of the inverse distance (float)
+        :return: elevation (float/array)
+        """
+        shape, dist, point = self._query(x, y, k)
+        zk = self.zPoints[point]
+        exact = dist[:, 0] == 0.
+        with np.errstate(divide='ignore'):
+            w = np.where(exact[:, None], 0., dist**(-power))
+        w[exact, 0] = 1.
+        z = np.sum(w*zk, axis=1)/np.sum(w, axis=1)
+        return z.reshape(shape)[()]
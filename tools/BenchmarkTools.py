@@ -0,0 +1,121 @@
+"""
+Performance measures of benchmark runs and their comparison with stored
+baselines.
+
+A benchmark run is summarised as a flat dict of measures: wall-clock times
+of the setup (loading of the case, domain assembly and meshing) and of the
+time stepping, wall-clock time per step, Newton and linear iterations (in
+total and per model, from proteus.log, see LogTools) and the peak resident
+memory of the process. A measure regresses when it exceeds its baseline by
+more than the tolerance of its kind, rel*baseline+abs; lower values are
+never reported, the baselines are updated explicitly instead.
+
+Example
+-------
+from tools import BenchmarkTools as bmt
+from tools import LogTools as lt
+
+result = bmt.benchmarkResult(lt.parseLog('proteus.log'), setup, solve)
+baselines = bmt.readBaselines('baselines.json')
+regressions = bmt.compare(result, baselines.get('linearWaves'))
+"""
+
+import json
+import os
+import resource
+import sys
+from .LogTools import summary
+
+#: tolerance (rel, abs) of every kind of measure, the kind being the part of
+#: the name before '/' (e.g. 'newton/RANS2P' is a 'newton' measure)
+TOLERANCES = {'setup': (0.25, 1.),
+              'solve': (0.25, 1.),
+              'stepWall': (0.25, 0.01),
+              'steps': (0., 0.),
+              'newton': (0.1, 2.),
+              'linear': (0.2, 10.),
+              'rss': (0.15, 50.)}
+
+
+def peakRSS():
+    """
+    Peak resident memory of the process and its waited-for children (MB)
+    """
+    rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+              resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # kilobytes on linux, bytes on macOS
+    return rss/(1024.**2 if sys.platform == 'darwin' else 1024.)
+
+
+def benchmarkResult(metrics, setup, solve, rss=None):
+    """
+    Measures of a benchmark run
+
+    :param metrics: metrics of the log of the run (see LogTools.parseLog)
+    :param setup: wall-clock time of the setup (float)
+    :param solve: wall-clock time of the time stepping (float)
+    :param rss: peak resident memory (MB), peakRSS() if None (float)
+    :return: dict of measures (floats)
+    """
+    rollup = summary(metrics)
+    steps = rollup['steps']
+    result = {'setup': float(setup),
+              'solve': float(solve),
+              'steps': float(steps),
+              'stepWall': float(solve)/steps if steps else 0.,
+              'newton': 0.,
+              'linear': 0.,
+              'rss': peakRSS() if rss is None else float(rss)}
+    for label, model in rollup['models'].items():
+        result['newton/'+label] = float(model['newton'])
+        result['linear/'+label] = float(model['linear'])
+        result['newton'] += model['newton']
+        result['linear'] += model['linear']
+    return result
+
+
+def tolerance(name, tolerances=None):
+    """
+    Tolerance (rel, abs) of a measure, from tolerances or TOLERANCES
+    """
+    tolerances = dict(TOLERANCES, **(tolerances or {}))
+    return tolerances.get(name, tolerances.get(name.split('/')[0], (0., 0.)))
+
+
+def compare(result, baseline, tolerances=None):
+    """
+    Regressions of a benchmark run with respect to its baseline
+
+    :param result: measures of the run (dict)
+    :param baseline: measures of the baseline (dict), no comparison if None
+    :param tolerances: tolerances by measure or kind overriding TOLERANCES
+                       (dict)
+    :return: dict of the regressed measures, with (value, baseline, limit)
+    """
+    regressions = {}
+    if baseline is None:
+        return regressions
+    for name in sorted(baseline):
+        if name not in result:
+            continue
+        rel, atol = tolerance(name, tolerances)
+        limit = baseline[name]*(1.+rel)+atol
+        if result[name] > limit:
+            regressions[name] = (result[name], baseline[name], limit)
+    return regressions
+
+
+def readBaselines(filename):
+    """
+    Baseline measures by case name (dict), empty if the file does not exist
+    """
+    if not os.path.exists(filename):
+        return {}
+    with open(filename) as f:
+        return json.load(f)
+
+
+def writeBaselines(baselines, filename):
+    with open(filename+'.tmp', 'w') as f:
+        json.dump(baselines, f, indent=1, sort_keys=True)
+    os.rename(filename+'.tmp', filename)
@@ -0,0 +1,222 @@
+"""
+Offline replay of the motion of a caisson under a recorded force history,
+for the calibration of the friction and soil parameters.
+
+The hydrodynamic force and moment recorded during a CFD run (Fx, Fy, Mz of a
+record_*.csv or .bin file, gravity included) are applied again to the
+caisson, and only its dynamics are integrated: sliding with the static and
+dynamic friction of RigidBody.step, soil springs and dampers, and
+overturning. The motion does not feed back into the recorded loads, so the
+replay is meant for small displacements, as in the calibration runs.
+
+Every parameter can be an array of candidates: all the candidates are
+integrated together with array operations, one time step of the record at a
+time, so that a sweep over hundreds of parameter sets takes about as long as
+a single one.
+
+Example
+-------
+from tools import CaissonReplay as cr
+
+record = cr.readForces('record_caisson2D.csv')
+m = np.linspace(0.3, 0.7, 200)
+motion = cr.replay(record, mass=162., inertia=1.98, m_static=m,
+                   m_dynamic=m, Kx=541553.2, Ky=582633.7, Krot=16246.6,
+                   Cx=1694.2, Cy=1757.32, Crot=69.61)
+cr.writeRecords(motion, 'replay_caisson2D')  # replay_caisson2D_<i>.csv
+
+The model, per unit width of the caisson, with x the horizontal, y the
+vertical displacement and theta the rotation from the start of the record:
+
+- horizontal: Fx-Kx*x-Cx*vx is the driving force of the friction module
+  (Coulomb friction with the normal force |Fy| when the caisson presses on
+  the foundation, static/dynamic states as in RigidBody.step)
+- vertical: mass*ay = (Fy-Fy0)-Ky*y-Cy*vy, only with springs (Ky or Cy),
+  the caisson does not move vertically otherwise
+- rotation: inertia*alpha = (Mz-Mz0)-Krot*theta-Crot*omega
+with Fy0 and Mz0 the loads of the first record, at which the caisson rests.
+The vertical motion and the rotation are integrated with the backward Euler
+method, which is stable for any spring stiffness and time step.
+"""
+
+import numpy as np
+from .RecordTools import RecordWriter, readRecord
+
+#: columns of the record files written by RigidBody (all_values=True)
+RECORDNAMES = ['time', 'pos_x', 'pos_y', 'pos_z', 'rot_x', 'rot_y', 'rot_z',
+               'Fx', 'Fy', 'Fz', 'Mx', 'My', 'Mz', 'inertia', 'vel_x',
+               'vel_y', 'vel_z', 'acc_x', 'acc_y', 'acc_z']
+
+
+def readForces(filename):
+    """
+    Reads the load history of a record file
+
+    :param filename: name of the record file, .csv or .bin (string)
+    :return: dict of arrays with time, Fx, Fy, Mz and the initial position
+             pos_x, pos_y if they were recorded
+    """
+    names, values = readRecord(filename)
+    record = {}
+    for name in ('time', 'Fx', 'Fy', 'Mz', 'pos_x', 'pos_y'):
+        if name in names:
+            record[name] = values[:, names.index(name)]
+    for name in ('time', 'Fx', 'Fy', 'Mz'):
+        if name not in record:
+            raise ValueError('no %s column in %s' % (name, filename))
+    return record
+
+
+def _backwardEuler(x, v, force, mass, K, C, dt):
+    # mass*a = force-K*x-C*v, implicit in the new velocity and position
+    v = (v+dt/mass*(force-K*x))/(1.+dt*C/mass+dt**2*K/mass)
+    return x+dt*v, v
+
+
+def replay(record, mass, inertia=None, m_static=0.5, m_dynamic=0.5, Kx=0.,
+           Ky=0., Krot=0., Cx=0., Cy=0., Crot=0., friction=True,
+           overturning=True, substeps=20, g=-9.81):
+    """
+    Integrates the caisson motion under the recorded loads for all the
+    parameter sets at once
+
+    :param record: time, Fx, Fy, Mz of the record (dict of arrays, see
+                   readForces)
+    :param mass: mass of the caisson per unit width (float/array)
+    :param inertia: moment of inertia per unit width (float/array), needed
+                    with overturning
+    :param m_static: static friction factor (float/array)
+    :param m_dynamic: dynamic friction factor (float/array)
+    :param Kx: horizontal stiffness (float/array)
+    :param Ky: vertical stiffness (float/array)
+    :param Krot: rotational stiffness (float/array)
+    :param Cx: horizontal damping (float/array)
+    :param Cy: vertical damping (float/array)
+    :param Crot: rotational damping (float/array)
+    :param friction: friction module; without it the caisson slides freely
+                     under Fx and the springs (bool)
+    :param overturning: rotation of the caisson (bool)
+    :param substeps: fraction 1/substeps of the step integrated when the
+                     caisson goes from sliding to static (int)
+    :param g: vertical gravitational acceleration (float)
+    :return: dict of arrays of shape (ntimes, nsets) in the layout of the
+             record files (time, pos_x, pos_y, rot_z, Fx, Fy, Mz, vel_x,
+             vel_y, vel_z, acc_x, acc_y, acc_z) and the parameters
+             broadcast to (nsets,)
+    """
+    time = np.asarray(record['time'], dtype=float)
+    Fx = np.asarray(record['Fx'], dtype=float)
+    Fy = np.asarray(record['Fy'], dtype=float)
+    Mz = np.asarray(record['Mz'], dtype=float)
+    if overturning and inertia is None:
+        raise ValueError('the inertia is needed for overturning')
+    params = np.broadcast_arrays(*[np.atleast_1d(np.asarray(p, dtype=float))
+                                   for p in (mass, 1. if inertia is None
+                                             else inertia, m_static,
+                                             m_dynamic, Kx, Ky, Krot, Cx, Cy,
+                                             Crot)])
+    mass, inertia, m_static, m_dynamic, Kx, Ky, Krot, Cx, Cy, Crot = params
+    nsets = len(mass)
+    nt = len(time)
+    dt = np.diff(time)
+    dt = np.append(dt, dt[-1] if len(dt) else 0.)
+    eps = 1e-18  # to avoid 0/0
+    out = dict((name, np.zeros((nt, nsets))) for name in
+               ('pos_x', 'pos_y', 'rot_z', 'vel_x', 'vel_y', 'vel_z',
+                'acc_x', 'acc_y', 'acc_z'))
+    x = np.zeros(nsets)
+    vx = np.zeros(nsets)
+    ax = np.zeros(nsets)
+    y = np.zeros(nsets)
+    vy = np.zeros(nsets)
+    theta = np.zeros(nsets)
+    omega = np.zeros(nsets)
+    toStatic = np.zeros(nsets, dtype=bool)
+    ay = np.zeros(nsets)
+    # the caisson only moves vertically on the soil springs
+    soil = (Ky > 0) | (Cy > 0)
+    for n in range(nt):
+        out['pos_x'][n] = x
+        out['pos_y'][n] = y
+        out['rot_z'][n] = theta
+        last_vx, last_ax, last_toStatic = vx, ax, toStatic
+        Fd = Fx[n]-Kx*x-Cx*vx
+        if friction:
+            # Coulomb friction when the caisson presses on the foundation
+            pressing = Fy[n]*g > 0
+            sign = Fd/(abs(Fd)+eps)
+            static = (last_vx == 0.) | last_toStatic
+            m = np.where(static, m_static, m_dynamic)*pressing
+            Ftan = -sign*m*abs(Fy[n])
+            stuck = static & (abs(Fd) < abs(Ftan))
+            ax = np.where(stuck, 0., (Fd+Ftan)/mass)
+            toStatic = ~static & (ax*last_ax < 0.)
+            dt_move = np.where(toStatic, dt[n]/float(substeps), dt[n])
+            vx0 = np.where(stuck, 0., last_vx)
+        else:
+            ax = Fd/mass
+            dt_move = dt[n]
+            vx0 = last_vx
+        x = x+vx0*dt_move+0.5*ax*dt_move**2
+        vx = vx0+ax*dt_move
+        if soil.any():
+            y, vy_new = _backwardEuler(y, vy, Fy[n]-Fy[0], mass, Ky, Cy,
+                                       dt[n])
+            y = y*soil
+            vy_new = vy_new*soil
+            ay = (vy_new-vy)/dt[n] if dt[n] > 0 else np.zeros(nsets)
+            vy = vy_new
+        if overturning:
+            theta, omega = _backwardEuler(theta, omega, Mz[n]-Mz[0],
+                                          inertia, Krot, Crot, dt[n])
+        out['vel_x'][n] = vx
+        out['vel_y'][n] = vy
+        out['acc_x'][n] = ax
+        out['acc_y'][n] = ay
+    if 'pos_x' in record:
+        out['pos_x'] += record['pos_x'][0]
+    if 'pos_y' in record:
+        out['pos_y'] += record['pos_y'][0]
+    out['time'] = time
+    out['Fx'] = Fx
+    out['Fy'] = Fy
+    out['Mz'] = Mz
+    out['inertia'] = inertia if overturning else np.full(nsets, np.nan)
+    out['params'] = dict(zip(('mass', 'inertia', 'm_static', 'm_dynamic',
+                              'Kx', 'Ky', 'Krot', 'Cx', 'Cy', 'Crot'),
+                             params))
+    return out
+
+
+def writeRecords(motion, prefix, sets=None, binary=False):
+    """
+    Writes the replayed motion of parameter sets in the format of the
+    record files of RigidBody (all_values=True)
+
+    :param motion: result of replay (dict)
+    :param prefix: prefix of the files, <prefix>_<set>.csv (string)
+    :param sets: indices of the parameter sets to write, all if None (list)
+    :param binary: binary records (<prefix>_<set>.bin) (bool)
+    :return: names of the files (list)
+    """
+    nt, nsets = motion['pos_x'].shape
+    if sets is None:
+        sets = range(nsets)
+    zeros = np.zeros(nt)
+    filenames = []
+    for i in sets:
+        columns = {'time': motion['time'],
+                   'Fx': motion['Fx'], 'Fy': motion['Fy'], 'Mz': motion['Mz'],
+                   'inertia': np.full(nt, motion['inertia'][i])}
+        for name in ('pos_x', 'pos_y', 'rot_z', 'vel_x', 'vel_y', 'vel_z',
+                     'acc_x', 'acc_y', 'acc_z'):
+            columns[name] = motion[name][:, i]
+        values = np.column_stack([columns.get(name, zeros)
+                                  for name in RECORDNAMES])
+        filename = '%s_%d.%s' % (prefix, i, 'bin' if binary else 'csv')
+        writer = RecordWriter(filename, RECORDNAMES, bufferSize=nt+1)
+        for row in values.tolist():
+            writer.write(row)
+        writer.close()
+        filenames.append(filename)
+    return filenames
@@ -0,0 +1,170 @@
+"""
+Fourier coefficients of steady nonlinear waves from Fenton's Fourier program,
+with a persistent cache.
+
+The program (./Fourier, Fenton 1988) reads the wave definition from Data.dat
+and writes the coefficients to Solution.res. The solution only depends on the
+wave definition (height, depth, period or wavelength, current, number of
+coefficients, height steps, g), so it is stored in the cache directory under
+a hash of these values: repeated launches and parameter sweeps run the
+program once per wave. With a proteus Comm, only the master process reads
+the cache or runs the program, and the result is broadcast to the other
+processes.
+
+Example
+-------
+from tools import FentonTools as ft
+
+fenton = ft.fentonCoefficients(height, depth, period, comm=Comm.get())
+BCoeffs, YCoeffs = fenton['B'], fenton['Y']
+period, wavelength = fenton['period'], fenton['wavelength']
+
+The cache directory is ~/.cache/air-water-vv/fenton, or the directory given
+by the AIR_WATER_VV_FENTON_CACHE environment variable.
+"""
+
+import hashlib
+import json
+import os
+from subprocess import check_call
+import numpy as np
+
+
+def cacheDirectory():
+    return os.environ.get('AIR_WATER_VV_FENTON_CACHE',
+                          os.path.join(os.path.expanduser('~'), '.cache',
+                                       'air-water-vv', 'fenton'))
+
+
+def writeInput(waveheight, depth, length, mode='Period', current_criterion=1,
+               current_magnitude=0, ncoeffs=8, height_steps=1, g=9.81,
+               filename='Data.dat'):
+    """
+    Writes the input file of the Fourier program
+
+    :param waveheight: wave height (float)
+    :param depth: water depth (float)
+    :param length: wave period if mode is 'Period', wavelength if mode is
+                   'Wavelength' (float)
+    :param mode: 'Period' or 'Wavelength' (string)
+    :param current_criterion: 1 for the Eulerian mean current, 2 for the
+                              mass transport velocity (int)
+    :param current_magnitude: magnitude of the current (float)
+    :param ncoeffs: number of Fourier coefficients (int)
+    :param height_steps: number of steps to reach the wave height (int)
+    :param g: gravitational acceleration, magnitude (float)
+    :param filename: name of the input file (string)
+    """
+    if mode == 'Period':
+        length_dimless = length*np.sqrt(g/depth)
+    elif mode == 'Wavelength':
+        length_dimless = length/depth
+    else:
+        raise ValueError("mode must be 'Period' or 'Wavelength'")
+    with open(filename, 'w') as f:
+        f.write('''Wave
+{waveheight}
+{mode}
+{length}
+{current_criterion}
+{current_magnitude}
+{ncoeffs}
+{height_steps}
+        '''.format(waveheight=waveheight/depth, mode=mode,
+                   length=length_dimless,
+                   current_criterion=current_criterion,
+                   current_magnitude=current_magnitude/np.sqrt(g*depth),
+                   ncoeffs=ncoeffs, height_steps=height_steps))
+
+
+def runFourier(executable='./Fourier'):
+    check_call(executable, shell=True)
+
+
+def readSolution(depth, g=9.81, filename='Solution.res'):
+    """
+    Reads the solution file of the Fourier program
+
+    :param depth: water depth (float)
+    :param g: gravitational acceleration, magnitude (float)
+    :param filename: name of the solution file (string)
+    :return: dict with the coefficients B and Y (lists), the dimensional
+             period and wavelength (floats)
+    """
+    solution = {}
+    rows = []
+    with open(filename, 'r') as f:
+        for line in f:
+            if 'Wave period' in line:
+                solution['period'] = float(line.split()[5])/np.sqrt(g/depth)
+            elif 'Wave length' in line:
+                solution['wavelength'] = float(line.split()[5])*depth
+            line = line.split('#')[0].split()
+            if line:
+                rows.append([float(word) for word in line])
+    rows = np.array(rows)
+    solution['B'] = rows[:, 1].tolist()
+    solution['Y'] = rows[:, 2].tolist()
+    return solution
+
+
+def fentonKey(**wave):
+    """
+    Hash of the wave definition (keyword arguments of writeInput)
+    """
+    return hashlib.sha1(json.dumps(wave, sort_keys=True)
+                        .encode('utf-8')).hexdigest()
+
+
+def _solve(wave, directory, executable):
+    key = fentonKey(**wave)
+    cached = os.path.join(directory, key+'.json')
+    if os.path.exists(cached):
+        with open(cached, 'r') as f:
+            return json.load(f)
+    writeInput(**wave)
+    runFourier(executable)
+    solution = readSolution(wave['depth'], wave['g'])
+    solution['wave'] = wave
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(cached+'.tmp%d' % os.getpid(), 'w') as f:
+        json.dump(solution, f)
+    os.rename(cached+'.tmp%d' % os.getpid(), cached)
+    return solution
+
+
+def fentonCoefficients(waveheight, depth, length, mode='Period',
+                       current_criterion=1, current_magnitude=0, ncoeffs=8,
+                       height_steps=1, g=9.81, comm=None, directory=None,
+                       executable='./Fourier'):
+    """
+    Fourier coefficients of a wave, from the cache or from the Fourier
+    program (see writeInput for the wave definition)
+
+    :param comm: proteus Comm; the master process solves and broadcasts
+    :param directory: cache directory, cacheDirectory() if None (string)
+    :param executable: command running the Fourier program (string)
+    :return: dict with the coefficients B and Y (arrays), the dimensional
+             period and wavelength (floats)
+    """
+    wave = {'waveheight': float(waveheight), 'depth': float(depth),
+            'length': float(length), 'mode': mode,
+            'current_criterion': int(current_criterion),
+            'current_magnitude': float(current_magnitude),
+            'ncoeffs': int(ncoeffs), 'height_steps': int(height_steps),
+            'g': abs(float(g))}
+    solution = None
+    if comm is None or comm.isMaster():
+        try:
+            solution = _solve(wave, directory or cacheDirectory(), executable)
+        except Exception as error:
+            solution = error
+    if comm is not None:
+        solution = comm.comm.tompi4py().bcast(solution, root=0)
+    if isinstance(solution, Exception):
+        raise solution
+    solution = dict(solution)
+    solution['B'] = np.array(solution['B'])
+    solution['Y'] = np.array(solution['Y'])
+    return solution
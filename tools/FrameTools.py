@@ -0,0 +1,154 @@
+"""
+Parallel rendering of animation frames from a proteus HDF5 archive.
+
+The time steps are distributed over a pool of processes. Every worker opens
+the archive read-only once (see ArchiveTools.FieldArchive), calls a setup
+function once, and then renders its frames with the Agg backend on a single
+figure. Frames are written as png files, or piped in order to ffmpeg to
+produce a video directly.
+
+The setup and draw functions must be defined at module level (e.g. in the
+helpers.py of a case) so that the workers can call them:
+
+def setup(archive):
+    # called once per worker, returns anything draw needs
+    return archive.gridInterpolator(xi, yi)
+
+def draw(archive, context, it, fields):
+    # draws time step it on the current figure
+    plt.clf()
+    plt.tricontour(archive.x, archive.y, archive.elements, fields['phi'], [0])
+
+FrameTools.renderFrames('case.h5', setup, draw, ['phi'], nprocs=8)
+"""
+
+import io
+import subprocess
+import time as timer
+from multiprocessing import Pool
+from .ArchiveTools import FieldArchive
+
+_worker = {}
+
+
+def _initWorker(filename, setup, draw, fields, pattern, dpi):
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib import pyplot as plt
+    archive = FieldArchive(filename)
+    _worker['archive'] = archive
+    _worker['context'] = setup(archive)
+    _worker['draw'] = draw
+    _worker['fields'] = fields
+    _worker['pattern'] = pattern
+    _worker['dpi'] = dpi
+    _worker['figure'] = plt.figure()
+
+
+def _renderFrame(it):
+    """
+    Renders one time step, returns (it, seconds, png bytes or None)
+    """
+    from matplotlib import pyplot as plt
+    start = timer.time()
+    archive = _worker['archive']
+    fields = dict((name, archive.field(name, it))
+                  for name in _worker['fields'])
+    plt.figure(_worker['figure'].number)
+    _worker['draw'](archive, _worker['context'], it, fields)
+    png = None
+    if _worker['pattern'] is None:
+        buf = io.BytesIO()
+        plt.savefig(buf, format='png', dpi=_worker['dpi'])
+        png = buf.getvalue()
+    else:
+        plt.savefig(_worker['pattern'] % (it,), dpi=_worker['dpi'])
+    return it, timer.time()-start, png
+
+
+def _ffmpeg(video, fps):
+    return subprocess.Popen(['ffmpeg', '-y', '-loglevel', 'error',
+                             '-f', 'image2pipe', '-framerate', str(fps),
+                             '-vcodec', 'png', '-i', '-',
+                             '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2',
+                             '-pix_fmt', 'yuv420p', video],
+                            stdin=subprocess.PIPE)
+
+
+def renderFrames(filename, setup, draw, fields, steps=None, nprocs=1,
+                 pattern='phi%4.4d.png', video=None, fps=25, dpi=None,
+                 verbose=True):
+    """
+    Renders the frames of an archive, in parallel if nprocs > 1
+
+    :param filename: name of the HDF5 archive (string)
+    :param setup: function(archive) called once per worker, returning the
+                  context passed to draw
+    :param draw: function(archive, context, it, fields) drawing time step it
+                 on the current figure
+    :param fields: names of the fields read for every frame (list of strings)
+    :param steps: indices of the time steps to render, all archived steps of
+                  fields[0] if None (list of int)
+    :param nprocs: number of worker processes (int)
+    :param pattern: name of the png files, formatted with the step index
+                    (string); ignored if video is given
+    :param video: name of a video file to encode the frames to with ffmpeg
+                  instead of writing png files (string)
+    :param fps: frames per second of the video (int)
+    :param dpi: resolution of the frames (int), matplotlib default if None
+    :param verbose: print the rendering time of every frame (bool)
+    :return: rendering time of every frame in seconds (dict)
+    """
+    if steps is None:
+        with FieldArchive(filename) as archive:
+            steps = list(range(archive.nSteps(fields[0])))
+    steps = list(steps)
+    initargs = (filename, setup, draw, fields,
+                None if video is not None else pattern, dpi)
+    encoder = _ffmpeg(video, fps) if video is not None else None
+    timings = {}
+    start = timer.time()
+    if nprocs > 1:
+        pool = Pool(nprocs, initializer=_initWorker, initargs=initargs)
+        chunksize = max(1, len(steps)//(4*nprocs))
+        results = pool.imap(_renderFrame, steps, chunksize)
+    else:
+        pool = None
+        _initWorker(*initargs)
+        results = (_renderFrame(it) for it in steps)
+    try:
+        for count, (it, seconds, png) in enumerate(results):
+            timings[it] = seconds
+            if encoder is not None:
+                encoder.stdin.write(png)
+            if verbose:
+                print('frame %d (%d/%d) rendered in %.2f s, elapsed %.1f s' %
+                      (it, count+1, len(steps), seconds,
+                       timer.time()-start))
+    except BaseException:
+        # stop the workers without rendering the remaining frames
+        if pool is not None:
+            pool.terminate()
+        raise
+    else:
+        if pool is not None:
+            pool.close()
+    finally:
+        if pool is not None:
+            pool.join()
+        else:
+            _worker['archive'].close()
+        if encoder is not None:
+            try:
+                encoder.stdin.close()
+            except (IOError, OSError):
+                pass  # ffmpeg exited, its status is checked below
+            encoder.wait()
+    if encoder is not None and encoder.returncode != 0:
+        raise IOError('ffmpeg failed to encode %s (exit status %d)'
+                      % (video, encoder.returncode))
+    if verbose and timings:
+        print('%d frames in %.1f s (%.2f s per frame, %d processes)' %
+              (len(timings), timer.time()-start,
+               sum(timings.values())/len(timings), nprocs))
+    return timings
@@ -0,0 +1,192 @@
+"""
+Binary sidecar cache for gauge files.
+
+The first time a gauge file is opened, its rows are converted to a .npy file
+stored next to it (column_gauges.csv -> column_gauges.csv.npy) together with
+a small .json file holding the gauge header and the size/mtime of the csv file
+the cache was built from. The .npy file holds a (ntimes, 1+nprobes) matrix
+in the order of the csv rows: column 0 is time and column i+1 is probe i.
+
+When the csv file grows (simulation still running), only the appended rows
+are parsed, written at the end of the .npy file, and the shape in its header
+is updated in place, so that refreshing the cache costs the new rows only.
+Any other change rebuilds it.
+
+Example
+-------
+from tools import GaugeCache as gc
+
+probes, time, data = gc.openProbes('column_gauges.csv')
+eta = data[:, 10]  # memory-mapped, read from disk when used
+
+The conversion can also be run ahead of the analysis:
+
+python -m tools.GaugeCache output/*.csv
+"""
+
+import io
+import json
+import os
+import sys
+import numpy as np
+from . import GaugeTools as gt
+
+
+def cacheFiles(filename):
+    """
+    Names of the sidecar files of a gauge file
+
+    :param filename: name of the gauge file (string)
+    :return: name of the .npy data file, name of the .json metadata file
+    """
+    return filename+'.npy', filename+'.json'
+
+
+def _readMeta(filename):
+    npyname, metaname = cacheFiles(filename)
+    if not (os.path.exists(npyname) and os.path.exists(metaname)):
+        return None
+    with open(metaname, 'r') as f:
+        return json.load(f)
+
+
+def _writeMeta(filename, meta):
+    metaname = cacheFiles(filename)[1]
+    with open(metaname+'.tmp', 'w') as f:
+        json.dump(meta, f)
+    os.rename(metaname+'.tmp', metaname)
+
+
+def _signature(filename, offset):
+    """
+    Last bytes consumed by the cache, used to check that the csv file was
+    appended to rather than rewritten by a new run
+    """
+    with open(filename, 'rb') as csvfile:
+        csvfile.seek(max(offset-64, 0))
+        return csvfile.read(min(offset, 64)).decode('ascii')
+
+
+def _appendRows(npyname, nold, rows):
+    """
+    Appends rows to the .npy file of a cache in place: the rows are written
+    after the first nold rows and the shape in the header is updated, so
+    that rows left by an interrupted update are overwritten.
+
+    :param npyname: name of the .npy data file (string)
+    :param nold: number of rows recorded in the metadata (int)
+    :param rows: rows to append (array (nrows, ncols))
+    :return: False if the header with the new shape does not fit in the old
+             one (bool)
+    """
+    with open(npyname, 'r+b') as npyfile:
+        if np.lib.format.read_magic(npyfile) != (1, 0):
+            return False
+        shape, fortran, dtype = np.lib.format.read_array_header_1_0(npyfile)
+        start = npyfile.tell()
+        header = io.BytesIO()
+        np.lib.format.write_array_header_1_0(
+            header, {'descr': np.lib.format.dtype_to_descr(dtype),
+                     'fortran_order': False,
+                     'shape': (nold+len(rows), shape[1])})
+        if (fortran or shape[0] < nold or shape[1] != rows.shape[1] or
+                len(header.getvalue()) != start):
+            return False
+        npyfile.seek(start+nold*shape[1]*dtype.itemsize)
+        npyfile.truncate()
+        npyfile.write(np.ascontiguousarray(rows, dtype=dtype).tobytes())
+        npyfile.flush()
+        npyfile.seek(0)
+        npyfile.write(header.getvalue())
+    return True
+
+
+def updateCache(filename):
+    """
+    Builds or refreshes the cache of a gauge file
+
+    :param filename: name of the gauge file (string)
+    :return: metadata of the cache (dict)
+    """
+    stat = os.stat(filename)
+    meta = _readMeta(filename)
+    if meta is not None and meta.get('layout') != 'time-major':
+        meta = None  # probe-major cache of former versions
+    if (meta is not None and meta['size'] == stat.st_size and
+            meta['mtime'] == stat.st_mtime):
+        return meta
+    with open(filename, 'r') as csvfile:
+        header = csvfile.readline()
+    probes = gt.parseHeader(header)
+    ncols = len(probes)+1
+    nold = None
+    if (meta is not None and meta['header'] == header and
+            stat.st_size >= meta['offset'] and
+            _signature(filename, meta['offset']) == meta['signature']):
+        offset = meta['offset']
+        nold = meta['ntimes']
+    else:
+        offset = gt.headerOffset(filename)
+    blocks = []
+    for rows, offset in gt.scanRows(filename, ncols, offset):
+        blocks.append(rows)
+    new = np.concatenate(blocks) if blocks else np.zeros((0, ncols))
+    npyname = cacheFiles(filename)[0]
+    if nold is None or (len(new) and not _appendRows(npyname, nold, new)):
+        nold = nold or 0
+        out = np.lib.format.open_memmap(npyname+'.tmp', mode='w+',
+                                        dtype=np.float64,
+                                        shape=(nold+len(new), ncols))
+        if nold:
+            out[:nold] = np.load(npyname, mmap_mode='r')[:nold]
+        out[nold:] = new
+        out.flush()
+        del out
+        os.rename(npyname+'.tmp', npyname)
+    meta = {'header': header,
+            'layout': 'time-major',
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'offset': offset,
+            'signature': _signature(filename, offset),
+            'ntimes': nold+len(new)}
+    _writeMeta(filename, meta)
+    return meta
+
+
+def openProbes(filename, cache=True):
+    """
+    Opens a gauge file through its binary cache
+
+    :param filename: name of the gauge file (string)
+    :param cache: refresh the cache if the csv file changed (bool); a
+                  missing cache is built in any case
+    :return: probe table, time (array), data (memory-mapped array of shape
+             (ntimes, nprobes))
+    """
+    meta = None if cache else _readMeta(filename)
+    if meta is None or meta.get('layout') != 'time-major':
+        meta = updateCache(filename)
+    probes = gt.parseHeader(meta['header'])
+    values = np.load(cacheFiles(filename)[0], mmap_mode='r')
+    values = values[:meta['ntimes']]
+    return probes, values[:, 0], values[:, 1:]
+
+
+def readProbeFile(filename):
+    """
+    Same as GaugeTools.readProbeFile, read through the binary cache
+
+    :param filename: name of the gauge file (string)
+    :return: [probeType, probeCoord, time, data]
+    """
+    probes, time, data = openProbes(filename)
+    probeType = list(probes.type)
+    probeCoord = list(zip(probes.x, probes.y, probes.z))
+    return [probeType, probeCoord, time, data]
+
+
+if __name__ == '__main__':
+    for name in sys.argv[1:]:
+        meta = updateCache(name)
+        print('%s: %d rows cached' % (name, meta['ntimes']))
@@ -0,0 +1,303 @@
+"""
+Analysis of gauge files while the simulation is still writing them.
+
+GaugeTail keeps the byte offset of the last complete row it consumed, so each
+poll only parses the rows appended since the previous one. The running
+statistics below are updated with every new block of rows:
+
+- RunningMean: mean and standard deviation of every probe (e.g. mean water
+  level)
+- ZeroCrossingMonitor: individual wave heights and periods from up-crossings,
+  as in AnalysisTools.zeroCrossing
+- DischargeMonitor: discharge from a velocity gauge, as in
+  dischargePlot_sluice.py
+
+Example
+-------
+from tools import GaugeMonitor as gm
+
+tail = gm.GaugeTail('output/column_gauges.csv')
+waves = gm.ZeroCrossingMonitor()
+while running:
+    time, data = tail.poll()
+    waves.update(time, data)
+    print(waves.Hmean)
+
+or from the command line, printing a summary every minute:
+
+python -m tools.GaugeMonitor output/column_gauges.csv --interval 60
+"""
+
+import argparse
+import os
+import time as timer
+import numpy as np
+from . import GaugeTools as gt
+
+
+class GaugeTail(object):
+    """
+    Incremental reader of a gauge file that is being appended to
+
+    :param filename: name of the gauge file (string)
+    :param columns: probe indices to keep, all probes if None (list/array)
+    """
+
+    def __init__(self, filename, columns=None):
+        self.filename = filename
+        self.columns = columns
+        self.probes = None
+        self.offset = None
+        self.nrows = 0
+        self.lastTime = np.nan
+
+    def _readHeader(self):
+        if not os.path.exists(self.filename):
+            return False
+        with open(self.filename, 'rb') as csvfile:
+            header = csvfile.readline()
+        if not header.endswith(b'\n'):
+            return False
+        self.probes = gt.parseHeader(header.decode('ascii'))
+        self.offset = len(header)
+        return True
+
+    def poll(self):
+        """
+        Parses the rows appended since the last call
+
+        :return: time (array), data (array of shape (nnew, nselected))
+        """
+        if self.probes is None and not self._readHeader():
+            return np.zeros(0), np.zeros((0, 0))
+        ncols = len(self.probes)+1
+        keep = (slice(1, None) if self.columns is None
+                else np.asarray(self.columns, dtype=int)+1)
+        blocks = []
+        for rows, offset in gt.scanRows(self.filename, ncols, self.offset):
+            blocks.append(rows)
+            self.offset = offset
+        if not blocks:
+            rows = np.zeros((0, ncols))
+        else:
+            rows = np.concatenate(blocks)
+        self.nrows += len(rows)
+        if len(rows):
+            self.lastTime = rows[-1, 0]
+        return rows[:, 0], rows[:, keep]
+
+
+class RunningMean(object):
+    """
+    Running mean and standard deviation of every probe (Welford update)
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = None
+        self._m2 = None
+
+    def update(self, time, data):
+        if len(data) == 0:
+            return
+        if self.mean is None:
+            self.mean = np.zeros(data.shape[1])
+            self._m2 = np.zeros(data.shape[1])
+        n = len(data)
+        mean = np.mean(data, axis=0)
+        delta = mean-self.mean
+        total = self.count+n
+        self.mean = self.mean+delta*n/float(total)
+        self._m2 = (self._m2+np.sum((data-mean)**2, axis=0) +
+                    delta**2*self.count*n/float(total))
+        self.count = total
+
+    @property
+    def std(self):
+        if self.count < 2:
+            return None
+        return np.sqrt(self._m2/(self.count-1))
+
+
+class ZeroCrossingMonitor(object):
+    """
+    Individual wave heights and periods from up-crossings, accumulated over
+    successive blocks of rows
+
+    The samples since the last up-crossing of every probe are carried over to
+    the next block, so that waves spanning two polls are measured once. A
+    wave longer than maxCarry samples is dropped rather than carried on.
+
+    :param level: reference level of every probe (float/array); if None the
+                  mean of the probe over the first warmup seconds is used,
+                  and no wave is counted before
+    :param tstart: samples before this time are ignored (float)
+    :param warmup: duration of the samples averaged for the reference level
+                   when level is None (float)
+    :param maxCarry: maximum number of samples carried over per probe (int)
+    """
+
+    def __init__(self, level=None, tstart=0., warmup=10., maxCarry=100000):
+        self.level = level
+        self.tstart = tstart
+        self.warmup = warmup
+        self.maxCarry = maxCarry
+        self.mean = RunningMean()
+        self.reference = None
+        self.heights = None
+        self.periods = None
+        self._carry = None
+        self._crossed = None
+        self._warmup = []
+
+    def update(self, time, data):
+        window = time >= self.tstart
+        time = time[window]
+        data = data[window]
+        if len(data) == 0:
+            return
+        self.mean.update(time, data)
+        nprobes = data.shape[1]
+        if self.reference is None:
+            if self.level is None:
+                # the level is frozen once the warm-up samples are in, so
+                # that all the crossings are measured against the same level
+                self._warmup.append((time, data))
+                if time[-1]-self._warmup[0][0][0] < self.warmup:
+                    return
+                time = np.concatenate([t for t, d in self._warmup])
+                data = np.concatenate([d for t, d in self._warmup])
+                self._warmup = []
+                self.reference = self.mean.mean.copy()
+            else:
+                self.reference = np.ones(nprobes)*self.level
+        if self._carry is None:
+            self._carry = [(np.zeros(0), np.zeros(0))]*nprobes
+            self._crossed = [False]*nprobes
+            self.heights = [[] for j in range(nprobes)]
+            self.periods = [[] for j in range(nprobes)]
+        for j in range(nprobes):
+            t = np.concatenate((self._carry[j][0], time))
+            x = np.concatenate((self._carry[j][1], data[:, j]))
+            eta = x-self.reference[j]
+            up = np.where((eta[:-1] < 0) & (eta[1:] > 0))[0]
+            if len(up) > 1:
+                self.heights[j].extend(np.maximum.reduceat(eta, up)[:-1] -
+                                       np.minimum.reduceat(eta, up)[:-1])
+                self.periods[j].extend(np.diff(t[up]))
+            if len(up):
+                self._carry[j] = (t[up[-1]:], x[up[-1]:])
+                self._crossed[j] = True
+            elif self._crossed[j] and len(t) <= self.maxCarry:
+                self._carry[j] = (t, x)
+            else:
+                # no up-crossing to measure a wave from: only the last sample
+                # is needed to detect the next one
+                self._carry[j] = (t[-1:], x[-1:])
+                self._crossed[j] = False
+
+    @property
+    def Hmean(self):
+        """
+        Mean wave height of every probe (nan where no wave was detected)
+        """
+        return np.array([np.mean(h) if h else np.nan for h in self.heights])
+
+    @property
+    def Tmean(self):
+        """
+        Mean wave period of every probe (nan where no wave was detected)
+        """
+        return np.array([np.mean(T) if T else np.nan for T in self.periods])
+
+
+class DischargeMonitor(object):
+    """
+    Discharge through a section from a line of velocity probes, averaged
+    over the probes and multiplied by the height of the section (as in
+    dischargePlot_sluice.py)
+
+    :param height: height of the section (float)
+    :param tstart: start of the time averaging window (float)
+    :param tend: end of the time averaging window (float)
+    """
+
+    def __init__(self, height, tstart=0., tend=np.inf):
+        self.height = height
+        self.tstart = tstart
+        self.tend = tend
+        self.time = []
+        self.Q = []
+        self._sum = 0.
+        self._count = 0
+
+    def update(self, time, data):
+        if len(data) == 0:
+            return
+        Q = np.mean(data, axis=1)*self.height
+        self.time.extend(time)
+        self.Q.extend(Q)
+        window = (time >= self.tstart) & (time <= self.tend)
+        self._sum += np.sum(Q[window])
+        self._count += np.count_nonzero(window)
+
+    @property
+    def Qmean(self):
+        """
+        Time-averaged discharge over the window (nan before the window)
+        """
+        if self._count == 0:
+            return np.nan
+        return self._sum/self._count
+
+
+def _summary(tail, stats, waves):
+    mean = stats.mean
+    lines = ['%s: %d rows, t = %g' % (tail.filename, tail.nrows,
+                                      tail.lastTime)]
+    if mean is not None:
+        lines.append('  mean    min %g max %g' % (np.min(mean),
+                                                  np.max(mean)))
+        Hmean = waves.Hmean
+        if np.any(np.isfinite(Hmean)):
+            lines.append('  Hmean   min %g max %g' % (np.nanmin(Hmean),
+                                                      np.nanmax(Hmean)))
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Running statistics of gauge files being written')
+    parser.add_argument('filenames', nargs='+')
+    parser.add_argument('--interval', type=float, default=60.,
+                        help='seconds between two polls')
+    parser.add_argument('--tstart', type=float, default=0.,
+                        help='simulation time from which waves are counted')
+    parser.add_argument('--warmup', type=float, default=10.,
+                        help='simulation time averaged for the mean level '
+                        'from which waves are measured')
+    parser.add_argument('--timeout', type=float, default=np.inf,
+                        help='stop when no row was added for this long (s)')
+    args = parser.parse_args()
+    monitors = []
+    for name in args.filenames:
+        monitors.append((GaugeTail(name), RunningMean(),
+                         ZeroCrossingMonitor(tstart=args.tstart,
+                                             warmup=args.warmup)))
+    idle = 0.
+    while idle < args.timeout:
+        changed = False
+        for tail, stats, waves in monitors:
+            time, data = tail.poll()
+            if len(time) == 0:
+                continue
+            changed = True
+            if np.any(~np.isfinite(data)):
+                print('%s: non-finite values at t = %g' %
+                      (tail.filename, time[np.where(
+                          ~np.isfinite(data))[0][0]]))
+            stats.update(time, data)
+            waves.update(time, data)
+            print(_summary(tail, stats, waves))
+        idle = 0. if changed else idle+args.interval
+        timer.sleep(args.interval)
@@ -0,0 +1,265 @@
+"""
+Reader for the gauge files written by proteus.Gauges (column_gauges.csv,
+pressure_gaugeArray.csv, pointGauge_levelset.csv, ...).
+
+The header of a gauge file is parsed once into a probe table (a numpy record
+array with the fields type, x, y, z). Data rows are parsed in chunks and only
+the selected probes and the selected time window are kept in memory.
+
+Example
+-------
+from tools import GaugeTools as gt
+
+probes = gt.readHeader('column_gauges.csv')
+cols = gt.findProbes(probes, x=3.5)
+time, eta = gt.readProbes('column_gauges.csv', cols, tmin=6., tmax=18.)
+"""
+
+import re
+from itertools import islice
+import numpy as np
+
+#: number of data rows parsed at once
+CHUNKSIZE = 4096
+#: number of bytes read at once when scanning from a byte offset
+CHUNKBYTES = 1 << 24
+
+# a probe is 'type [x y z]', line integral gauges add the second end of the
+# line, 'type [x y z] - [x y z]'
+_probePattern = re.compile(
+    r'([^,\s\[\]]+)\s*\[([^\]]*)\](?:\s*-\s*\[[^\]]*\])?')
+
+
+def parseHeader(header):
+    """
+    Parses the header line of a gauge file
+
+    :param header: first line of the gauge file (string)
+    :return: probe table, record array with fields type, x, y, z (first end
+             of the line of line integral gauges)
+    """
+    fields = _probePattern.findall(header)
+    probes = np.recarray((len(fields),),
+                         dtype=[('type', 'U32'), ('x', 'f8'), ('y', 'f8'),
+                                ('z', 'f8')])
+    for ii, (ptype, coords) in enumerate(fields):
+        coords = coords.replace(',', ' ').split()
+        probes[ii] = (ptype, float(coords[0]), float(coords[1]),
+                      float(coords[2]))
+    return probes
+
+
+def readHeader(filename):
+    """
+    Reads the probe table of a gauge file without touching the data rows
+
+    :param filename: name of the gauge file (string)
+    :return: probe table (see parseHeader)
+    """
+    with open(filename, 'r') as csvfile:
+        return parseHeader(csvfile.readline())
+
+
+def findProbes(probes, ptype=None, x=None, y=None, z=None, atol=1e-8):
+    """
+    Selects probes by type and/or coordinates
+
+    :param probes: probe table (see parseHeader)
+    :param ptype: probe type, e.g. 'p', 'vof', 'phi' (string)
+    :param x: x coordinate of the probes (float)
+    :param y: y coordinate of the probes (float)
+    :param z: z coordinate of the probes (float)
+    :param atol: absolute tolerance used to compare coordinates (float)
+    :return: column indices of the matching probes (array)
+    """
+    mask = np.ones(len(probes), dtype=bool)
+    if ptype is not None:
+        mask &= probes.type == ptype
+    for name, value in (('x', x), ('y', y), ('z', z)):
+        if value is not None:
+            mask &= np.abs(probes[name]-value) <= atol
+    return np.where(mask)[0]
+
+
+def nearestProbe(probes, coords, ptype=None):
+    """
+    Finds the probe closest to a given point
+
+    :param probes: probe table (see parseHeader)
+    :param coords: coordinates of the point (list/array of 3 floats)
+    :param ptype: restrict the search to probes of this type (string)
+    :return: column index of the nearest probe (int)
+    """
+    candidates = findProbes(probes, ptype=ptype)
+    xyz = np.column_stack((probes.x, probes.y, probes.z))[candidates]
+    dist = np.sum((xyz-np.asarray(coords, dtype=float))**2, axis=1)
+    return candidates[np.argmin(dist)]
+
+
+def parseRows(lines, ncols):
+    """
+    Parses a block of comma separated data rows
+
+    The last line is dropped if it is incomplete and has no newline (a line
+    still being written by a running simulation). Any other row without
+    ncols values means that the header does not describe the data.
+
+    :param lines: data rows (list of strings)
+    :param ncols: number of values per row including time (int)
+    :return: array of shape (nrows, ncols)
+    :raises ValueError: a complete row does not have ncols values
+    """
+    if not lines:
+        return np.zeros((0, ncols))
+    # fast path for a block of rows of the right width (the total count
+    # alone would let short and long rows compensate each other)
+    if all(line.count(',') == ncols-1 for line in lines):
+        try:
+            values = np.fromstring(','.join(lines).replace('\n', ''),
+                                   sep=',')
+            if values.size == len(lines)*ncols:
+                return values.reshape(len(lines), ncols)
+        except ValueError:
+            pass
+    rows = []
+    for ii, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            row = np.fromstring(line, sep=',')
+        except ValueError:
+            row = np.zeros(0)
+        if row.size == ncols:
+            rows.append(row)
+        elif ii < len(lines)-1 or line.endswith('\n'):
+            raise ValueError('data row with %d values instead of %d: %r'
+                             % (row.size, ncols, line[:80]))
+    return np.array(rows).reshape(len(rows), ncols)
+
+
+def scanRows(filename, ncols, offset, chunkbytes=CHUNKBYTES):
+    """
+    Parses the complete data rows found after a byte offset of a gauge file
+
+    Only lines terminated by a newline are consumed, so a row still being
+    written by a running simulation is left for the next scan.
+
+    :param filename: name of the gauge file (string)
+    :param ncols: number of values per row including time (int)
+    :param offset: byte offset of the first row to parse (int)
+    :param chunkbytes: number of bytes read at once (int)
+    :return: generator of (rows, offset) where offset follows the last
+             consumed line
+    """
+    with open(filename, 'rb') as csvfile:
+        csvfile.seek(offset)
+        tail = b''
+        while True:
+            chunk = csvfile.read(chunkbytes)
+            if not chunk:
+                break
+            chunk = tail+chunk
+            end = chunk.rfind(b'\n')+1
+            tail = chunk[end:]
+            if end == 0:
+                continue
+            offset += end
+            lines = chunk[:end].decode('ascii').splitlines(True)
+            yield parseRows(lines, ncols), offset
+
+
+def headerOffset(filename):
+    """
+    Byte offset of the first data row of a gauge file
+
+    :param filename: name of the gauge file (string)
+    :return: length of the header line in bytes (int)
+    """
+    with open(filename, 'rb') as csvfile:
+        return len(csvfile.readline())
+
+
+def _readRows(csvfile, ncols, columns, tmin, tmax, chunksize):
+    """
+    Reads the data rows following the header of an open gauge/record file
+    """
+    if columns is None:
+        keep = slice(1, None)
+        nsel = ncols-1
+    else:
+        keep = np.asarray(columns, dtype=int)+1
+        nsel = len(keep)
+    times = []
+    blocks = []
+    while True:
+        lines = list(islice(csvfile, chunksize))
+        if not lines:
+            break
+        rows = parseRows(lines, ncols)
+        if tmin is not None:
+            rows = rows[rows[:, 0] >= tmin]
+        done = False
+        if tmax is not None and len(rows) and rows[-1, 0] > tmax:
+            rows = rows[rows[:, 0] <= tmax]
+            done = True
+        times.append(rows[:, 0])
+        blocks.append(rows[:, keep])
+        if done:
+            break
+    if not blocks:
+        return np.zeros(0), np.zeros((0, nsel))
+    return np.concatenate(times), np.concatenate(blocks).reshape(-1, nsel)
+
+
+def readProbes(filename, columns=None, tmin=None, tmax=None,
+               chunksize=CHUNKSIZE):
+    """
+    Reads the time series of selected probes within a time window
+
+    The file is parsed in chunks of rows and only the requested columns are
+    kept, so memory scales with the selection rather than with the file.
+    Reading stops at the first row past tmax.
+
+    :param filename: name of the gauge file (string)
+    :param columns: probe indices to read, all probes if None (list/array)
+    :param tmin: start of the time window (float)
+    :param tmax: end of the time window (float)
+    :param chunksize: number of rows parsed at once (int)
+    :return: time (array), data (array of shape (ntimes, nselected))
+    """
+    with open(filename, 'r') as csvfile:
+        probes = parseHeader(csvfile.readline())
+        return _readRows(csvfile, len(probes)+1, columns, tmin, tmax,
+                         chunksize)
+
+
+def readProbeFile(filename):
+    """
+    Reads a whole gauge file (interface of the former per-case copies)
+
+    :param filename: name of the gauge file (string)
+    :return: [probeType, probeCoord, time, data]
+    """
+    probes = readHeader(filename)
+    time, data = readProbes(filename)
+    probeType = list(probes.type)
+    probeCoord = list(zip(probes.x, probes.y, probes.z))
+    return [probeType, probeCoord, time, data]
+
+
+def readRecordFile(filename, columns=None, tmin=None, tmax=None):
+    """
+    Reads a file with plain column names, such as the record_*.csv files of
+    rigid bodies (interface of the former per-case copies)
+
+    :param filename: name of the record file (string)
+    :param columns: indices of the columns to read after time (list/array)
+    :param tmin: start of the time window (float)
+    :param tmax: end of the time window (float)
+    :return: [names, time, data], names includes the time column
+    """
+    with open(filename, 'r') as csvfile:
+        names = csvfile.readline().replace(',', ' ').split()
+        time, data = _readRows(csvfile, len(names), columns, tmin, tmax,
+                               CHUNKSIZE)
+    return [names, time, data]
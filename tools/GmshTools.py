@@ -0,0 +1,323 @@
+"""
+Writer of Gmsh .geo files from an assembled proteus domain and the mesh
+constraints of MeshRefinement.
+
+The file is built in memory as a list of chunks and written in one call.
+Index lists are formatted with a single join. The map from vertex pairs to
+lines and the lines of every facet are computed once while writing the
+surfaces, and reused for all the restricted fields. Lines created for facet
+edges that are not segments are shared between the facets that use them.
+Constraints identical to a previous one are skipped, so they do not produce
+duplicate Gmsh fields.
+
+Example
+-------
+from tools.GmshTools import writeGeo
+
+mr._assembleRefinementOptions(domain)
+writeGeo(domain, 'mesh')
+"""
+
+import numpy as np
+
+
+def _join(ind):
+    return ', '.join([str(i) for i in ind])
+
+
+def _idx(ind):
+    # 0-based indices of the domain to 1-based Gmsh entities
+    return _join(np.asarray(ind, dtype=int).ravel()+1)
+
+
+def _groups(flags, start=1):
+    # entities (1-based) of every flag
+    groups = {}
+    for i, flag in enumerate(flags):
+        groups.setdefault(flag, []).append(i+start)
+    return groups
+
+
+def _constraintKey(c):
+    return repr((c['type'], c['entity'], c['index'],
+                 sorted(c['variables'].items())))
+
+
+def writeGeo(domain, fileprefix, group_names=False, append=False):
+    """
+    Writes the geometry and the mesh constraints of a domain to a .geo file
+
+    :param domain: assembled domain, with MeshOptions.constraints set by
+                   _assembleRefinementOptions (proteus Domain)
+    :param fileprefix: name of the file without the .geo extension (string)
+    :param group_names: name the physical groups after the boundary tags
+                        (bool)
+    :param append: do not write the background field (bool)
+    """
+    self = domain
+    self.geofile = fileprefix
+    self.polyfile = fileprefix
+    out = []
+    write = out.append
+    sN = len(self.segments)
+
+    # Vertices
+    write('\n// Points\n')
+    vertices = np.zeros((len(self.vertices), 3))
+    if len(self.vertices):
+        vertices[:, :self.nd] = np.asarray(self.vertices)[:, :self.nd]
+    write(''.join(['Point(%d) = {%g,%g,%g};\n' % (i+1, v[0], v[1], v[2])
+                   for i, v in enumerate(vertices.tolist())]))
+    pp = _groups(self.vertexFlags) if self.vertexFlags else {}
+    nb_points = len(vertices)
+
+    # Lines
+    write('\n// Lines\n')
+    segments = np.asarray(self.segments, dtype=int).reshape(-1, 2)
+    write(''.join(['Line(%d) = {%d,%d};\n' % (i+1, s[0], s[1])
+                   for i, s in enumerate((segments+1).tolist())]))
+    # line of every (first vertex, second vertex) pair
+    lines_dict = dict(((s[0], s[1]), i+1)
+                      for i, s in enumerate(segments.tolist()))
+    pl = _groups(self.segmentFlags) if self.segmentFlags else {}
+    nb_lines = sN
+
+    # Surfaces
+    write('\n// Surfaces\n')
+    lines = 0
+    lineloop_count = 0
+    facet_lines = [[] for f in self.facets]  # lines of every facet
+    ps = {}
+    for i, f in enumerate(self.facets):
+        seg_flag = sN+i+1
+        if self.nd == 3 or (self.nd == 2 and i not in self.holes_ind):
+            lineloops = []
+            line_list = []
+            for subf in f:
+                lineloop = []
+                for k, ver in enumerate(subf):
+                    prev = subf[k-1]
+                    if (prev, ver) in lines_dict:
+                        lineloop.append(lines_dict[(prev, ver)])
+                    elif (ver, prev) in lines_dict:
+                        # reversed
+                        lineloop.append(-lines_dict[(ver, prev)])
+                    else:
+                        ind = seg_flag+lines
+                        lines += 1
+                        write('Line(%d) = {%d,%d};\n' % (ind, prev+1, ver+1))
+                        lines_dict[(prev, ver)] = ind
+                        lineloop.append(ind)
+                line_list += lineloop
+                lineloop_count += 1
+                write('Line Loop(%d) = {%s};\n' % (lineloop_count,
+                                                   _join(lineloop)))
+                lineloops.append(lineloop_count)
+            facet_lines[i] = line_list
+            write('Plane Surface(%d) = {%s};\n' % (i+1, _join(lineloops)))
+            if self.facetFlags:
+                ps.setdefault(self.facetFlags[i], []).append(i+1)
+    nb_lines += lines
+
+    # Volumes
+    write('\n// Volumes\n')
+    pv = {}
+    for i, V in enumerate(self.volumes):
+        surface_loops = []
+        if i not in self.holes_ind:
+            for sV in V:
+                lineloop_count += 1
+                write('Surface Loop(%d) = {%s};\n' % (lineloop_count,
+                                                      _idx(sV)))
+                surface_loops.append(lineloop_count)
+            write('Volume(%d) = {%s};\n' % (i+1, _join(surface_loops)))
+            if self.regionFlags:
+                pv.setdefault(self.regionFlags[i], []).append(i+1)
+
+    # Physical Groups
+    write('\n// Physical Groups\n')
+    if self.boundaryTags:
+        inv_bt = dict((v, k) for k, v in self.boundaryTags.items())
+    for name, groups in (('Point', pp), ('Line', pl), ('Surface', ps),
+                         ('Volume', pv)):
+        for flag in groups:
+            ind = groups[flag]
+            if self.boundaryTags and group_names is True:
+                flag = '"'+inv_bt[flag]+'", '+str(flag)
+            write('Physical {0}({1}) = {{{2}}};\n'.format(name, flag,
+                                                         _join(ind)))
+
+    # Other
+    mesh = self.MeshOptions
+    write('\n// ----------------\n')
+    write('\n// Other Operations\n')
+
+    def facetEdges(ind_list):
+        # lines of the facets, once each and unsigned
+        edges = []
+        seen = set()
+        for i in ind_list:
+            for line in facet_lines[i]:
+                if abs(line) not in seen:
+                    seen.add(abs(line))
+                    edges.append(abs(line))
+        return edges
+
+    def write_restrict_segment(ind_list, nf):
+        write('Field[{0}].EdgesList = {{{1}}};\n'.format(nf, _idx(ind_list)))
+
+    def write_restrict_facet(ind_list, nf):
+        write('Field[{0}].FacesList = {{{1}}};\n'.format(nf, _idx(ind_list)))
+        write('Field[{0}].EdgesList = {{{1}}};\n'
+              .format(nf, _join(facetEdges(ind_list))))
+
+    def write_restrict_volume(ind_list, nf):
+        write('Field[{0}].RegionsList = {{{1}}};\n'.format(nf,
+                                                            _idx(ind_list)))
+        faces = [face for i in ind_list for subvol in self.volumes[i]
+                 for face in subvol]
+        write('Field[{0}].FacesList = {{{1}}};\n'.format(nf, _idx(faces)))
+        write('Field[{0}].EdgesList = {{{1}}};\n'
+              .format(nf, _join(facetEdges(faces))))
+
+    def write_restrict_entity(entity, ind_list, nf):
+        write('Field[{0}] = Restrict; Field[{0}].IField = {1};\n'
+              .format(nf, nf-1))
+        if entity == 'segment':
+            write_restrict_segment(ind_list, nf)
+        elif entity == 'facet':
+            # also refine segments of facets
+            write_restrict_facet(ind_list, nf)
+        elif entity == 'region' and self.nd == 3:
+            write_restrict_volume(ind_list, nf)
+
+    def write_restrict(restrict_list, nf):
+        write('Field[{0}] = Restrict; Field[{0}].IField = {1};\n'
+              .format(nf, nf-1))
+        for restrict_ent, restrict_ind in restrict_list:
+            if restrict_ent == 'segment':
+                write_restrict_segment(restrict_ind, nf)
+            elif restrict_ent == 'facet':
+                write_restrict_facet(restrict_ind, nf)
+
+    write('\n// Fields\n')
+    field_list = []
+    nf = 1  # ID of next field to be defined
+    written = set()
+    for c in mesh.constraints:
+        key = _constraintKey(c)
+        if key in written:
+            continue
+        written.add(key)
+        if c['index']:
+            ind = _idx(c['index'])
+        v = c['variables']
+        if c['type'] == 'fixed':
+            # MathEval restricted to the entity
+            write('Field[{0}] = MathEval; Field[{0}].F = "{1}";\n'
+                  .format(nf, v['Lc']))
+            nf += 1
+            write_restrict_entity(c['entity'], c['index'], nf)
+            field_list.append(nf)
+            nf += 1
+        elif c['type'] == 'around':
+            # Attractor
+            write('Field[{0}] = Attractor;\n'.format(nf))
+            if c['entity'] == 'vertex':
+                write('Field[{0}].NodesList = {{{1}}};\n'.format(nf, ind))
+            elif c['entity'] == 'segment':
+                write('Field[{0}].NNodesByEdge = 100;\n'
+                      'Field[{0}].EdgesList = {{{1}}};\n'.format(nf, ind))
+            elif c['entity'] == 'facet':
+                write('Field[{0}].FacesList = {{{1}}};\n'.format(nf, ind))
+            elif c['entity'] == 'point':
+                p = v['coords']
+                z = p[2] if self.nd == 3 else 0
+                nb_points += 1
+                write('Point(%d) = {%g,%g,%g};\n' % (nb_points, p[0], p[1],
+                                                     z))
+                write('Field[{0}].NodesList = {{{1}}};\n'.format(nf,
+                                                                 nb_points))
+            nf += 1
+            # Threshold
+            write('Field[{0}] = Threshold; Field[{0}].IField = {1};\n'
+                  'Field[{0}].LcMin = {2};\n'.format(nf, nf-1, v['LcMin']))
+            if v['LcMax']:
+                write('Field[{0}].LcMax = {1};\n'.format(nf, v['LcMax']))
+            if v['DistMin']:
+                write('Field[{0}].DistMin = {1};\n'.format(nf, v['DistMin']))
+            if v['DistMax']:
+                write('Field[{0}].DistMax = {1};\n'.format(nf, v['DistMax']))
+            field_list.append(nf)
+            nf += 1
+        elif c['type'] == 'TFI':
+            if c['entity'] == 'segment':
+                write('Transfinite Line {{{0}}} = {1} Using Progression {2};\n'
+                      .format(ind, v['nodes'], v['prog']))
+        elif c['type'] == 'function':
+            write('Field[{0}] = MathEval;\n'
+                  'Field[{0}].F = "{1}";\n'.format(nf, v['function']))
+            if v['restrict'] is not None:
+                nf += 1
+                write_restrict(v['restrict'], nf)
+            field_list.append(nf)
+            nf += 1
+        elif c['type'] == 'box':
+            write('Field[{0}] = Box;\n'
+                  'Field[{0}].VIn = {1}; Field[{0}].VOut = {2};\n'
+                  'Field[{0}].XMin = {3}; Field[{0}].XMax = {4};\n'
+                  'Field[{0}].YMin = {5}; Field[{0}].YMax = {6};\n'
+                  .format(nf, v['VIn'], v['VOut'], v['XMin'], v['XMax'],
+                          v['YMin'], v['YMax']))
+            if self.nd == 3:
+                write('Field[{0}].ZMin = {1}; Field[{0}].ZMax = {2};\n'
+                      .format(nf, v['ZMin'], v['ZMax']))
+            if v['restrict'] is not None:
+                nf += 1
+                write_restrict(v['restrict'], nf)
+            field_list.append(nf)
+            nf += 1
+        elif c['type'] == 'boundary':
+            edges = []
+            if v['newEdges'] is not None:
+                for p in v['newEdges']:
+                    z = p[2] if self.nd == 3 else 0
+                    nb_points += 1
+                    write('Point(%d) = {%g,%g,%g};\n' % (nb_points, p[0],
+                                                         p[1], z))
+                nb_lines += 1
+                write('Line(%d) = {%d, %d};\n' % (nb_lines, nb_points-1,
+                                                  nb_points))
+                edges.append(nb_lines)
+            write('Field[{0}] = BoundaryLayer;\n'
+                  'Field[{0}].hwall_n = {1};\n'
+                  'Field[{0}].ratio = {2};\n'
+                  .format(nf, v['hwall_n'], v['ratio']))
+            if c['index']:
+                edges += [e+1 for e in c['index']]
+            if edges:
+                write('Field[{0}].EdgesList = {{{1}}};\n'.format(nf,
+                                                                 _join(edges)))
+            field_list.append(nf)
+            nf += 1
+
+    if not append:
+        write('\n// Background Mesh\n')
+        if nf == 1:
+            # no other fields defined => constant background field
+            write("Field[1] = MathEval; Field[1].F = '{0}';\n"
+                  "Background Field = 1;\n".format(mesh.he))
+        else:
+            write('Field[{0}] = Min;\n'
+                  'Field[{0}].FieldsList = {{{1}}};\n'
+                  'Background Field = {0};\n'.format(nf, _join(field_list)))
+
+    if mesh.LcMax is not None:
+        write('Mesh.CharacteristicLengthMax = {0};\n'.format(mesh.LcMax))
+
+    # the following line does not work with refinement when 2 same entities
+    # are defined..
+    write('Coherence;\n')  # remove duplicates
+
+    with open(self.geofile+'.geo', 'w') as geo:
+        geo.write(''.join(out))
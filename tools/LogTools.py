@@ -0,0 +1,279 @@
+"""
+Convergence and performance metrics of proteus runs, from proteus.log.
+
+The log is read once, line by line, so that multi-GB logs are parsed with a
+flat memory use. Every system time step attempt ('System time step t= ...')
+becomes a row of the record, with its time, dt, maximum CFL, wall-clock time
+and whether it was taken; for every model (RANS2P, VOF, NCLS, RDLS, MCorr,
+kappa, dissipation, ...) the row holds the number of nonlinear solves, Newton
+iterations, linear iterations, failures and the wall-clock time spent between
+the 'Model: <name>' line and the end of the model step. The wall-clock times
+come from the [elapsed seconds] prefix of the lines, so the time of a single
+model step is only accurate to a second; the sums over a run are not.
+
+Example
+-------
+from tools import LogTools as lt
+
+metrics = lt.parseLog('proteus.log')
+assert metrics['failures'] == 0
+metrics['models']['RANS2P']['newton']  # Newton iterations of every step
+rollup = lt.summary(metrics)  # time per model, iterations per step, ...
+lt.writeMetrics(metrics, 'proteus.log.json')
+
+or from the command line: python tools/LogTools.py proteus.log
+"""
+
+import json
+import sys
+import numpy as np
+
+#: labels of the models, by name of their physics file
+MODELS = {'twp_navier_stokes_p': 'RANS2P',
+          'vof_p': 'VOF',
+          'ls_p': 'NCLS',
+          'redist_p': 'RDLS',
+          'ls_consrv_p': 'MCorr',
+          'kappa_p': 'kappa',
+          'dissipation_p': 'dissipation',
+          'moveMesh_p': 'moveMesh',
+          'added_mass_p': 'addedMass'}
+
+#: per step columns of every model
+MODELCOLUMNS = ('solves', 'newton', 'linear', 'time', 'failures')
+#: per step columns
+STEPCOLUMNS = ('t', 'dt', 'cfl', 'wall', 'taken', 'failures')
+
+
+def modelLabel(name):
+    """
+    Label of a model given the name of its physics file (the name without
+    the _p suffix if it is unknown)
+    """
+    if name in MODELS:
+        return MODELS[name]
+    return name[:-2] if name.endswith('_p') else name
+
+
+def _values(body):
+    # 't= 1.0e-03, dt= 1.0e-03' -> [1e-3, 1e-3]
+    return [float(part.split(b',')[0].split()[0])
+            for part in body.split(b'=')[1:]]
+
+
+def parseLog(filename, maxMessages=10):
+    """
+    Parses a proteus log in a single pass
+
+    :param filename: name of the log (string)
+    :param maxMessages: number of failure messages kept (int)
+    :return: dict with the per step columns (dict 'steps' of arrays (nsteps,),
+             see STEPCOLUMNS), the per step columns of every model (dict
+             'models' of dicts of arrays (nsteps,), see MODELCOLUMNS), the
+             number of failures, the first failure messages, the wall-clock
+             time of the setup (before the first step) and of the run, and
+             whether the run finished
+    """
+    steps = []
+    step = None
+    model = None
+    started = 0.
+    stamp = 0.
+    setup = None
+    failures = 0
+    messages = []
+    finished = False
+    labels = []
+    with open(filename, 'rb') as log:
+        for number, line in enumerate(log):
+            if line.startswith(b'['):
+                close = line.find(b']')
+                try:
+                    stamp = float(line[1:close])
+                except ValueError:
+                    pass
+                body = line[close+1:].strip()
+            else:
+                body = line.strip()
+            if not body:
+                continue
+            if b'Step Failed,' in body:
+                failures += 1
+                if len(messages) < maxMessages:
+                    messages.append('%d: %s' % (number+1, body.decode(
+                        'utf-8', 'replace')))
+                if step is not None:
+                    step['failures'] += 1
+                    if model is not None:
+                        model[4] += 1
+                continue
+            first = body[:1]
+            if first == b'N':
+                if step is None or model is None:
+                    continue
+                if body.startswith(b'Newton it '):
+                    if int(body.split()[2]) == 0:
+                        model[0] += 1
+                    else:
+                        model[1] += 1
+            elif first == b'a':
+                if (step is not None and model is not None and
+                        body.startswith(b'after ksp')):
+                    its = body.split(b'ksp.its=')
+                    if len(its) > 1:
+                        model[2] += int(its[1].split()[0])
+            elif first == b'M':
+                if body.startswith(b'Maximum CFL'):
+                    if step is not None:
+                        step['cfl'] = max(step['cfl'],
+                                          float(body.split(b'=')[1]))
+                elif body.startswith(b'Model: ') and step is not None:
+                    if model is not None:
+                        model[3] += stamp-started
+                    label = modelLabel(body[7:].strip().decode('utf-8',
+                                                               'replace'))
+                    if label not in labels:
+                        labels.append(label)
+                    model = step['models'].setdefault(label,
+                                                      [0, 0, 0, 0., 0])
+                    started = stamp
+            elif first == b'S':
+                if body.startswith(b'System time step'):
+                    if model is not None:
+                        model[3] += stamp-started
+                        model = None
+                    if setup is None:
+                        setup = stamp
+                    t, dt = _values(body)[:2]
+                    step = {'t': t, 'dt': dt, 'cfl': 0., 'wall': stamp,
+                            'taken': False, 'failures': 0, 'models': {}}
+                    steps.append(step)
+                elif body.startswith(b'Step Taken,'):
+                    if model is not None:
+                        model[3] += stamp-started
+                        model = None
+                    if step is not None and b'System time step' in body:
+                        step['taken'] = True
+            elif first == b'F':
+                if body.startswith(b'Finished calculating solution'):
+                    finished = True
+    if model is not None:
+        model[3] += stamp-started
+    n = len(steps)
+    metrics = {'steps': dict((name, np.array([s[name] for s in steps],
+                                             dtype=bool if name == 'taken'
+                                             else float))
+                             for name in STEPCOLUMNS),
+               'models': {},
+               'failures': failures,
+               'messages': messages,
+               'setup': stamp if setup is None else setup,
+               'wall': stamp,
+               'finished': finished}
+    metrics['steps']['failures'] = metrics['steps']['failures'].astype(int)
+    for label in labels:
+        columns = np.zeros((n, len(MODELCOLUMNS)))
+        for i, s in enumerate(steps):
+            if label in s['models']:
+                columns[i] = s['models'][label]
+        metrics['models'][label] = dict(
+            (name, columns[:, j] if name == 'time' else
+             columns[:, j].astype(int))
+            for j, name in enumerate(MODELCOLUMNS))
+    return metrics
+
+
+def summary(metrics):
+    """
+    Rollups of the metrics of a run
+
+    :param metrics: result of parseLog (dict)
+    :return: dict with the numbers of steps taken and attempted, failures,
+             the final time, dt and CFL ranges, the setup and total
+             wall-clock times, and for every model the total time, the
+             fraction of the time stepping spent in the model, the Newton
+             and linear iterations, and the Newton iterations per step and
+             linear iterations per Newton iteration
+    """
+    steps = metrics['steps']
+    taken = steps['taken']
+    solving = metrics['wall']-metrics['setup']
+    rollup = {'steps': int(np.sum(taken)),
+              'attempts': len(taken),
+              'failures': metrics['failures'],
+              'finished': metrics['finished'],
+              't': float(steps['t'][taken][-1]) if taken.any() else 0.,
+              'setup': metrics['setup'],
+              'wall': metrics['wall'],
+              'models': {}}
+    if len(taken):
+        rollup['dt'] = {'min': float(steps['dt'].min()),
+                        'mean': float(steps['dt'].mean()),
+                        'max': float(steps['dt'].max())}
+        rollup['cfl'] = {'mean': float(steps['cfl'].mean()),
+                         'max': float(steps['cfl'].max())}
+    for label, columns in metrics['models'].items():
+        newton = int(columns['newton'].sum())
+        linear = int(columns['linear'].sum())
+        time = float(columns['time'].sum())
+        active = int(np.sum(columns['solves'] > 0))
+        rollup['models'][label] = {
+            'time': time,
+            'fraction': time/solving if solving > 0 else 0.,
+            'solves': int(columns['solves'].sum()),
+            'newton': newton,
+            'linear': linear,
+            'failures': int(columns['failures'].sum()),
+            'newtonPerStep': newton/float(active) if active else 0.,
+            'linearPerNewton': linear/float(newton) if newton else 0.}
+    return rollup
+
+
+def writeMetrics(metrics, filename):
+    """
+    Writes the metrics and their summary to a json file
+
+    :param metrics: result of parseLog (dict)
+    :param filename: name of the json file (string)
+    """
+    out = dict(metrics)
+    out['steps'] = dict((name, values.tolist()) for name, values in
+                        metrics['steps'].items())
+    out['models'] = dict((label, dict((name, values.tolist()) for name, values
+                                      in columns.items()))
+                         for label, columns in metrics['models'].items())
+    out['summary'] = summary(metrics)
+    with open(filename, 'w') as f:
+        json.dump(out, f)
+
+
+def readMetrics(filename):
+    """
+    Reads metrics written by writeMetrics (the columns as arrays)
+    """
+    with open(filename) as f:
+        metrics = json.load(f)
+    metrics['steps'] = dict((name, np.array(values, dtype=bool if
+                                            name == 'taken' else None))
+                            for name, values in metrics['steps'].items())
+    metrics['models'] = dict((label, dict((name, np.array(values))
+                                          for name, values in
+                                          columns.items()))
+                             for label, columns in metrics['models'].items())
+    return metrics
+
+
+if __name__ == '__main__':
+    for name in sys.argv[1:]:
+        metrics = parseLog(name)
+        writeMetrics(metrics, name+'.json')
+        rollup = summary(metrics)
+        print('%s: %d steps (%d attempts, %d failures), t = %g, wall %g s' %
+              (name, rollup['steps'], rollup['attempts'], rollup['failures'],
+               rollup['t'], rollup['wall']))
+        for label, model in sorted(rollup['models'].items()):
+            print('  %-12s %8.0f s %5.1f%%  %6.2f Newton/step  %6.2f '
+                  'linear/Newton' % (label, model['time'],
+                                     100*model['fraction'],
+                                     model['newtonPerStep'],
+                                     model['linearPerNewton']))
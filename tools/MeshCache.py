@@ -0,0 +1,241 @@
+"""
+Cache of the meshes generated by Triangle/TetGen/Gmsh, addressed by the
+content of the assembled domain.
+
+The key of a mesh is a hash of everything the mesher sees: the PLC of the
+domain (vertices, segments, facets, regions, holes and their flags), he, the
+triangle options, the mesher used and the MeshRefinement constraints (or the
+.geo file written for Gmsh). Changing the dimensions of the tank or the
+refinement changes the key, while changing e.g. the wave period does not.
+
+The mesh files written by proteus next to the case (mesh.ele, mesh.node,
+...) are stored in the cache directory under their key as soon as the run
+that generated them starts its time stepping (MeshStore, attached to the
+auxiliary variables of the domain), and copied back by any later launch
+with the same key, in the same directory or another one (e.g. the other
+members of a sweep over the wave period), in which case
+domain.MeshOptions.genMesh is set to False so that proteus reads them
+instead of remeshing. The master process alone reads and writes the
+cache and broadcasts its decision, so that all the processes agree on
+genMesh. The cases use the cache only when asked to (mesh_cache=True).
+
+Example (after st.assembleDomain(domain) and, with Gmsh, after writeGeo)
+-------
+from tools import MeshCache as mc
+
+mc.useMeshCache(domain, comm=Comm.get())
+
+The cache directory is ~/.cache/air-water-vv/meshes, or the directory given
+by the AIR_WATER_VV_MESH_CACHE environment variable.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+
+#: extensions of the mesh files read by proteus when genMesh is False
+MESHEXTENSIONS = ('.node', '.ele', '.edge', '.face', '.neig', '.neigh',
+                  '.msh')
+
+
+def cacheDirectory():
+    return os.environ.get('AIR_WATER_VV_MESH_CACHE',
+                          os.path.join(os.path.expanduser('~'), '.cache',
+                                       'air-water-vv', 'meshes'))
+
+
+def _plain(value):
+    # json-serialisable copy of nested lists/arrays/dicts of the domain
+    if isinstance(value, dict):
+        return dict((str(k), _plain(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return _plain(value.tolist())
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return repr(value)
+
+
+def meshPrefix(domain):
+    """
+    Prefix of the mesh files of a domain (the .geo file with Gmsh, the .poly
+    file otherwise)
+    """
+    if getattr(domain, 'use_gmsh', False):
+        return domain.geofile
+    return getattr(domain, 'polyfile', 'mesh')
+
+
+def meshKey(domain):
+    """
+    Hash of the geometry and mesh options of an assembled domain
+
+    :param domain: domain after st.assembleDomain (proteus Domain)
+    :return: hexadecimal sha1 digest (string)
+    """
+    mesh = domain.MeshOptions
+    content = {'domain': type(domain).__name__,
+               'nd': domain.nd,
+               'he': getattr(mesh, 'he', None),
+               'triangleOptions': getattr(mesh, 'triangleOptions', None),
+               'use_gmsh': getattr(domain, 'use_gmsh', False),
+               'LcMax': getattr(mesh, 'LcMax', None),
+               'constraints': getattr(mesh, 'constraints', None)}
+    for name in ('vertices', 'vertexFlags', 'segments', 'segmentFlags',
+                 'facets', 'facetFlags', 'regions', 'regionFlags', 'holes'):
+        content[name] = getattr(domain, name, None)
+    sha = hashlib.sha1(json.dumps(_plain(content),
+                                  sort_keys=True).encode('utf-8'))
+    if content['use_gmsh']:
+        with open(domain.geofile+'.geo', 'rb') as geo:
+            sha.update(geo.read())
+    return sha.hexdigest()
+
+
+def meshFiles(prefix):
+    """
+    Existing mesh files of a prefix
+    """
+    return [prefix+ext for ext in MESHEXTENSIONS
+            if os.path.exists(prefix+ext)]
+
+
+def _complete(prefix):
+    return (os.path.exists(prefix+'.node') and
+            os.path.exists(prefix+'.ele'))
+
+
+def storeMesh(key, prefix, directory=None):
+    """
+    Copies the mesh files of a prefix into the cache under key
+
+    :return: True if the mesh was stored
+    """
+    if not _complete(prefix):
+        return False
+    target = os.path.join(directory or cacheDirectory(), key)
+    if os.path.exists(target):
+        return True
+    tmp = target+'.tmp%d' % os.getpid()
+    os.makedirs(tmp)
+    for name in meshFiles(prefix):
+        shutil.copy(name, os.path.join(tmp, 'mesh'+os.path.splitext(name)[1]))
+    try:
+        os.rename(tmp, target)
+    except OSError:  # stored meanwhile by another run
+        shutil.rmtree(tmp, ignore_errors=True)
+    return True
+
+
+def restoreMesh(key, prefix, directory=None):
+    """
+    Copies the mesh files stored under key to the prefix
+
+    :return: True if the mesh was in the cache
+    """
+    source = os.path.join(directory or cacheDirectory(), key)
+    if not _complete(os.path.join(source, 'mesh')):
+        return False
+    for name in meshFiles(os.path.join(source, 'mesh')):
+        shutil.copy(name, prefix+os.path.splitext(name)[1])
+    return True
+
+
+def _generated(prefix, keyfile):
+    # mesh files written by a mesher after the key file of the last launch
+    return (_complete(prefix) and
+            os.path.getmtime(prefix+'.ele') >= os.path.getmtime(keyfile))
+
+
+class MeshStore(object):
+    """
+    Auxiliary variable of proteus storing the mesh generated by the run in
+    the cache when the time stepping starts (calculate_init), the mesh files
+    being written by then
+
+    :param key: key of the mesh, None on the processes other than the master
+                (string)
+    :param prefix: prefix of the mesh files (string)
+    :param directory: cache directory (string)
+    """
+
+    def __init__(self, key, prefix, directory):
+        self.key = key
+        self.prefix = prefix
+        self.directory = directory
+
+    def attachModel(self, model, ar):
+        return self
+
+    def attachAuxiliaryVariables(self, avDict):
+        pass
+
+    def calculate_init(self):
+        if self.key is not None:
+            storeMesh(self.key, self.prefix, self.directory)
+
+    def calculate(self):
+        pass
+
+
+def useMeshCache(domain, directory=None, comm=None):
+    """
+    Stores the mesh generated by the previous launch, then reuses the cached
+    mesh of the domain if there is one (genMesh = False), or requests a new
+    one (genMesh = True) and attaches a MeshStore to the auxiliary variables
+    of the domain (of the 'twp' model with mprans SpatialTools) to store it
+
+    :param domain: domain after st.assembleDomain (proteus Domain)
+    :param directory: cache directory, cacheDirectory() if None (string)
+    :param comm: proteus Comm; the master process copies the files and
+                 decides, the other processes wait for its decision
+    :return: True if the cached mesh is used
+    """
+    if not hasattr(domain, 'vertices'):  # structured mesh, nothing to cache
+        return False
+    directory = directory or cacheDirectory()
+    hit = None
+    key = None
+    if comm is None or comm.isMaster():
+        try:
+            hit, key = _useMeshCache(domain, directory)
+        except (IOError, OSError):
+            hit = False
+    if comm is not None:
+        comm.barrier()
+        hit = comm.comm.tompi4py().bcast(hit, root=0)
+    domain.MeshOptions.genMesh = not hit
+    if not hit:
+        store = MeshStore(key, meshPrefix(domain), directory)
+        auxiliaryVariables = getattr(domain, 'auxiliaryVariables', None)
+        if isinstance(auxiliaryVariables, dict):
+            auxiliaryVariables.setdefault('twp', []).append(store)
+        elif isinstance(auxiliaryVariables, list):
+            auxiliaryVariables.append(store)
+    return hit
+
+
+def _useMeshCache(domain, directory):
+    # stores the mesh generated by the previous launch and restores the mesh
+    # of the domain: True if it is in place, and the key of the mesh
+    prefix = meshPrefix(domain)
+    keyfile = prefix+'.meshkey'
+    key = meshKey(domain)
+    lastKey = None
+    if os.path.exists(keyfile):
+        with open(keyfile) as f:
+            lastKey = f.read().strip()
+    generated = lastKey is not None and _generated(prefix, keyfile)
+    if generated:
+        storeMesh(lastKey, prefix, directory)
+    hit = generated and lastKey == key
+    if not hit and os.path.exists(os.path.join(directory, key)):
+        hit = restoreMesh(key, prefix, directory)
+    with open(keyfile, 'w') as f:
+        f.write(key+'\n')
+    return hit, key
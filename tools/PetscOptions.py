@@ -0,0 +1,233 @@
+"""
+PETSc options files of inputTemplates/ and selection of the fastest one for
+a case.
+
+The options files hold '-name value' or '-name' entries separated by blanks
+or new lines (e.g. -rans2p_ksp_type gmres -rans2p_ksp_knoll). A tuning run
+tries every template, and variants of the asm template for the RANS2P,
+RDLS and MCorr solvers (prefixes rans2p_, rdls_, mcorr_), on a short
+horizon of a case; the trial with the shortest time stepping wins, the
+linear iterations breaking ties. The winning options and a report of the
+trials are cached under a key of the case, its context options (which set
+the mesh size), the number of ranks and the trial options, so that the
+tuning runs once per configuration. Tests/benchmarks/tunePetsc.py runs the
+trials.
+
+Example
+-------
+from tools import PetscOptions as po
+
+options = po.readOptions(po.templateFile('asm'))
+trials = po.trialOptions()  # name: options
+key = po.tuningKey('linearWaves', nranks=4, context='he=0.01')
+winner = po.selectTrial(results)  # results of the trials by name
+
+The cache directory is ~/.cache/air-water-vv/petsc, or the directory given
+by the AIR_WATER_VV_PETSC_CACHE environment variable.
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+TEMPLATEDIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                           'inputTemplates')
+
+#: templates of inputTemplates/ (petsc.options.<name>)
+TEMPLATES = ('asm', 'asm_fgmres', 'mumps', 'superlu_dist')
+
+#: variants: (template, options set, options removed with a None value)
+VARIANTS = OrderedDict([
+    ('asm_restart100', ('asm', {'rans2p_ksp_gmres_restart': '100',
+                                'rdls_ksp_gmres_restart': '100'})),
+    ('asm_overlap2', ('asm', {'rans2p_pc_asm_overlap': '2',
+                              'rdls_pc_asm_overlap': '2'})),
+    ('asm_rans2p_fgmres', ('asm', {'rans2p_ksp_type': 'fgmres',
+                                   'rans2p_ksp_knoll': None})),
+    ('asm_rdls_boomeramg', ('asm', {'rdls_pc_type': 'hypre',
+                                    'rdls_pc_hypre_type': 'boomeramg',
+                                    'rdls_pc_asm_type': None,
+                                    'rdls_sub_ksp_type': None,
+                                    'rdls_sub_pc_type': None,
+                                    'rdls_sub_pc_factor_mat_solver_package':
+                                    None})),
+    ('asm_mcorr_gmres', ('asm', {'mcorr_ksp_type': 'gmres',
+                                 'mcorr_ksp_gmres_restart': '300'}))])
+
+
+def cacheDirectory():
+    return os.environ.get('AIR_WATER_VV_PETSC_CACHE',
+                          os.path.join(os.path.expanduser('~'), '.cache',
+                                       'air-water-vv', 'petsc'))
+
+
+def templateFile(name):
+    return os.path.normpath(os.path.join(TEMPLATEDIR, 'petsc.options.'+name))
+
+
+def readOptions(filename):
+    """
+    Options of a PETSc options file
+
+    :param filename: name of the options file (string)
+    :return: (name without the leading '-', value) pairs, with the value
+             True for flags (list)
+    """
+    with open(filename) as f:
+        words = f.read().split()
+    options = []
+    i = 0
+    while i < len(words):
+        if i < len(words)-1 and words[i+1][0] != '-':
+            options.append((words[i].lstrip('-'), words[i+1]))
+            i += 2
+        else:
+            options.append((words[i].lstrip('-'), True))
+            i += 1
+    return options
+
+
+def writeOptions(options, filename):
+    """
+    Writes options (see readOptions) to a PETSc options file, one per line
+    """
+    with open(filename, 'w') as f:
+        for name, value in options:
+            if value is True:
+                f.write('-%s\n' % name)
+            else:
+                f.write('-%s %s\n' % (name, value))
+
+
+def applyVariant(options, changes):
+    """
+    Options with some values changed
+
+    :param options: (name, value) pairs (list)
+    :param changes: new values by name, None to remove the option (dict)
+    :return: (name, value) pairs (list), the new options at the end
+    """
+    changed = [(name, changes[name]) if name in changes else (name, value)
+               for name, value in options]
+    names = set(name for name, value in options)
+    changed += [(name, changes[name]) for name in sorted(changes)
+                if name not in names]
+    return [(name, value) for name, value in changed if value is not None]
+
+
+def trialOptions(templates=TEMPLATES, variants=VARIANTS):
+    """
+    Options of the tuning trials
+
+    :param templates: names of the templates tried (list)
+    :param variants: variants tried (dict, see VARIANTS)
+    :return: options by trial name (OrderedDict)
+    """
+    trials = OrderedDict()
+    for name in templates:
+        trials[name] = readOptions(templateFile(name))
+    for name, (template, changes) in variants.items():
+        trials[name] = applyVariant(readOptions(templateFile(template)),
+                                    changes)
+    return trials
+
+
+def tuningKey(case, nranks, context='', trials=None):
+    """
+    Hash of a tuning configuration
+
+    :param case: name of the case (string)
+    :param nranks: number of MPI processes (int)
+    :param context: context options of the case, setting the mesh size
+                    (string)
+    :param trials: options of the trials, trialOptions() if None (dict)
+    """
+    trials = trialOptions() if trials is None else trials
+    return hashlib.sha1(json.dumps([case, int(nranks), context,
+                                    list(trials.items())], sort_keys=True)
+                        .encode('utf-8')).hexdigest()
+
+
+def trialPassed(result):
+    return (result.get('returncode') == 0 and not result.get('timedOut') and
+            result.get('summary') is not None and
+            result['summary']['failures'] == 0)
+
+
+def selectTrial(results):
+    """
+    Fastest trial: shortest time stepping among the trials that passed,
+    fewest linear iterations among equal times
+
+    :param results: results of CaseRunner by trial name (dict)
+    :return: name of the winner, None if no trial passed (string)
+    """
+    passed = [(result['solve'], _linear(result), name)
+              for name, result in results.items() if trialPassed(result)]
+    if not passed:
+        return None
+    return min(passed)[2]
+
+
+def _linear(result):
+    return sum(model['linear'] for model in
+               result['summary']['models'].values())
+
+
+def tuningReport(results, winner, title=''):
+    """
+    Text report of the trials: status, wall-clock times and iterations per
+    model of every trial
+    """
+    lines = [title] if title else []
+    lines.append('%-20s %-8s %9s %9s %8s %8s  %s' % (
+        'trial', 'status', 'setup', 'solve', 'newton', 'linear',
+        'linear by model'))
+    for name, result in results.items():
+        if trialPassed(result):
+            models = result['summary']['models']
+            newton = sum(model['newton'] for model in models.values())
+            lines.append('%-20s %-8s %9.2f %9.2f %8d %8d  %s' % (
+                name, 'winner' if name == winner else 'ok', result['setup'],
+                result['solve'], newton, _linear(result),
+                ' '.join('%s=%d' % (label, models[label]['linear'])
+                         for label in sorted(models))))
+        else:
+            status = 'timeout' if result.get('timedOut') else 'failed'
+            lines.append('%-20s %-8s %s' % (name, status,
+                                            result.get('directory', '')))
+    if winner is None:
+        lines.append('no trial passed')
+    return '\n'.join(lines)+'\n'
+
+
+def storeTuning(key, options, report, directory=None):
+    """
+    Stores the winning options (<key>.options) and the report
+    (<key>.report) of a tuning in the cache
+
+    :return: name of the options file (string)
+    """
+    directory = directory or cacheDirectory()
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    filename = os.path.join(directory, key+'.options')
+    with open(os.path.join(directory, key+'.report'), 'w') as f:
+        f.write(report)
+    writeOptions(options, filename+'.tmp%d' % os.getpid())
+    os.rename(filename+'.tmp%d' % os.getpid(), filename)
+    return filename
+
+
+def cachedTuning(key, directory=None):
+    """
+    Options file and report of a cached tuning, (None, None) if there is
+    none
+    """
+    directory = directory or cacheDirectory()
+    filename = os.path.join(directory, key+'.options')
+    if not os.path.exists(filename):
+        return None, None
+    with open(os.path.join(directory, key+'.report')) as f:
+        return filename, f.read()
@@ -0,0 +1,122 @@
+"""
+Buffered writer of the time series recorded by rigid bodies (position,
+rotation, forces, ... at every time step).
+
+Rows are kept in memory and written to disk every bufferSize rows, when
+flush() is called (e.g. before a checkpoint) and when the writer is closed,
+instead of reopening the file at every time step. The records are either a
+csv file with a header line, or a binary file of float64 rows (<name>.bin)
+with the column names in a json sidecar (<name>.bin.json), which is smaller
+and faster to read back for long runs.
+
+Example
+-------
+from tools.RecordTools import RecordWriter, readRecord
+
+writer = RecordWriter('record_caisson.csv', ['time', 'pos_x'])
+writer.write([0., 1.])
+writer.close()
+names, values = readRecord('record_caisson.csv')  # values (nrows, ncols)
+"""
+
+import csv
+import json
+import os
+import numpy as np
+
+
+class RecordWriter(object):
+    """
+    Appends rows of values to a record file
+
+    :param filename: name of the record file, .csv or .bin (string)
+    :param names: names of the columns (list)
+    :param bufferSize: number of rows kept in memory before writing (int)
+    :param append: append to an existing record instead of starting a new
+                   one (bool)
+    """
+
+    def __init__(self, filename, names, bufferSize=100, append=False):
+        self.filename = filename
+        self.names = list(names)
+        self.binary = filename.endswith('.bin')
+        self.bufferSize = int(bufferSize)
+        self.rows = []
+        if self.binary:
+            if not append or not os.path.exists(filename):
+                open(filename, 'wb').close()
+            with open(filename+'.json', 'w') as f:
+                json.dump({'names': self.names}, f)
+        elif not append or not os.path.exists(filename):
+            with open(filename, 'w') as csvfile:
+                csv.writer(csvfile, delimiter=',').writerow(self.names)
+
+    def write(self, values):
+        """
+        Adds a row (list of values, None is recorded as nan in binary
+        records)
+        """
+        self.rows.append(list(values))
+        if len(self.rows) >= self.bufferSize:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered rows to the file
+        """
+        if not self.rows:
+            return
+        if self.binary:
+            rows = np.array([[np.nan if v is None else v for v in row]
+                             for row in self.rows], dtype=np.float64)
+            with open(self.filename, 'ab') as f:
+                rows.tofile(f)
+        else:
+            with open(self.filename, 'a') as csvfile:
+                csv.writer(csvfile, delimiter=',').writerows(self.rows)
+        self.rows = []
+
+    def close(self):
+        self.flush()
+
+
+def readRecord(filename):
+    """
+    Reads a record file written by RecordWriter
+
+    :param filename: name of the record file, .csv or .bin (string)
+    :return: names of the columns (list), values (array (nrows, ncols))
+    """
+    if filename.endswith('.bin'):
+        with open(filename+'.json') as f:
+            names = json.load(f)['names']
+        values = np.fromfile(filename, dtype=np.float64)
+        return names, values.reshape(-1, len(names))
+    with open(filename) as csvfile:
+        names = csvfile.readline().strip().split(',')
+    values = np.genfromtxt(filename, delimiter=',', skip_header=1)
+    return names, values.reshape(-1, len(names))
+
+
+def cutRecord(filename, time):
+    """
+    Removes the rows of a record file from time on (first column), before a
+    restarted run appends to it
+
+    :param filename: name of the record file, .csv or .bin (string)
+    :param time: time of the first row removed (float)
+    """
+    if not os.path.exists(filename):
+        return
+    eps = 1e-8*max(1., abs(time))
+    if filename.endswith('.bin'):
+        names, values = readRecord(filename)
+        values[values[:, 0] < time-eps].tofile(filename)
+        return
+    with open(filename) as f, open(filename+'.tmp', 'w') as out:
+        out.write(f.readline())
+        for line in f:
+            if line.strip() and float(line.split(',')[0]) >= time-eps:
+                break
+            out.write(line)
+    os.rename(filename+'.tmp', filename)
@@ -0,0 +1,135 @@
+"""
+Separation of incident and reflected waves from gauge arrays.
+
+The Fourier coefficients of every gauge of a window are fitted in the least
+squares sense by an incident and a reflected wave at every frequency of the
+band (Mansard and Funke, 1980). All windows and all frequencies are solved in
+one batch, so sliding a window along a long gauge array costs one FFT of the
+array and a few array operations.
+
+Example
+-------
+from tools import GaugeTools as gt
+from tools import ReflectionTools as rt
+
+probes = gt.readHeader('column_gauges.csv')
+time, eta = gt.readProbes('column_gauges.csv', tmin=20., tmax=40.)
+windows = rt.slidingWindows(len(probes), 5)
+refl = rt.reflectionAnalysis(time, eta, probes.x, depth, windows,
+                             fmin=0.8/T, fmax=1.2/T)
+print(refl['Kr'])
+"""
+
+import numpy as np
+
+
+def dispersion(freq, depth, g=9.81, niter=20):
+    """
+    Wavenumbers of linear waves, solving w^2 = g k tanh(k d) with Newton
+    iterations for all frequencies at once
+
+    :param freq: frequencies in Hz (float/array)
+    :param depth: water depth (float)
+    :param g: gravitational acceleration (float)
+    :param niter: number of Newton iterations (int)
+    :return: wavenumbers (array)
+    """
+    omega2 = (2*np.pi*np.asarray(freq, dtype=float))**2
+    # deep water guess, bounded below by the shallow water solution
+    k = np.maximum(omega2/g, np.sqrt(omega2/(g*depth)))
+    for i in range(niter):
+        tkd = np.tanh(k*depth)
+        f = g*k*tkd-omega2
+        df = g*tkd+g*k*depth*(1.-tkd**2)
+        k = np.where(df > 0, k-f/np.where(df > 0, df, 1.), k)
+    return k
+
+
+def slidingWindows(ngauges, spacing, npoints=3):
+    """
+    Gauge indices of windows of equally spaced gauges sliding along an array
+
+    :param ngauges: number of gauges of the array (int)
+    :param spacing: index distance between two gauges of a window (int)
+    :param npoints: number of gauges per window (int)
+    :return: array of shape (nwindows, npoints)
+    """
+    start = np.arange(ngauges-(npoints-1)*spacing)
+    return start[:, None]+spacing*np.arange(npoints)[None, :]
+
+
+def reflectionAnalysis(time, data, x, depth, windows=None, fmin=0.,
+                       fmax=np.inf, z=None, rho=998.2, g=9.81):
+    """
+    Least squares separation of incident and reflected waves
+
+    :param time: time of the samples (array)
+    :param data: surface elevation (or pressure, see z) of the gauges, array
+                 of shape (ntimes, ngauges)
+    :param x: position of the gauges along the direction of propagation
+              (array)
+    :param depth: water depth (float)
+    :param windows: gauge indices of every window, array of shape
+                    (nwindows, npoints); all gauges in one window if None
+    :param fmin: lower frequency of the analysis band (float)
+    :param fmax: upper frequency of the analysis band (float)
+    :param z: if given, data are dynamic pressures measured at elevation z
+              below the still water level (negative), converted to surface
+              elevation with the linear transfer function (float)
+    :param rho: density of water, used with z (float)
+    :param g: gravitational acceleration (float)
+    :return: dictionary with the frequencies 'freq' of the band, the complex
+             amplitudes 'ai' and 'ar' and the reflection coefficient 'Kr_f'
+             per window and frequency (arrays of shape (nwindows, nfreq)),
+             and per window the bulk incident and reflected heights 'Hi' and
+             'Hr' (2*sqrt(sum |a|^2): wave height of regular waves, Hrms of
+             irregular ones) and the bulk reflection coefficient 'Kr'.
+             Frequencies at which the gauges of a window are singular
+             (spacing multiple of half a wavelength) are nan.
+    """
+    time = np.asarray(time, dtype=float)
+    data = np.asarray(data, dtype=float)
+    x = np.asarray(x, dtype=float)
+    nt = len(time)
+    uniform = np.linspace(time[0], time[-1], nt)
+    if not np.allclose(time, uniform, rtol=0., atol=1e-6*(time[1]-time[0])):
+        data = np.column_stack([np.interp(uniform, time, data[:, j])
+                                for j in range(data.shape[1])])
+    dt = (time[-1]-time[0])/(nt-1)
+    if windows is None:
+        windows = np.arange(data.shape[1])[None, :]
+    windows = np.asarray(windows, dtype=int)
+    freq = np.fft.rfftfreq(nt, dt)
+    band = (freq >= fmin) & (freq <= fmax) & (freq > 0)
+    freq = freq[band]
+    # amplitude spectrum of every gauge, shape (nfreq, ngauges)
+    coef = 2.*np.fft.rfft(data-np.mean(data, axis=0), axis=0)[band]/nt
+    k = dispersion(freq, depth, g)
+    if z is not None:
+        coef /= (rho*g*np.cosh(k*(depth+z))/np.cosh(k*depth))[:, None]
+    # gauges of every window relative to its first gauge
+    xw = x[windows]-x[windows[:, :1]]
+    B = np.transpose(coef[:, windows], (1, 0, 2))  # (nwin, nfreq, npoints)
+    Ei = np.exp(-1j*k[None, :, None]*xw[:, None, :])
+    # normal equations [[m, conj(S)], [S, m]] [ai, ar] = [bi, br]
+    m = windows.shape[1]
+    S = np.sum(Ei*Ei, axis=2)
+    bi = np.sum(np.conj(Ei)*B, axis=2)
+    br = np.sum(Ei*B, axis=2)
+    det = m*m-np.abs(S)**2
+    singular = det < 1e-6*m*m
+    det[singular] = np.nan
+    ai = (m*bi-np.conj(S)*br)/det
+    ar = (m*br-S*bi)/det
+    powI = np.nansum(np.abs(ai)**2, axis=1)
+    powR = np.nansum(np.abs(ar)**2, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        Kr_f = np.abs(ar)/np.abs(ai)
+        Kr = np.sqrt(powR/powI)
+    return {'freq': freq,
+            'ai': ai,
+            'ar': ar,
+            'Kr_f': Kr_f,
+            'Hi': 2.*np.sqrt(powI),
+            'Hr': 2.*np.sqrt(powR),
+            'Kr': Kr}
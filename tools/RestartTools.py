@@ -0,0 +1,311 @@
+"""
+Checkpoints of long runs, restart from the last one, and continuation of
+their gauge and record files across restarts.
+
+The fields of the models (RANS2P, VOF, NCLS, RDLS, MCorr, kappa,
+dissipation, mesh displacement) are restored by the hot start of proteus
+(parun -H), from the last step of the archive (<name>.h5). A Checkpointer
+saves what the archive does not hold, at output times so that every
+checkpoint matches an archived step: the state of registered objects
+(getState()/setState(), e.g. the rigid bodies of SpatialTools). At restart,
+the gauge files that proteus rewrites are kept as segments (<name>.part<k>)
+cut at the time of the checkpoint, and stitched back by time when the run
+ends, so that gauge files continue as if the run had not stopped. Records
+of rigid bodies are cut at the time of the checkpoint and appended to
+(see RecordTools.cutRecord).
+
+Example
+-------
+from proteus import Comm
+from tools import RestartTools as rt
+
+checkpointer = rt.Checkpointer(times=tnList, comm=Comm.get(),
+                               gauges=['column_gauges.csv'])
+checkpointer.register('caisson', body)
+if opts.restart:
+    checkpointer.restore()  # before proteus starts, then parun -H
+domain.auxiliaryVariables['twp'].append(checkpointer)
+
+Segments of a run that stopped before stitching them can be stitched with
+python RestartTools.py column_gauges.csv
+and gauge files of runs restarted by hand (times starting from 0 in every
+file) with python RestartTools.py --relative out.csv run1.csv run2.csv
+"""
+
+import atexit
+import glob
+import os
+import pickle
+import sys
+import numpy as np
+
+#: protocol of the checkpoints, readable by python 2 and 3
+PROTOCOL = 2
+
+
+def checkpointFile(directory, t):
+    return os.path.join(directory, 'checkpoint_%.6f.pkl' % t)
+
+
+def listCheckpoints(directory):
+    """
+    Checkpoints of a directory
+
+    :return: (time, filename) pairs sorted by time (list)
+    """
+    checkpoints = []
+    for filename in glob.glob(os.path.join(directory, 'checkpoint_*.pkl')):
+        name = os.path.basename(filename)
+        try:
+            t = float(name[len('checkpoint_'):-len('.pkl')])
+        except ValueError:
+            continue
+        checkpoints.append((t, filename))
+    return sorted(checkpoints)
+
+
+def latestCheckpoint(directory, time=None):
+    """
+    Last checkpoint of a directory, at or before time if given
+
+    :return: time and name of the checkpoint, (None, None) if there is none
+    """
+    checkpoints = [(t, filename) for t, filename in listCheckpoints(directory)
+                   if time is None or t <= time+_eps(time)]
+    if not checkpoints:
+        return None, None
+    return checkpoints[-1]
+
+
+def _eps(t):
+    return 1e-8*max(1., abs(t))
+
+
+def readSeries(filename):
+    """
+    Reads a csv time series with a header line (gauge files of proteus)
+
+    :return: header line (string), values with the time in the first column
+             (array (nrows, ncols))
+    """
+    with open(filename) as f:
+        header = f.readline().rstrip('\r\n')
+    values = np.genfromtxt(filename, delimiter=',', skip_header=1)
+    return header, values.reshape(-1, len(header.split(',')))
+
+
+def writeSeries(filename, header, values):
+    np.savetxt(filename+'.tmp', values, delimiter=',', header=header,
+               comments='', fmt='%.17g')
+    os.rename(filename+'.tmp', filename)
+
+
+def stitchSeries(filenames, relative=False):
+    """
+    Joins the segments of a time series
+
+    :param filenames: segments in the order of the run (list)
+    :param relative: times of every segment start from 0, and are shifted by
+                     the end time of the previous segments (bool)
+    :return: header line of the first segment (string), values (array)
+    """
+    header = None
+    segments = []
+    end = 0.
+    for filename in filenames:
+        segmentHeader, values = readSeries(filename)
+        header = segmentHeader if header is None else header
+        if relative:
+            values[:, 0] += end
+        if len(values):
+            end = values[-1, 0]
+        segments.append(values)
+    for i in range(len(segments)-1):
+        if len(segments[i+1]):
+            start = segments[i+1][0, 0]
+            segments[i] = segments[i][segments[i][:, 0] < start-_eps(start)]
+    return header, np.concatenate(segments)
+
+
+def segmentFiles(filename):
+    """
+    Segments (<filename>.part<k>) of a file, sorted by k
+    """
+    directory, base = os.path.split(filename)
+    parts = []
+    for name in os.listdir(directory or '.'):
+        suffix = name[len(base)+len('.part'):]
+        if name.startswith(base+'.part') and suffix.isdigit():
+            parts.append((int(suffix), os.path.join(directory, name)))
+    return [name for k, name in sorted(parts)]
+
+
+def cutSeries(filename, time):
+    """
+    Removes the rows of a csv time series after time, as written by a run
+    that went on after its last checkpoint
+    """
+    with open(filename) as f, open(filename+'.tmp', 'w') as out:
+        out.write(f.readline())
+        for line in f:
+            if line.strip() and float(line.split(',')[0]) > time+_eps(time):
+                break
+            out.write(line)
+    os.rename(filename+'.tmp', filename)
+
+
+def startSegment(filename):
+    """
+    Moves a file to its next segment, before a restarted run rewrites it
+
+    :return: name of the segment, None if the file does not exist
+    """
+    if not os.path.exists(filename):
+        return None
+    parts = segmentFiles(filename)
+    k = int(parts[-1][len(filename)+len('.part'):])+1 if parts else 0
+    segment = '%s.part%d' % (filename, k)
+    os.rename(filename, segment)
+    return segment
+
+
+def stitchSegments(filename, remove=True):
+    """
+    Joins the segments of a file and the file written since the last
+    restart into the file
+
+    :param remove: removes the segments once joined (bool)
+    """
+    parts = segmentFiles(filename)
+    if not parts:
+        return
+    filenames = parts+[filename] if os.path.exists(filename) else parts
+    header, values = stitchSeries(filenames)
+    writeSeries(filename, header, values)
+    if remove:
+        for name in parts:
+            os.remove(name)
+
+
+class Checkpointer(object):
+    """
+    Auxiliary variable of proteus saving checkpoints of a run at given
+    times (to be appended to the auxiliary variables of the twp model)
+
+    :param times: times of the checkpoints, output times of the run, all of
+                  them so that the last checkpoint is at the last archived
+                  step (list)
+    :param directory: directory of the checkpoints (string)
+    :param gauges: gauge files rewritten by proteus at restart (list)
+    :param keep: number of checkpoints kept (int)
+    :param comm: communicator of proteus, only its master writes files
+    """
+
+    def __init__(self, times, directory='checkpoints', gauges=(), keep=2,
+                 comm=None):
+        self.times = sorted(times)
+        self.directory = directory
+        self.gauges = list(gauges)
+        self.keep = keep
+        self.comm = comm
+        self.objects = {}
+        self.model = None
+        self.restartTime = None
+        self.next = 0
+
+    def isMaster(self):
+        return self.comm is None or self.comm.isMaster()
+
+    def register(self, name, obj):
+        """
+        Adds an object to the checkpoints (with getState() and
+        setState(state) methods)
+        """
+        self.objects[name] = obj
+
+    def attachModel(self, model, ar):
+        self.model = model
+        return self
+
+    def attachAuxiliaryVariables(self, avDict):
+        pass
+
+    def calculate_init(self):
+        pass
+
+    def calculate(self):
+        t = self.model.stepController.t_model_last
+        due = False
+        while (self.next < len(self.times) and
+               self.times[self.next] <= t+_eps(t)):
+            self.next += 1
+            due = True
+        if due:
+            self.save(t)
+
+    def save(self, t):
+        """
+        Saves a checkpoint at time t (on every rank, as getState() may
+        flush files of the master)
+        """
+        state = {'t': t,
+                 'objects': dict((name, obj.getState())
+                                 for name, obj in self.objects.items())}
+        if not self.isMaster():
+            return
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        filename = checkpointFile(self.directory, t)
+        with open(filename+'.tmp', 'wb') as f:
+            pickle.dump(state, f, PROTOCOL)
+        os.rename(filename+'.tmp', filename)
+        for t_old, old in listCheckpoints(self.directory)[:-self.keep]:
+            os.remove(old)
+
+    def restore(self, time=None):
+        """
+        Restores the last checkpoint (at or before time if given): sets the
+        state of the registered objects, moves the gauge files to segments
+        cut at the checkpoint time and stitched at exit, and skips the
+        checkpoint times already passed
+
+        :param time: time of the last step of the archive, if checkpoints
+                     were not saved at every output time (float)
+
+        :return: time of the checkpoint, None if there is none (float)
+        """
+        t, filename = latestCheckpoint(self.directory, time)
+        if t is None:
+            return None
+        with open(filename, 'rb') as f:
+            state = pickle.load(f)
+        for name, obj in self.objects.items():
+            obj.setState(state['objects'][name])
+        if self.isMaster():
+            for name in self.gauges:
+                segment = startSegment(name)
+                if segment is not None:
+                    cutSeries(segment, t)
+                    atexit.register(stitchSegments, name)
+        self.restartTime = t
+        self.next = len([s for s in self.times if s <= t+_eps(t)])
+        return t
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='stitches segments of gauge files')
+    parser.add_argument('files', nargs='+',
+                        help='files with segments (<file>.part<k>), or the '
+                             'output and its segments with --relative')
+    parser.add_argument('--relative', action='store_true',
+                        help='segments with times starting from 0')
+    args = parser.parse_args()
+    if args.relative:
+        header, values = stitchSeries(args.files[1:], relative=True)
+        writeSeries(args.files[0], header, values)
+    else:
+        for name in args.files:
+            stitchSegments(name)
+    sys.exit(0)
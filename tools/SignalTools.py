@@ -0,0 +1,195 @@
+"""
+Signal processing of gauge time series.
+
+All functions work on a single series (ntimes,) or on a whole probe matrix
+(ntimes, nprobes), processed along the time axis in one call.
+
+Example
+-------
+from tools import GaugeTools as gt
+from tools import SignalTools as sgt
+
+time, eta = gt.readProbes('column_gauges.csv')
+eta_f = sgt.signalFilter(time, eta, minf, maxf, 1.1*maxf, 0.9*minf)
+stats = sgt.waveStatistics(time, eta_f)
+print(stats['H13'])
+"""
+
+import numpy as np
+
+#: maximum number of band-pass masks kept in memory
+MASKCACHESIZE = 32
+
+_maskCache = {}
+
+
+def costapValue(f, tail):
+    """
+    Cosine taper going from 1 at f=0 to 0 at f=tail
+
+    :param f: distance to the edge of the pass band (float/array)
+    :param tail: width of the taper (float)
+    """
+    f = np.asarray(f, dtype=float)
+    return 0.5*(1.-np.cos(np.pi*(tail-f)/float(tail)))
+
+
+def _taper(f, tail):
+    weights = np.zeros(len(f))
+    inside = f < tail
+    weights[inside] = costapValue(f[inside], tail)
+    return weights
+
+
+def bandPassMask(nfft, dt, minfreq, maxfreq, cutoffMax, cutoffMin):
+    """
+    Weights applied to the real FFT coefficients by signalFilter
+
+    Frequencies within [minfreq, maxfreq] are kept, frequencies beyond
+    cutoffMin and cutoffMax are removed, with a cosine taper in between. The
+    zero frequency (mean) is kept. Masks are cached, so filtering many
+    series of the same length and band only builds the mask once.
+
+    :param nfft: number of samples (int)
+    :param dt: time step (float)
+    :param minfreq: lower frequency of the pass band (float)
+    :param maxfreq: upper frequency of the pass band (float)
+    :param cutoffMax: frequency above which everything is removed (float)
+    :param cutoffMin: frequency below which everything is removed (float)
+    :return: weights of the rfft frequencies (array of size nfft//2+1)
+    """
+    key = (nfft, dt, minfreq, maxfreq, cutoffMax, cutoffMin)
+    if key in _maskCache:
+        return _maskCache[key]
+    tailMax = cutoffMax - maxfreq
+    tailMin = minfreq - cutoffMin
+    if(tailMax < 0 or tailMin < 0):
+        print("cutoffMax is less than maxfreq or cutoffMin larger than "
+              "minfreq, this should not be the case")
+    freq = np.fft.rfftfreq(nfft, dt)
+    mask = np.ones(len(freq))
+    high = freq > maxfreq
+    mask[high] *= _taper(freq[high]-maxfreq, tailMax)
+    low = (freq < minfreq) & (freq != 0.)
+    mask[low] *= _taper(minfreq-freq[low], tailMin)
+    if len(_maskCache) >= MASKCACHESIZE:
+        _maskCache.clear()
+    _maskCache[key] = mask
+    return mask
+
+
+def signalFilter(time, data, minfreq, maxfreq, cutoffMax, cutoffMin):
+    """
+    Band-pass filter with cosine tapers (see bandPassMask)
+
+    :param time: time of the samples, assumed uniform (array)
+    :param data: series (ntimes,) or probe matrix (ntimes, nprobes)
+    :param minfreq: lower frequency of the pass band (float)
+    :param maxfreq: upper frequency of the pass band (float)
+    :param cutoffMax: frequency above which everything is removed (float)
+    :param cutoffMin: frequency below which everything is removed (float)
+    :return: filtered data, same shape as data
+    """
+    nfft = len(time)
+    dt = (time[-1]-time[0])/(nfft-1)
+    mask = bandPassMask(nfft, dt, minfreq, maxfreq, cutoffMax, cutoffMin)
+    data = np.asarray(data, dtype=float)
+    fft_x = np.fft.rfft(data, nfft, axis=0)
+    fft_x *= mask.reshape((-1,)+(1,)*(data.ndim-1))
+    return np.fft.irfft(fft_x, nfft, axis=0)
+
+
+def zeroCrossings(time, data, up=True):
+    """
+    Individual waves of every probe from zero-crossings around the mean
+
+    Crossings are detected for all probes at once on the flattened
+    (probe-major) matrix, and the height of every wave is obtained with
+    segment reductions between consecutive crossings of the same probe.
+
+    :param time: time of the samples (array)
+    :param data: series (ntimes,) or probe matrix (ntimes, nprobes)
+    :param up: use up-crossings (True) or down-crossings (False)
+    :return: probe index, height and period of every wave (arrays sorted
+             by probe then time), number of probes
+    """
+    data = np.asarray(data, dtype=float)
+    if data.ndim == 1:
+        data = data[:, None]
+    ntimes, nprobes = data.shape
+    series = np.ascontiguousarray(data.T)
+    flat = (series-np.mean(series, axis=1)[:, None]).ravel()
+    product = np.zeros(len(flat))
+    product[:-1] = flat[1:]*flat[:-1]
+    product = product.reshape(nprobes, ntimes)
+    product[:, -1] = 0.
+    probe, index = np.nonzero(product < 0)
+    # rank of every crossing among the crossings of its probe
+    first = np.searchsorted(probe, np.arange(nprobes))
+    rank = np.arange(len(probe))-first[probe]
+    start = flat[probe*ntimes]
+    keep = np.ones(len(probe), dtype=bool)
+    keep[start < 0] = (rank[start < 0] % 2) == (0 if up else 1)
+    keep[start > 0] = (rank[start > 0] % 2) == (1 if up else 0)
+    probe = probe[keep]
+    index = index[keep]
+    if len(probe) < 2:
+        return np.zeros(0, dtype=int), np.zeros(0), np.zeros(0), nprobes
+    pos = probe*ntimes+index
+    wave = probe[1:] == probe[:-1]
+    height = (np.maximum.reduceat(flat, pos)[:-1] -
+              np.minimum.reduceat(flat, pos)[:-1])[wave]
+    period = (time[index[1:]]-time[index[:-1]])[wave]
+    return probe[:-1][wave], height, period, nprobes
+
+
+def waveStatistics(time, data, up=True):
+    """
+    Zero-crossing wave statistics of every probe
+
+    :param time: time of the samples (array)
+    :param data: series (ntimes,) or probe matrix (ntimes, nprobes)
+    :param up: use up-crossings (True) or down-crossings (False)
+    :return: dictionary with, for every probe, the individual 'heights' and
+             'periods' (lists of arrays), the number of waves 'N', and the
+             arrays 'Hmean', 'Hrms', 'H13' (mean of the highest third) and
+             'Tz' (mean period); nan where a probe has no complete wave
+    """
+    probe, height, period, nprobes = zeroCrossings(time, data, up)
+    count = np.bincount(probe, minlength=nprobes).astype(float)
+    splits = np.cumsum(count[:-1]).astype(int)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        Hmean = np.bincount(probe, height, nprobes)/count
+        Hrms = np.sqrt(np.bincount(probe, height**2, nprobes)/count)
+        Tz = np.bincount(probe, period, nprobes)/count
+        # highest third: rank the waves of every probe by decreasing height
+        order = np.lexsort((-height, probe))
+        first = np.concatenate(([0], splits))
+        rank = np.arange(len(order))-first[probe[order]]
+        ntop = np.maximum(count//3, 1)
+        top = order[rank < ntop[probe[order]]]
+        H13 = np.bincount(probe[top], height[top], nprobes) / \
+            np.bincount(probe[top], minlength=nprobes)
+    return {'N': count.astype(int),
+            'heights': np.split(height, splits),
+            'periods': np.split(period, splits),
+            'Hmean': Hmean,
+            'Hrms': Hrms,
+            'H13': H13,
+            'Tz': Tz}
+
+
+def zeroCrossing(time, data, up=True):
+    """
+    Mean period and mean height of the zero-crossing waves (interface of the
+    former per-case copies)
+
+    :param time: time of the samples (array)
+    :param data: series (ntimes,) or probe matrix (ntimes, nprobes)
+    :param up: use up-crossings (True) or down-crossings (False)
+    :return: [period, height], floats for a series, arrays for a matrix
+    """
+    stats = waveStatistics(time, data, up)
+    if np.ndim(data) == 1:
+        return [stats['Tz'][0], stats['Hmean'][0]]
+    return [stats['Tz'], stats['Hmean']]
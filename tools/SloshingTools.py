@@ -0,0 +1,148 @@
+"""
+Third order analytical solution of the standing wave sloshing in a
+rectangular tank (first mode), used for the initial conditions and the
+validation of the wavesloshing benchmark.
+
+The coefficients of the expansion depend only on the tank (wavenumber,
+depth) and the amplitude, so they are computed once when the solution is
+built. Free surface, pressure and velocity are then evaluated with array
+operations on any broadcastable x, y, t, e.g. all the gauges at all the
+time steps in one call:
+
+from tools.SloshingTools import SloshingSolution
+
+sol = SloshingSolution(k, depth, amplitude, g=9.81)
+eta = sol.eta(x[None, :], time[:, None])  # shape (ntimes, nx)
+p = sol.pressure(x, y-depth, t)
+
+Coordinates are dimensional: x from the left wall, y from the still water
+level (positive upwards), t in seconds.
+"""
+
+import numpy as np
+
+
+class SloshingSolution(object):
+    """
+    Standing wave of wavenumber k in water of the given depth, expanded to
+    third order in eps = k*amplitude
+
+    :param k: wavenumber, pi/(tank length) for the first mode (float)
+    :param depth: still water depth (float)
+    :param amplitude: amplitude of the first order surface elevation (float)
+    :param g: gravitational acceleration, magnitude (float)
+    :param rho: density of the water, for the pressure (float)
+    """
+
+    def __init__(self, k, depth, amplitude, g=9.81, rho=998.2):
+        self.k = float(k)
+        self.depth = float(depth)
+        self.amplitude = float(amplitude)
+        self.g = abs(float(g))
+        self.rho = float(rho)
+        self.eps = eps = self.k*self.amplitude
+        h = self.h = self.k*self.depth
+        w0 = self.w0 = np.sqrt(np.tanh(h))
+        w2 = 1./32.*(9.*w0**(-7)-12.*w0**(-3)-3*w0-2*w0**5)
+        #: non-dimensional angular frequency (third order correction)
+        self.w = w0+0.5*eps**2*w2
+        #: dimensional angular frequency
+        self.omega = self.w*np.sqrt(self.k*self.g)
+        # surface elevation
+        self._e1 = (1./8.*(w0**2-w0**(-2)), 1./8.*(w0**(-2)-3*w0**(-6)))
+        self._e2 = (1./32.*(3.*w0**(-8)+6.*w0**(-4)-5.+2.*w0**4),
+                    3./128.*(9.*w0**(-8)+27.*w0**(-4)-15.+w0**4+2*w0**8),
+                    1./128.*(3.*w0**(-8)+18.*w0**(-4)-5.),
+                    3./128.*(-9.*w0**(-12)+3.*w0**(-8)-3.*w0**(-4)+1))
+        # velocity potential
+        self._p0 = w0/np.sinh(h)
+        self._p1 = (1./8.*(w0-w0**(-3)), 1./16.*(3*w0+w0**(-3)),
+                    3./(16.*np.cosh(2.*h))*(w0-w0**(-7)))
+        self._p2 = (1./(128.*np.cosh(3.*h))*(1+3*w0**4) *
+                    (3*w0**(-9)-5.*w0**(-1)+2*w0**3),
+                    1./(128.*np.cosh(h)) *
+                    (9.*w0**(-9)+62.*w0**(-5)-31.*w0**(-1)),
+                    1./(128.*np.cosh(3.*h))*(1+3.*w0**4) *
+                    (-9.*w0**(-13)+22.*w0**(-9)-13.*w0**(-5)))
+
+    def _phase(self, t):
+        # non-dimensional time, the surface is at its maximum at t = 0
+        return self.omega*np.asarray(t, dtype=float)+0.5*np.pi
+
+    def eta(self, x, t):
+        """
+        Free surface elevation above the still water level
+
+        :param x: horizontal coordinate (float/array)
+        :param t: time (float/array, broadcastable with x)
+        """
+        eps = self.eps
+        x = self.k*np.asarray(x, dtype=float)
+        t = self._phase(t)
+        cx, c2x, c3x = np.cos(x), np.cos(2.*x), np.cos(3.*x)
+        st, s3t = np.sin(t), np.sin(3.*t)
+        e1, e2 = self._e1, self._e2
+        eta0 = st*cx
+        eta1 = (e1[0]+e1[1]*np.cos(2.*t))*c2x
+        eta2 = (e2[0]*st*cx+e2[1]*st*c3x+e2[2]*s3t*cx+e2[3]*s3t*c3x)
+        return (eps*eta0+eps**2*eta1+0.5*eps**3*eta2)/self.k
+
+    def _gradPhi(self, x, y, t):
+        # non-dimensional derivatives of the potential in t, x and y
+        eps = self.eps
+        x = self.k*np.asarray(x, dtype=float)
+        Y = self.k*np.asarray(y, dtype=float)+self.h
+        t = self._phase(t)
+        sx, cx = np.sin(x), np.cos(x)
+        s2x, c2x = np.sin(2.*x), np.cos(2.*x)
+        s3x, c3x = np.sin(3.*x), np.cos(3.*x)
+        st, ct = np.sin(t), np.cos(t)
+        s2t, c2t = np.sin(2.*t), np.cos(2.*t)
+        s3t, c3t = np.sin(3.*t), np.cos(3.*t)
+        ch1, sh1 = np.cosh(Y), np.sinh(Y)
+        ch2, sh2 = np.cosh(2.*Y), np.sinh(2.*Y)
+        ch3, sh3 = np.cosh(3.*Y), np.sinh(3.*Y)
+        p0 = self._p0
+        p1 = self._p1
+        b13, b31, b33 = self._p2
+        dt = (eps*(-p0*st*cx*ch1) +
+              eps**2*(p1[0]-2.*p1[1]*c2t-2.*p1[2]*c2t*c2x*ch2) +
+              0.5*eps**3*(-b13*st*c3x*ch3-3.*b31*s3t*cx*ch1 -
+                          3.*b33*s3t*c3x*ch3))
+        dx = (eps*(-p0*ct*sx*ch1) +
+              eps**2*(2.*p1[2]*s2t*s2x*ch2) +
+              0.5*eps**3*(-3.*b13*ct*s3x*ch3-b31*c3t*sx*ch1 -
+                          3.*b33*c3t*s3x*ch3))
+        dy = (eps*(p0*ct*cx*sh1) +
+              eps**2*(2.*p1[2]*s2t*c2x*sh2) +
+              0.5*eps**3*(3.*b13*ct*c3x*sh3+b31*c3t*cx*sh1 +
+                          3.*b33*c3t*c3x*sh3))
+        return dt, dx, dy
+
+    def velocity(self, x, y, t):
+        """
+        Velocity of the water
+
+        :param x: horizontal coordinate (float/array)
+        :param y: vertical coordinate from the still water level
+                  (float/array)
+        :param t: time (float/array)
+        :return: u, v (broadcast shape of x, y, t)
+        """
+        dt, dx, dy = self._gradPhi(x, y, t)
+        scale = np.sqrt(self.g/self.k)
+        return dx*scale, dy*scale
+
+    def pressure(self, x, y, t, p0=0.):
+        """
+        Pressure in the water (Bernoulli)
+
+        :param x: horizontal coordinate (float/array)
+        :param y: vertical coordinate from the still water level
+                  (float/array)
+        :param t: time (float/array)
+        :param p0: pressure at the still water level (float)
+        """
+        dt, dx, dy = self._gradPhi(x, y, t)
+        y = self.k*np.asarray(y, dtype=float)
+        return (-y-dt*self.w-0.5*dx**2-0.5*dy**2)*self.rho*self.g/self.k+p0
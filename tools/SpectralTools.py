@@ -0,0 +1,213 @@
+"""
+Spectral analysis of gauge arrays: Welch power spectral densities, spectral
+wave parameters and comparison with target spectra.
+
+The spectra of all the probes are computed together: the record is cut into
+overlapping segments, and batches of segments of all the probes go through
+one FFT. Only one batch is in memory at a time, so that long records (e.g.
+the memory-mapped probes of GaugeCache.openProbes) are streamed with a flat
+memory use.
+
+Example
+-------
+from tools import GaugeCache as gc
+from tools import SpectralTools as spt
+
+probes, time, eta = gc.openProbes('column_gauges.csv')
+freq, psd = spt.welch(eta, time[1]-time[0], nperseg=1024)
+params = spt.spectralParameters(freq, psd)  # Hm0, Tp, Tm01, Tm02
+target = spt.jonswap(freq, Tp, Hs, gamma=3.3)
+error = spt.spectralError(freq, psd, target, fmin=0.5/Tp, fmax=2./Tp)
+"""
+
+import numpy as np
+from .ReflectionTools import dispersion
+
+
+def _window(name, n):
+    if name == 'hann':
+        # periodic Hann window, as in scipy.signal.welch
+        return 0.5-0.5*np.cos(2*np.pi*np.arange(n)/n)
+    if name == 'boxcar':
+        return np.ones(n)
+    raise ValueError('unknown window: %s' % name)
+
+
+def welch(data, dt, nperseg=256, overlap=0.5, window='hann', batch=64):
+    """
+    One-sided power spectral density by Welch's method (segments detrended
+    by their mean)
+
+    :param data: time series (array (ntimes,) or (ntimes, nprobes), may be
+                 memory-mapped), sampled every dt
+    :param dt: time step (float)
+    :param nperseg: number of samples per segment (int)
+    :param overlap: overlap of the segments, fraction of nperseg (float)
+    :param window: 'hann' or 'boxcar' (string)
+    :param batch: number of segments transformed at once (int)
+    :return: frequencies (array (nfreq,)), psd (array (nfreq,) or
+             (nfreq, nprobes))
+    """
+    data = np.asarray(data)
+    nt = data.shape[0]
+    nperseg = min(int(nperseg), nt)
+    step = max(nperseg-int(overlap*nperseg), 1)
+    starts = np.arange(0, nt-nperseg+1, step)
+    w = _window(window, nperseg)
+    shape = (nperseg,)+(1,)*(data.ndim-1)
+    total = 0.
+    for i in range(0, len(starts), batch):
+        first = starts[i:i+batch]
+        rows = data[first[0]:first[-1]+nperseg]
+        # segments of the batch, shape (nseg, nperseg, ...)
+        segments = np.stack([rows[s-first[0]:s-first[0]+nperseg]
+                             for s in first]).astype(float)
+        segments -= segments.mean(axis=1, keepdims=True)
+        spectrum = np.fft.rfft(segments*w.reshape(shape), axis=1)
+        total = total+np.sum(abs(spectrum)**2, axis=0)
+    psd = total/(len(starts)*np.sum(w**2)/dt)
+    psd[1:] *= 2.
+    if nperseg % 2 == 0:
+        psd[-1] /= 2.
+    return np.fft.rfftfreq(nperseg, dt), psd
+
+
+def spectralMoment(freq, psd, n, fmin=None, fmax=None):
+    """
+    Moment of order n of spectra, int(f^n S(f) df) between fmin and fmax
+
+    :param freq: frequencies (array (nfreq,))
+    :param psd: spectral densities (array (nfreq,) or (nfreq, nprobes))
+    :param n: order of the moment (float)
+    """
+    freq = np.asarray(freq, dtype=float)
+    psd = np.asarray(psd, dtype=float)
+    band = np.ones(len(freq), dtype=bool)
+    if fmin is not None:
+        band &= freq >= fmin
+    if fmax is not None:
+        band &= freq <= fmax
+    f = freq[band]
+    weighted = (f**n).reshape((-1,)+(1,)*(psd.ndim-1))*psd[band]
+    df = np.diff(f).reshape((-1,)+(1,)*(psd.ndim-1))
+    return np.sum(0.5*(weighted[1:]+weighted[:-1])*df, axis=0)
+
+
+def spectralParameters(freq, psd, fmin=None, fmax=None):
+    """
+    Spectral wave parameters of every probe
+
+    :param freq: frequencies (array (nfreq,))
+    :param psd: spectral densities (array (nfreq,) or (nfreq, nprobes))
+    :param fmin: lower bound of the frequency band (float)
+    :param fmax: upper bound of the frequency band (float)
+    :return: dict of Hm0 = 4 sqrt(m0), Tp (period of the spectral peak),
+             Tm01 = m0/m1 and Tm02 = sqrt(m0/m2) (floats/arrays)
+    """
+    freq = np.asarray(freq, dtype=float)
+    psd = np.asarray(psd, dtype=float)
+    m0 = spectralMoment(freq, psd, 0, fmin, fmax)
+    m1 = spectralMoment(freq, psd, 1, fmin, fmax)
+    m2 = spectralMoment(freq, psd, 2, fmin, fmax)
+    inside = np.ones(len(freq), dtype=bool)
+    if fmin is not None:
+        inside &= freq >= fmin
+    if fmax is not None:
+        inside &= freq <= fmax
+    inside &= freq > 0
+    masked = np.where(inside.reshape((-1,)+(1,)*(psd.ndim-1)), psd, -np.inf)
+    fp = freq[np.argmax(masked, axis=0)]
+    return {'Hm0': 4.*np.sqrt(m0),
+            'Tp': 1./fp,
+            'Tm01': m0/m1,
+            'Tm02': np.sqrt(m0/m2)}
+
+
+def jonswap(freq, Tp, Hs, gamma=3.3, sigma_a=0.07, sigma_b=0.09,
+            depth=None, g=9.81):
+    """
+    JONSWAP spectrum in Goda's form, as used by proteus.WaveTools
+    (TMA correction in finite depth if depth is given)
+
+    :param freq: frequencies (array (nfreq,))
+    :param Tp: peak period (float/array (nprobes,))
+    :param Hs: significant wave height (float/array (nprobes,))
+    :param gamma: peak enhancement factor (float/array (nprobes,))
+    :param sigma_a: width of the peak below the peak frequency (float)
+    :param sigma_b: width of the peak above the peak frequency (float)
+    :param depth: water depth for the TMA correction (float)
+    :param g: gravitational acceleration (float)
+    :return: spectral densities (array (nfreq,) or (nfreq, nprobes))
+    """
+    f = np.asarray(freq, dtype=float)
+    Tp, Hs, gamma = [np.asarray(a, dtype=float) for a in (Tp, Hs, gamma)]
+    if max(Tp.ndim, Hs.ndim, gamma.ndim) > 0:
+        f = f[:, None]
+    fTp = np.where(f > 0, f*Tp, 1.)
+    sigma = np.where(fTp <= 1., sigma_a, sigma_b)
+    bj = (0.0624*(1.094-0.01915*np.log(gamma)) /
+          (0.23+0.0336*gamma-0.185/(1.9+gamma)))
+    r = np.exp(-(fTp-1.)**2/(2.*sigma**2))
+    S = bj*Hs**2/(Tp**4*np.where(f > 0, f, 1.)**5)*np.exp(-1.25/fTp**4) * \
+        gamma**r
+    if depth is not None:
+        k = dispersion(np.where(f > 0, f, 1.), depth, g)
+        kd = k*depth
+        S = S*np.tanh(kd)**2/(1.+2.*kd/np.sinh(2.*kd))
+    return np.where(f > 0, S, 0.)
+
+
+def fitJonswap(freq, psd, gammas=np.linspace(1., 7., 61), fmin=None,
+               fmax=None):
+    """
+    JONSWAP spectra fitted to measured spectra: Hs = Hm0 and Tp of the
+    measured spectra, and the peak enhancement factor of gammas giving the
+    least squares error in the band
+
+    :param freq: frequencies (array (nfreq,))
+    :param psd: spectral densities (array (nfreq,) or (nfreq, nprobes))
+    :param gammas: candidate peak enhancement factors (array)
+    :return: dict of Hs, Tp, gamma (floats/arrays) and the fitted spectra
+             (array of the shape of psd)
+    """
+    freq = np.asarray(freq, dtype=float)
+    psd = np.asarray(psd, dtype=float)
+    params = spectralParameters(freq, psd, fmin, fmax)
+    Hs, Tp = params['Hm0'], params['Tp']
+    band = np.ones(len(freq), dtype=bool)
+    if fmin is not None:
+        band &= freq >= fmin
+    if fmax is not None:
+        band &= freq <= fmax
+    shape = psd.shape
+    psd2 = psd.reshape(len(freq), -1)
+    Hs2, Tp2 = np.ravel(Hs), np.ravel(Tp)
+    errors = []
+    for gamma in gammas:
+        S = jonswap(freq, Tp2, Hs2, gamma).reshape(len(freq), -1)
+        errors.append(np.sum((S[band]-psd2[band])**2, axis=0))
+    best = np.asarray(gammas)[np.argmin(errors, axis=0)]
+    fitted = jonswap(freq, Tp2, Hs2, best).reshape(len(freq), -1)
+    return {'Hs': Hs, 'Tp': Tp, 'gamma': best.reshape(np.shape(Hs)),
+            'spectrum': fitted.reshape(shape)}
+
+
+def spectralError(freq, psd, target, fmin=None, fmax=None):
+    """
+    Relative L2 distance between measured and target spectra in a band,
+    sqrt(int (S-T)^2 df / int T^2 df)
+
+    :param freq: frequencies (array (nfreq,))
+    :param psd: measured spectral densities (array (nfreq,) or
+                (nfreq, nprobes))
+    :param target: target spectral densities (array (nfreq,), or of the
+                   shape of psd)
+    :return: error of every probe (float/array (nprobes,))
+    """
+    psd = np.asarray(psd, dtype=float)
+    target = np.asarray(target, dtype=float)
+    if target.ndim < psd.ndim:
+        target = target.reshape((-1,)+(1,)*(psd.ndim-1))
+    diff = spectralMoment(freq, (psd-target)**2, 0, fmin, fmax)
+    norm = spectralMoment(freq, target**2+0.*psd, 0, fmin, fmax)
+    return np.sqrt(diff/norm)
@@ -0,0 +1,213 @@
+"""
+Kinematics of steady periodic waves given as Fourier series (e.g. from
+Fenton's Fourier method), used as boundary conditions of the wave cases, and
+free surface of random waves given by their spectral components.
+
+The harmonic numbers, the coefficients and the depth-dependent denominators
+cosh(n k h) are computed once when the wave is built. All harmonics are then
+evaluated with array operations, either at a single point or at a whole
+array of points of shape (npoints, 3), e.g. all the boundary quadrature
+points of a time step.
+
+Example
+-------
+from tools.WaveKinematics import FourierWave
+
+wave = FourierWave(k, omega, depth, Y, B, meanVelocity=c-uMean)
+eta = wave.eta(x, t)
+u, v = wave.velocity(x, t)
+eta, u, v = wave.kinematics(points, t)  # points of shape (npoints, 3)
+
+Random waves (e.g. proteus.WaveTools.RandomWaves) are summed over their
+components for all the times at once:
+
+eta = spectralEta(x, time, wave.ai, wave.kDir, wave.omega, wave.phi)
+
+The vof of a boundary condition is integrated over a column of cells with
+stepSum, which only evaluates it in the band around the free surface.
+"""
+
+import numpy as np
+
+
+class FourierWave(object):
+    """
+    Steady wave given by the Fourier coefficients of its non-dimensional
+    free surface and velocity potential
+
+    eta = depth + sum(Y_n cos(n theta))/k
+    u = meanVelocity + sqrt(g/k) sum(n B_n cosh(n k Z)/cosh(n k depth)
+                                     cos(n theta))
+    v = sqrt(g/k) sum(n B_n sinh(n k Z)/cosh(n k depth) sin(n theta))
+
+    with theta = k x - omega t + phase and Z the elevation above the bottom.
+    u is along the direction of propagation (x) and v is vertical.
+
+    :param k: wavenumber (float)
+    :param omega: angular frequency (float)
+    :param depth: still water depth (float)
+    :param Y: surface elevation coefficients Y_1..Y_N (list/array)
+    :param B: velocity coefficients B_1..B_M (list/array)
+    :param g: gravitational acceleration, magnitude (float)
+    :param meanVelocity: mean horizontal velocity in the frame of the tank
+                         (float)
+    :param phase: phase of the wave at x = 0, t = 0 (float)
+    :param bottom: vertical coordinate of the bottom (float)
+    """
+
+    def __init__(self, k, omega, depth, Y, B, g=9.81, meanVelocity=0.,
+                 phase=0., bottom=0.):
+        self.k = float(k)
+        self.omega = float(omega)
+        self.depth = float(depth)
+        self.meanVelocity = float(meanVelocity)
+        self.phase = float(phase)
+        self.bottom = float(bottom)
+        self.Y = np.asarray(Y, dtype=float)
+        self.B = np.asarray(B, dtype=float)
+        self._nY = np.arange(1, len(self.Y)+1, dtype=float)
+        self._nB = np.arange(1, len(self.B)+1, dtype=float)
+        self._Yk = self.Y/self.k
+        # sqrt(g/k) n B_n / cosh(n k h)
+        self._Bn = (np.sqrt(abs(g)/self.k)*self._nB*self.B /
+                    np.cosh(self._nB*self.k*self.depth))
+        self._nkB = self._nB*self.k
+        self._last = None
+
+    def theta(self, x, t):
+        """
+        Phase of the wave at the points x (array of shape (3,) or
+        (npoints, 3))
+        """
+        x = np.asarray(x, dtype=float)
+        return self.k*x[..., 0]-self.omega*t+self.phase
+
+    def _eta(self, theta):
+        theta = np.asarray(theta)[..., None]
+        return self.depth+self.bottom+np.dot(np.cos(self._nY*theta),
+                                              self._Yk)
+
+    def _velocity(self, x, theta):
+        theta = np.asarray(theta)[..., None]
+        kz = self._nkB*(x[..., 2, None]-self.bottom)
+        u = self.meanVelocity+np.dot(np.cosh(kz)*np.cos(self._nB*theta),
+                                     self._Bn)
+        v = np.dot(np.sinh(kz)*np.sin(self._nB*theta), self._Bn)
+        return u, v
+
+    def eta(self, x, t):
+        """
+        Free surface elevation above the points x (float, or array of shape
+        (npoints,))
+        """
+        return self._eta(self.theta(x, t))[()]
+
+    def velocity(self, x, t):
+        """
+        Horizontal and vertical velocity at the points x
+
+        :return: u, v (floats, or arrays of shape (npoints,))
+        """
+        x = np.asarray(x, dtype=float)
+        u, v = self._velocity(x, self.theta(x, t))
+        return u[()], v[()]
+
+    def kinematics(self, x, t):
+        """
+        Free surface elevation and velocity at the points x, sharing the
+        phase computation. The result for the last single point is kept, so
+        that evaluating several components at the same point and time (as
+        the boundary condition functions do) computes it only once.
+
+        :return: eta, u, v (floats, or arrays of shape (npoints,))
+        """
+        x = np.asarray(x, dtype=float)
+        key = None
+        if x.ndim == 1:
+            key = (t, x[0], x[1], x[2])
+            if self._last is not None and self._last[0] == key:
+                return self._last[1]
+        theta = self.theta(x, t)
+        u, v = self._velocity(x, theta)
+        result = (self._eta(theta)[()], u[()], v[()])
+        if key is not None:
+            self._last = (key, result)
+        return result
+
+
+def spectralEta(x, t, amplitude, kDir, omega, phase, chunk=1024):
+    """
+    Free surface elevation of a sum of linear wave components
+
+    eta = sum(a_n cos(kDir_n.x - omega_n t + phase_n))
+
+    The components are split into the part of the phase depending on x and
+    the part depending on t, so that all the times are evaluated with two
+    matrix products, chunk times at a time.
+
+    :param x: point (array of shape (3,))
+    :param t: times (float/array)
+    :param amplitude: amplitudes of the components (array (N,))
+    :param kDir: wavenumber vectors of the components (array (N, 3))
+    :param omega: angular frequencies of the components (array (N,))
+    :param phase: phases of the components (array (N,))
+    :param chunk: number of times evaluated at once (int)
+    :return: eta (float/array of the shape of t)
+    """
+    t = np.asarray(t, dtype=float)
+    times = t.ravel()
+    a = np.asarray(amplitude, dtype=float)
+    omega = np.asarray(omega, dtype=float)
+    space = np.dot(np.asarray(kDir, dtype=float),
+                   np.asarray(x, dtype=float))+phase
+    ac, as_ = a*np.cos(space), a*np.sin(space)
+    eta = np.empty(len(times))
+    for i in range(0, len(times), chunk):
+        wt = np.outer(times[i:i+chunk], omega)
+        eta[i:i+chunk] = np.dot(np.cos(wt), ac)+np.dot(np.sin(wt), as_)
+    return eta.reshape(t.shape)[()]
+
+
+def smoothedHeaviside(eps, phi):
+    """
+    Smoothed Heaviside function of proteus (0 below -eps, 1 above eps),
+    for arrays of phi
+    """
+    phi = np.asarray(phi, dtype=float)
+    if eps == 0.:
+        return np.where(phi > 0., 1., np.where(phi < 0., 0., 0.5))
+    H = 0.5*(1.+phi/eps+np.sin(np.pi*phi/eps)/np.pi)
+    return np.where(phi > eps, 1., np.where(phi < -eps, 0., H))
+
+
+def stepSum(f, n):
+    """
+    Sum of f(0), ..., f(n-1) for a non-decreasing f that is exactly 0, then
+    smoothed, then exactly 1 (e.g. the vof of a column of cells, 0 in the
+    water and 1 in the air): the ends of the smoothed band are found by
+    bisection, so that f is called O(log n) times plus once per index of the
+    band
+
+    :param f: function of the index (callable)
+    :param n: number of indices (int)
+    :return: sum of the values (float)
+    """
+    values = {}
+
+    def value(i):
+        if i not in values:
+            values[i] = f(i)
+        return values[i]
+
+    def first(test):
+        lo, hi = 0, n
+        while lo < hi:
+            mid = (lo+hi)//2
+            if test(value(mid)):
+                hi = mid
+            else:
+                lo = mid+1
+        return lo
+    i0 = first(lambda v: v > 0.)
+    i1 = first(lambda v: v >= 1.)
+    return float(n-i1)+sum(value(i) for i in range(i0, i1))
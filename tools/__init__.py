@@ -0,0 +1,11 @@
+"""
+Shared utilities for the air-water-vv cases (gauge reading, postprocessing).
+
+Case scripts live in directories that are not importable packages, so they
+add the repository root to the path before importing from here:
+
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '../../..'))
+from tools import GaugeTools as gt
+"""